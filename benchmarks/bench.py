@@ -0,0 +1,235 @@
+"""
+Offline micro-benchmarks of sqlfront's own overhead: statement building,
+escaping, and result handling, run against the in-process fake driver (see
+fakedriver.py) - no server, nor the real MySQLdb, needed.
+
+    python benchmarks/bench.py --output before.json
+    ... upgrade ...
+    python benchmarks/bench.py --output after.json --compare before.json
+
+Each benchmark is timed as the best of 'repeat' runs of enough calls to
+last about 'duration' seconds. Results are written as JSON (microseconds per
+call), for diffing release to release; --compare prints the ratio to a
+previous run.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import collections
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fakedriver
+fakedriver.install()
+
+# pylint: disable=wrong-import-position
+from sqlfront.mysql import MySQLCursor, MySQLDialect, MySQLSyntax
+from sqlfront.extern.stringtemplate import StringTemplate
+from sqlfront.util.utilities import Qualified
+
+# name --> function(config), returning the callable to time
+BENCHMARKS = collections.OrderedDict()
+
+def benchmark(name):
+    """Register a benchmark setup function under 'name'."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def _cursor(row_format='dict'):
+    """MySQLCursor on the fake driver, with the table description cached."""
+    cursor = MySQLCursor(row_format=row_format)
+    cursor.describe('Orders')
+    cursor.max_allowed_packet()
+    return cursor
+
+def _row(config, index=0):
+    """A row of the fake schema, without its key."""
+    return dict(
+        ('c{0}'.format(column), index * column if column % 2 else 'x' * config.width)
+        for column in range(1, config.columns)
+    )
+
+
+#==============================================================================
+#    Statement building
+#==============================================================================
+@benchmark('dialect_format')
+def _dialect_format(config):
+    template = "SELECT * FROM Orders WHERE c1 = '{0}' AND c2 = '{1}' AND c3 = '{2}'"
+    return lambda: MySQLDialect.format(template, 42, "O'Brien", 3.5)
+
+@benchmark('stringtemplate_format')
+def _stringtemplate_format(config):
+    template = StringTemplate("SELECT {columns} FROM {table} WHERE {key} = {value} LIMIT {limit}")
+    return lambda: template.format(columns='c1, c2', table='Orders', key='id',
+                                   value=42, limit=10)
+
+@benchmark('syntax_where')
+def _syntax_where(config):
+    where = dict(('c{0}'.format(column), column) for column in range(1, 6))
+    return lambda: MySQLSyntax.where(where)
+
+@benchmark('syntax_compose')
+def _syntax_compose(config):
+    return lambda: MySQLSyntax.compose(
+        "SELECT c1, c2", "FROM Orders", "WHERE c1 = '42'", "", "LIMIT 10")
+
+@benchmark('qualified')
+def _qualified(config):
+    return lambda: str(Qualified(database='test_sqlfront', table='Orders',
+                                 column='c1', alias='first'))
+
+
+#==============================================================================
+#    Statements through the fake driver
+#==============================================================================
+@benchmark('insert')
+def _insert(config):
+    cursor, row = _cursor(), _row(config, 7)
+    return lambda: cursor.insert('Orders', row)
+
+@benchmark('insert_many_1000')
+def _insert_many(config):
+    cursor = _cursor()
+    rows = [_row(config, index) for index in range(1000)]
+    return lambda: cursor.insert_many('Orders', rows)
+
+@benchmark('select_where')
+def _select(config):
+    cursor = _cursor()
+    fakedriver.configure(rows=10, columns=config.columns, width=config.width)
+    return lambda: cursor.select('Orders', columns=('id', 'c1'), where={'c1': 42}, limit=10)
+
+@benchmark('count')
+def _count(config):
+    cursor = _cursor()
+    return lambda: cursor.count('Orders')
+
+@benchmark('exists_row')
+def _exists_row(config):
+    cursor = _cursor()
+    fakedriver.configure(rows=1, columns=config.columns, width=config.width)
+    return lambda: cursor.exists('Orders', row={'c1': 42})
+
+@benchmark('get_many_100')
+def _get_many(config):
+    cursor = _cursor()
+    fakedriver.configure(rows=100, columns=config.columns, width=config.width)
+    keys = range(1, 101)
+    return lambda: cursor.get_many('Orders', keys)
+
+
+#==============================================================================
+#    Result handling, for 'rows' rows
+#==============================================================================
+def _results(row_format):
+    def setup(config):
+        cursor = _cursor(row_format)
+        return lambda: cursor.run("SELECT * FROM Orders")
+    return setup
+
+for _format in ('dict', 'tuple', 'row', 'columnar'):
+    benchmark('results_' + _format)(_results(_format))
+
+@benchmark('results_stream')
+def _results_stream(config):
+    cursor = _cursor('tuple')
+    return lambda: sum(1 for _ in cursor.run("SELECT * FROM Orders", stream=True))
+
+
+#==============================================================================
+#    Running
+#==============================================================================
+def measure(function, duration, repeat):
+    """Best time per call, in microseconds, and the calls per run."""
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= duration / 10.0 or number >= 10 ** 7:
+            break
+        number *= 10
+    number = max(1, int(number * duration / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat, number))
+    return best / number * 1e6, number
+
+def run(config):
+    """Run the selected benchmarks. Returns the results document."""
+    results = collections.OrderedDict()
+    for name, setup in BENCHMARKS.items():
+        if config.filter and not any(part in name for part in config.filter):
+            continue
+        fakedriver.configure(rows=config.rows, columns=config.columns, width=config.width)
+        function = setup(config)
+        microseconds, number = measure(function, config.duration, config.repeat)
+        results[name] = collections.OrderedDict([
+            ('us_per_call', round(microseconds, 3)),
+            ('calls', number),
+        ])
+        print("{0:<24} {1:>12.2f} us".format(name, microseconds), file=sys.stderr)
+    return collections.OrderedDict([
+        ('label', config.label),
+        ('time', time.strftime('%Y-%m-%dT%H:%M:%S')),
+        ('python', platform.python_version()),
+        ('implementation', platform.python_implementation()),
+        ('platform', platform.platform()),
+        ('config', collections.OrderedDict([
+            ('rows', config.rows), ('columns', config.columns), ('width', config.width),
+            ('duration', config.duration), ('repeat', config.repeat),
+        ])),
+        ('results', results),
+    ])
+
+def compare(document, path):
+    """Print each result's ratio to a previous run (> 1: slower now)."""
+    with open(path) as previous_file:
+        previous = json.load(previous_file)['results']
+    for name, result in document['results'].items():
+        if name in previous:
+            ratio = result['us_per_call'] / max(previous[name]['us_per_call'], 1e-9)
+            print("{0:<24} {1:>12.2f} us  x{2:.2f}".format(
+                name, result['us_per_call'], ratio))
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000,
+                        help="rows per result set (default: %(default)s)")
+    parser.add_argument('--columns', type=int, default=8,
+                        help="columns per row (default: %(default)s)")
+    parser.add_argument('--width', type=int, default=16,
+                        help="characters per string value (default: %(default)s)")
+    parser.add_argument('--duration', type=float, default=0.2,
+                        help="seconds per timed run (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timed runs per benchmark (default: %(default)s)")
+    parser.add_argument('--filter', nargs='*', default=None,
+                        help="only run benchmarks whose names contain one of these")
+    parser.add_argument('--label', default=None, help="label stored with the results")
+    parser.add_argument('--output', default=None, help="JSON file (default: stdout)")
+    parser.add_argument('--compare', default=None, help="previous JSON results to compare with")
+    parser.add_argument('--list', action='store_true', help="list benchmarks, and exit")
+    config = parser.parse_args(arguments)
+    if config.list:
+        print("\n".join(BENCHMARKS))
+        return None
+
+    document = run(config)
+    text = json.dumps(document, indent=2, separators=(',', ': '))
+    if config.output:
+        with open(config.output, 'w') as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    if config.compare:
+        compare(document, config.compare)
+    return document
+
+if __name__ == "__main__":
+    main()
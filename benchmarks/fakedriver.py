@@ -0,0 +1,256 @@
+"""
+In-process stand-in for the MySQLdb driver, answering every command with
+canned results, so that benchmarks measure sqlfront's own overhead without
+a server (or the real driver) installed.
+
+    import fakedriver
+    fakedriver.install(rows=1000, columns=8)    # Before importing sqlfront
+    import sqlfront.mysql
+
+Every table has the same schema: an integer primary key 'id', then columns
+'c1', 'c2', ... alternately integer and VARCHAR (or other names, given as
+'names'). SELECTs return 'rows' rows
+of that shape (or one row, for aggregates and variables, with keys 1..rows); writes report one
+affected row per VALUES tuple. Result rows are built once per configuration,
+so fetching costs next to nothing - what is measured is sqlfront's work.
+"""
+import re
+import sys
+import types
+
+__all__ = ['install', 'configure', 'server']
+
+
+#==============================================================================
+#    Exceptions and constants, as in MySQLdb
+#==============================================================================
+class Error(Exception):
+    pass
+class MySQLError(Error):
+    pass
+class DatabaseError(Error):
+    pass
+class OperationalError(DatabaseError):
+    pass
+class ProgrammingError(DatabaseError):
+    pass
+
+FIELD_TYPES = dict(
+    DECIMAL=0, TINY=1, SHORT=2, LONG=3, FLOAT=4, DOUBLE=5, NULL=6, TIMESTAMP=7,
+    LONGLONG=8, INT24=9, DATE=10, TIME=11, DATETIME=12, YEAR=13, NEWDATE=14,
+    VARCHAR=15, BIT=16, NEWDECIMAL=246, ENUM=247, SET=248, TINY_BLOB=249,
+    MEDIUM_BLOB=250, LONG_BLOB=251, BLOB=252, VAR_STRING=253, STRING=254,
+    GEOMETRY=255,
+)
+
+_ESCAPES = {'\0': '\\0', '\n': '\\n', '\r': '\\r', '\\': '\\\\', "'": "\\'",
+            '"': '\\"', '\x1a': '\\Z'}
+_ESCAPED = re.compile(r"[\0\n\r\\'\"\x1a]")
+
+def escape_string(text):
+    """As MySQLdb.escape_string()."""
+    return _ESCAPED.sub(lambda match: _ESCAPES[match.group()], text)
+
+def literal(value):
+    """SQL literal for a parameter, as the driver would substitute it."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, long, float)):
+        return repr(value)
+    return "'" + escape_string(str(value)) + "'"
+
+
+#==============================================================================
+#    Canned server
+#==============================================================================
+class FakeServer(object):
+    """Result sets for each kind of command, built once per configuration."""
+    def __init__(self, rows=1000, columns=8, width=16, max_allowed_packet=4194304):
+        self.configure(rows, columns, width, max_allowed_packet)
+        # Number of commands received
+        self.commands = 0
+
+    def configure(self, rows=1000, columns=8, width=16, max_allowed_packet=4194304,
+                  names=None):
+        if names is None:
+            names = ['id'] + ['c{0}'.format(index) for index in range(1, columns)]
+        columns = len(names)
+        self.rows, self.columns, self.width = rows, columns, width
+        self.max_allowed_packet = max_allowed_packet
+        self.types = [FIELD_TYPES['LONG']] + [
+            FIELD_TYPES['LONG'] if index % 2 else FIELD_TYPES['VAR_STRING']
+            for index in range(1, columns)
+        ]
+        self.table = _Result(
+            names, self.types,
+            [tuple([key] + [
+                key * index if index % 2 else ('x' * width)
+                for index in range(1, columns)
+            ]) for key in range(1, rows + 1)]
+        )
+        self.describe = _Result(
+            ['Field', 'Type', 'Null', 'Key', 'Default', 'Extra'],
+            [FIELD_TYPES['VAR_STRING']] * 6,
+            [(name, 'int(11)' if code == FIELD_TYPES['LONG'] else 'varchar(255)',
+              'NO' if name == names[0] else 'YES', 'PRI' if name == names[0] else '', None, '')
+             for name, code in zip(names, self.types)]
+        )
+
+    @staticmethod
+    def scalar(name, value):
+        return _Result([name], [FIELD_TYPES['LONGLONG']], [(value, )])
+
+    def answer(self, command):
+        """(Result, rows affected) for a command."""
+        self.commands += 1
+        head = command.lstrip()[:16].upper()
+        if head.startswith('SELECT'):
+            upper = command.upper()
+            if '@@MAX_ALLOWED_PACKET' in upper:
+                return self.scalar('@@max_allowed_packet', self.max_allowed_packet), 1
+            if 'COUNT(' in upper:
+                return self.scalar('count(*)', self.rows), 1
+            if 'MIN(' in upper or 'MAX(' in upper:
+                # The key range of the table: 1..rows
+                bounds = [value for value, function in ((1, 'MIN('), (self.rows, 'MAX('))
+                          if function in upper]
+                return _Result(['bound'] * len(bounds), [FIELD_TYPES['LONG']] * len(bounds),
+                               [tuple(bounds)]), 1
+            return self.table, self.rows
+        if head.startswith(('DESCRIBE', 'DESC ', 'SHOW COLUMNS')):
+            return self.describe, len(self.describe.rows)
+        if head.startswith(('INSERT', 'REPLACE')):
+            return None, command.count('), (') + 1
+        return None, 0
+
+class _Result(object):
+    """Column names, type codes, and rows - as tuples and as dicts."""
+    def __init__(self, names, types, rows):
+        self.names = names
+        self.description = tuple(
+            (name, code, None, None, None, None, 1) for name, code in zip(names, types))
+        self.rows = rows
+        self._dicts = None
+    @property
+    def dicts(self):
+        if self._dicts is None:
+            self._dicts = [dict(zip(self.names, row)) for row in self.rows]
+        return self._dicts
+
+server = FakeServer()
+
+def configure(**keywords):
+    """Reshape the canned results (rows, columns or names, width,
+    max_allowed_packet)."""
+    server.configure(**keywords)
+
+
+#==============================================================================
+#    Connections and cursors
+#==============================================================================
+class Connection(object):
+    def __init__(self, **parameters):
+        self.parameters = parameters
+        self.open = 1
+    def cursor(self, klass=None):
+        return (klass or Cursor)(self)
+    def commit(self):
+        pass
+    def rollback(self):
+        pass
+    def autocommit(self, value):
+        pass
+    def ping(self, *args):
+        if not self.open:
+            raise OperationalError(2006, 'MySQL server has gone away')
+    def escape_string(self, text):
+        return escape_string(text)
+    def close(self):
+        if not self.open:
+            raise ProgrammingError("closing a closed connection")
+        self.open = 0
+
+def connect(**parameters):
+    return Connection(**parameters)
+
+
+class BaseCursor(object):
+    """Buffered cursor returning tuples."""
+    dicts = False
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self._rows, self._position = (), 0
+    def execute(self, query, args=None):
+        if args is not None:
+            if isinstance(args, dict):
+                query = query % dict((key, literal(value)) for key, value in args.items())
+            else:
+                query = query % tuple(literal(value) for value in args)
+        result, affected = server.answer(query)
+        if result is None:
+            self.description, self._rows = None, ()
+        else:
+            self.description = result.description
+            self._rows = result.dicts if self.dicts else result.rows
+        self._position = 0
+        self.rowcount = affected
+        return affected
+    def executemany(self, query, args):
+        return sum(self.execute(query, each) for each in args)
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+    def fetchmany(self, size=None):
+        start = self._position
+        self._position = min(len(self._rows), start + (size or 1))
+        return self._rows[start:self._position]
+    def fetchall(self):
+        start, self._position = self._position, len(self._rows)
+        return self._rows[start:] if start else list(self._rows)
+    def __iter__(self):
+        return iter(self.fetchone, None)
+    def close(self):
+        self._rows = ()
+
+class Cursor(BaseCursor):
+    pass
+class DictCursor(BaseCursor):
+    dicts = True
+class SSCursor(BaseCursor):
+    pass
+class SSDictCursor(BaseCursor):
+    dicts = True
+
+
+#==============================================================================
+#    Installation
+#==============================================================================
+def install(**keywords):
+    """Register this module as 'MySQLdb' (with MySQLdb.cursors and
+    MySQLdb.constants.FIELD_TYPE), and configure its results. Must run before
+    sqlfront is imported, so sqlfront binds to it rather than the real driver.
+    """
+    if 'sqlfront' in sys.modules and sys.modules.get('MySQLdb') is not sys.modules[__name__]:
+        raise RuntimeError("Install the fake driver before importing sqlfront.")
+    module = sys.modules[__name__]
+    cursors = types.ModuleType('MySQLdb.cursors')
+    for klass in (BaseCursor, Cursor, DictCursor, SSCursor, SSDictCursor):
+        setattr(cursors, klass.__name__, klass)
+    constants = types.ModuleType('MySQLdb.constants')
+    field_type = types.ModuleType('MySQLdb.constants.FIELD_TYPE')
+    field_type.__dict__.update(FIELD_TYPES)
+    constants.FIELD_TYPE = field_type
+    module.cursors, module.constants = cursors, constants
+    sys.modules.update({
+        'MySQLdb': module,
+        'MySQLdb.cursors': cursors,
+        'MySQLdb.constants': constants,
+        'MySQLdb.constants.FIELD_TYPE': field_type,
+    })
+    if keywords:
+        configure(**keywords)
+    return module
@@ -0,0 +1,171 @@
+"""
+Synthetic data for throughput benchmarks: the test_sqlfront fixture's Persons
+and Orders tables (see sqlfront/test/deploy_mysql.sql), at any scale - 10**5
+to 10**8 rows - in a database of their own.
+
+    python benchmarks/generate.py --config sqlfront/test/connection.json \\
+        --persons 100000 --orders 10000000 --method load
+
+Rows are generated deterministically from --seed, with explicit keys, so the
+same arguments always produce the same tables. They are streamed: memory use
+does not grow with the row count. --method load (LOAD DATA LOCAL INFILE) is
+several times faster than insert, but needs local_infile enabled on the
+server.
+"""
+from __future__ import print_function
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+__all__ = ['persons', 'orders', 'populate', 'SCHEMA']
+
+# As deploy_mysql.sql
+SCHEMA = [
+    ('Persons', """CREATE TABLE Persons
+(
+persons_id int NOT NULL AUTO_INCREMENT,
+last varchar(255) NOT NULL,
+first varchar(255),
+address varchar(255),
+zip int,
+PRIMARY KEY (persons_id)
+)"""),
+    ('Orders', """CREATE TABLE Orders
+(
+order_id int NOT NULL AUTO_INCREMENT,
+order_number int NOT NULL,
+persons_id int,
+PRIMARY KEY (order_id),
+FOREIGN KEY (persons_id) REFERENCES Persons(persons_id)
+)"""),
+]
+
+_LAST = ['Clark', 'Maria', 'Michael', 'Melanie', 'Collins', 'Martins', 'Seagle',
+         'Daniel', 'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Torres']
+_FIRST = ['Daniel', 'Collins', 'Martins', 'Seagle', 'Anna', 'James', 'Maria',
+          'Robert', 'Linda', 'David', 'Susan', 'Thomas', 'Karen', 'Lisa', 'Paul']
+_STREETS = ['Spring Avenue', 'Walnut Avenue', 'Columbia Boulevard', 'Cameron Road',
+            'Main Street', 'Oak Lane', 'Park Drive', 'Hill Road']
+_TOWNS = [('Horsham, PA', 19044), ('Lyndhurst, NJ', 7071), ('Bel Air, MD', 21014),
+          ('Lockport, MD', 21014), ('Dover, DE', 19901), ('Albany, NY', 12207)]
+
+
+def persons(count, seed=0, start=1):
+    """Persons rows (persons_id, last, first, address, zip), for ids
+    start..start+count-1."""
+    generator = random.Random(seed)
+    for persons_id in xrange(start, start + count):
+        town, zip_code = generator.choice(_TOWNS)
+        yield (persons_id, generator.choice(_LAST), generator.choice(_FIRST),
+               "{0} {1}, {2}".format(generator.randint(1, 9999),
+                                     generator.choice(_STREETS), town),
+               zip_code)
+
+def orders(count, persons_count, seed=0, start=1):
+    """Orders rows (order_id, order_number, persons_id), for ids
+    start..start+count-1; each referencing one of persons_count persons.
+    With start=None, order_id is left out (for AUTO_INCREMENT inserts)."""
+    generator = random.Random(seed + 1)
+    for index in xrange(count):
+        row = (generator.randint(10000, 99999), generator.randint(1, persons_count))
+        yield row if start is None else (start + index, ) + row
+
+
+def populate(cursor, persons_count, orders_count, seed=0, method='insert',
+             chunk_rows=10000, report=None):
+    """Create Persons and Orders in the cursor's current database (dropping
+    any already there), and fill them. Returns {table: rows per second}.
+    'report' is called with (table, rows written so far), every chunk."""
+    cursor.execute("SET foreign_key_checks = 0")
+    for table, _ in reversed(SCHEMA):
+        cursor.execute("DROP TABLE IF EXISTS {0}".format(table))
+    for table, statement in SCHEMA:
+        cursor.execute(statement)
+        cursor._invalidate_schema(table)     # pylint: disable=W0212
+    cursor.execute("SET foreign_key_checks = 1")
+
+    rates = {}
+    for table, rows in [('Persons', persons(persons_count, seed)),
+                        ('Orders', orders(orders_count, persons_count, seed))]:
+        columns = cursor.columns(table)
+        start = time.time()
+        written = 0
+        for chunk in _chunks(rows, chunk_rows):
+            if method == 'load':
+                cursor.load(table, chunk, columns=columns)
+            else:
+                cursor.insert_many(table, (dict(zip(columns, row)) for row in chunk),
+                                   transaction=True)
+            written += len(chunk)
+            if report is not None:
+                report(table, written)
+        cursor.commit()
+        rates[table] = written / max(time.time() - start, 1e-9)
+    return rates
+
+def _chunks(rows, size):
+    """Lists of up to 'size' rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default=None,
+                        help="connection JSON file, as for MySQLCursor(config=...)")
+    parser.add_argument('--database', default='test_sqlfront_bench',
+                        help="database to (re)create the tables in (default: %(default)s)")
+    parser.add_argument('--persons', type=int, default=10 ** 4,
+                        help="Persons rows (default: %(default)s)")
+    parser.add_argument('--orders', type=int, default=10 ** 5,
+                        help="Orders rows (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--method', choices=('insert', 'load'), default='insert',
+                        help="multi-row INSERTs, or LOAD DATA LOCAL INFILE")
+    parser.add_argument('--chunk-rows', type=int, default=10000,
+                        help="rows per statement or load (default: %(default)s)")
+    parser.add_argument('--fake', action='store_true',
+                        help="dry run against the in-process fake driver (fakedriver.py)")
+    config = parser.parse_args(arguments)
+    if config.fake:
+        import fakedriver
+        fakedriver.install()
+    from sqlfront.mysql import MySQLCursor     # pylint: disable=wrong-import-position
+
+    keywords = {'local_infile': config.method == 'load'}
+    if config.config:
+        keywords['config'] = config.config
+    cursor = MySQLCursor(**keywords)
+    try:
+        if not cursor.exists(database=config.database):
+            cursor.create_database(config.database)
+        cursor.use(config.database)
+        last = []
+        def report(table, written):
+            if last and last[-1] != table:
+                print(file=sys.stderr)
+            last.append(table)
+            print("\r{0}: {1} rows".format(table, written), end='', file=sys.stderr)
+        rates = populate(cursor, config.persons, config.orders, seed=config.seed,
+                         method=config.method, chunk_rows=config.chunk_rows,
+                         report=report)
+        print(file=sys.stderr)
+        for table in ('Persons', 'Orders'):
+            print("{0:<8} {1:>12.0f} rows/s".format(table, rates[table]))
+    finally:
+        cursor.close()
+    return rates
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+End-to-end throughput of sqlfront's public API against a live MySQL (or a
+compatible local server), under 1 to 64 concurrent clients. Populate the
+benchmark database first (see generate.py), then:
+
+    python benchmarks/throughput.py --config sqlfront/test/connection.json \\
+        --clients 1 4 16 64 --duration 10 --output before.json
+    ... upgrade ...
+    python benchmarks/throughput.py ... --output after.json --compare before.json
+
+Workloads, each run for --duration seconds at each client count:
+    ingest  insert_many() batches into a scratch copy of Orders: rows/s
+    lookup  select() of one Orders row by random primary key: queries/s
+    scan    iterate() over Orders, split into one key range per client: MB/s
+Each client is a thread with a connection of its own, from a
+MySQLConnectionPool. Latency percentiles are per operation - per batch,
+query, or page. MB/s counts the data in fetched values (as MySQLQueryStats
+estimates it), not protocol overhead.
+
+--fake runs everything against the in-process fake driver (fakedriver.py):
+a dry run of the harness, or a measure of client-side overhead under
+concurrency.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import threading
+import collections
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# name --> Workload subclass
+WORKLOADS = collections.OrderedDict()
+
+def workload(klass):
+    """Register a Workload subclass."""
+    WORKLOADS[klass.name] = klass
+    return klass
+
+
+#==============================================================================
+#    Workloads
+#==============================================================================
+class Workload(object):
+    """A kind of operation run by every client. setup() runs once per client
+    count, on its own cursor; operations() is a generator per client, timed
+    between yields, yielding (rows, bytes) for each operation."""
+    name = None
+    def __init__(self, options):
+        self.options = options
+    def setup(self, cursor, clients):
+        pass
+    def operations(self, cursor, index, clients):
+        raise NotImplementedError
+
+@workload
+class Ingest(Workload):
+    name = 'ingest'
+    table = 'Orders_ingest'
+    def setup(self, cursor, clients):
+        cursor.execute("DROP TABLE IF EXISTS {0}".format(self.table))
+        cursor.execute("CREATE TABLE {0} LIKE Orders".format(self.table))
+        cursor._invalidate_schema(self.table)     # pylint: disable=W0212
+    def operations(self, cursor, index, clients):
+        from generate import orders
+        batch = self.options.batch_rows
+        rows = orders(10 ** 12, self.options.persons, seed=self.options.seed + index, start=None)
+        while True:
+            chunk = [dict(order_number=number, persons_id=person)
+                     for number, person in _take(rows, batch)]
+            cursor.insert_many(self.table, chunk, transaction=True)
+            yield len(chunk), 0
+
+@workload
+class Lookup(Workload):
+    name = 'lookup'
+    def setup(self, cursor, clients):
+        self.high = int(cursor.run("SELECT MAX(order_id) FROM Orders",
+                                   row_format='tuple')[0][0] or 1)
+    def operations(self, cursor, index, clients):
+        from sqlfront.mysql.mysqlstats import _payload_bytes
+        generator = random.Random(self.options.seed + index)
+        while True:
+            rows = cursor.select('Orders', where={'order_id': generator.randint(1, self.high)})
+            yield len(rows), _payload_bytes(rows)
+
+@workload
+class Scan(Workload):
+    name = 'scan'
+    def setup(self, cursor, clients):
+        from sqlfront.mysql.mysqlscan import key_ranges
+        self.ranges = key_ranges(cursor, 'Orders', clients)
+    def operations(self, cursor, index, clients):
+        from sqlfront.mysql.mysqlstats import _payload_bytes
+        if index >= len(self.ranges):
+            return
+        start, stop = self.ranges[index]
+        rows = cursor.iterate('Orders', start=start, stop=stop,
+                              page_size=self.options.page_size, row_format='tuple')
+        while True:
+            page = list(_take(rows, self.options.page_size))
+            if not page:
+                return
+            yield len(page), _payload_bytes(page)
+
+def _take(rows, count):
+    """The next 'count' items of an iterator (fewer, at its end)."""
+    for _ in xrange(count):
+        try:
+            yield next(rows)
+        except StopIteration:
+            return
+
+
+#==============================================================================
+#    Running
+#==============================================================================
+class _Client(threading.Thread):
+    """Runs one client's operations, from 'started' until 'deadline'."""
+    def __init__(self, pool, job, index, clients, started, timer):
+        super(_Client, self).__init__(name='sqlfront-bench-client')
+        self.daemon = True
+        self.pool, self.job, self.index, self.clients = pool, job, index, clients
+        self.started, self.timer = started, timer
+        self.latencies, self.rows, self.bytes, self.error = [], 0, 0, None
+
+    def run(self):
+        try:
+            with self.pool.checkout() as cursor:
+                operations = self.job.operations(cursor, self.index, self.clients)
+                self.started.wait()
+                deadline = self.timer() + self.job.options.duration
+                while True:
+                    start = self.timer()
+                    if start >= deadline:
+                        break
+                    try:
+                        rows, size = next(operations)
+                    except StopIteration:
+                        break
+                    self.latencies.append(self.timer() - start)
+                    self.rows += rows
+                    self.bytes += size
+        except Exception as exc:    # pylint: disable=broad-except
+            self.error = exc
+
+def run_level(pool, job, clients, timer):
+    """Run a workload with 'clients' clients. Returns its result record."""
+    with pool.checkout() as cursor:
+        job.setup(cursor, clients)
+    started = threading.Event()
+    threads = [_Client(pool, job, index, clients, started, timer) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    begin = timer()
+    started.set()
+    for thread in threads:
+        thread.join()
+    elapsed = timer() - begin
+    errors = [thread.error for thread in threads if thread.error is not None]
+    if errors:
+        raise errors[0]
+    latencies = sorted(latency for thread in threads for latency in thread.latencies)
+    rows = sum(thread.rows for thread in threads)
+    size = sum(thread.bytes for thread in threads)
+    return collections.OrderedDict([
+        ('clients', clients),
+        ('seconds', round(elapsed, 3)),
+        ('operations', len(latencies)),
+        ('operations_per_second', round(len(latencies) / elapsed, 1)),
+        ('rows_per_second', round(rows / elapsed, 1)),
+        ('mb_per_second', round(size / elapsed / 2 ** 20, 3)),
+        ('p50_ms', _percentile(latencies, 0.50)),
+        ('p95_ms', _percentile(latencies, 0.95)),
+        ('p99_ms', _percentile(latencies, 0.99)),
+    ])
+
+def _percentile(ordered, fraction):
+    """Percentile of sorted latencies, in milliseconds (None if empty)."""
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+def run(options):
+    """Run the selected workloads at each client count. Returns the results
+    document."""
+    from sqlfront.mysql import MySQLConnectionPool, MySQLCursor
+    from sqlfront.interfaces.sqllistener import clock
+    keywords = {}
+    if options.config:
+        keywords['config'] = options.config
+    if options.database:
+        keywords['database'] = options.database
+    pool = MySQLConnectionPool(klass=MySQLCursor, max_size=max(options.clients) + 1,
+                               **keywords)
+    results = collections.OrderedDict()
+    with pool:
+        with pool.checkout() as cursor:
+            version = cursor.run("SELECT VERSION()", row_format='tuple')[0][0]
+            table_rows = cursor.count('Orders')
+        for name in options.workloads:
+            job = WORKLOADS[name](options)
+            results[name] = []
+            for clients in options.clients:
+                record = run_level(pool, job, clients, clock)
+                results[name].append(record)
+                print("{0:<8} {1:>3} clients {2:>12.1f} ops/s {3:>12.1f} rows/s "
+                      "{4:>9.3f} MB/s  p99 {5} ms".format(
+                          name, clients, record['operations_per_second'],
+                          record['rows_per_second'], record['mb_per_second'],
+                          record['p99_ms']), file=sys.stderr)
+    return collections.OrderedDict([
+        ('label', options.label),
+        ('time', time.strftime('%Y-%m-%dT%H:%M:%S')),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('server', str(version)),
+        ('config', collections.OrderedDict([
+            ('orders', table_rows), ('duration', options.duration),
+            ('clients', options.clients), ('batch_rows', options.batch_rows),
+            ('page_size', options.page_size), ('seed', options.seed),
+            ('fake', options.fake),
+        ])),
+        ('results', results),
+    ])
+
+def compare(document, path):
+    """Print each result's ratio to a previous run (> 1: more throughput now)."""
+    with open(path) as previous_file:
+        previous = json.load(previous_file)['results']
+    for name, records in document['results'].items():
+        before = dict((record['clients'], record) for record in previous.get(name, ()))
+        for record in records:
+            if record['clients'] in before:
+                old = before[record['clients']]['rows_per_second']
+                print("{0:<8} {1:>3} clients {2:>12.1f} rows/s  x{3:.2f}".format(
+                    name, record['clients'], record['rows_per_second'],
+                    record['rows_per_second'] / max(old, 1e-9)))
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default=None,
+                        help="connection JSON file, as for MySQLCursor(config=...)")
+    parser.add_argument('--database', default='test_sqlfront_bench',
+                        help="database populated by generate.py (default: %(default)s)")
+    parser.add_argument('--workloads', nargs='*', choices=list(WORKLOADS),
+                        default=list(WORKLOADS))
+    parser.add_argument('--clients', nargs='*', type=int, default=[1, 4, 16, 64],
+                        help="client counts to run (default: %(default)s)")
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help="seconds per workload and client count (default: %(default)s)")
+    parser.add_argument('--batch-rows', type=int, default=1000,
+                        help="rows per ingest batch (default: %(default)s)")
+    parser.add_argument('--page-size', type=int, default=10000,
+                        help="rows per scan page (default: %(default)s)")
+    parser.add_argument('--persons', type=int, default=10 ** 4,
+                        help="Persons rows the database was generated with (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--label', default=None, help="label stored with the results")
+    parser.add_argument('--output', default=None, help="JSON file (default: stdout)")
+    parser.add_argument('--compare', default=None, help="previous JSON results to compare with")
+    parser.add_argument('--fake', action='store_true',
+                        help="run against the in-process fake driver (fakedriver.py)")
+    options = parser.parse_args(arguments)
+    if options.fake:
+        import fakedriver
+        fakedriver.install(rows=options.page_size,
+                           names=['order_id', 'order_number', 'persons_id'])
+
+    document = run(options)
+    text = json.dumps(document, indent=2, separators=(',', ': '))
+    if options.output:
+        with open(options.output, 'w') as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    if options.compare:
+        compare(document, options.compare)
+    return document
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 from __future__ import absolute_import
 import string
+import threading
+import itertools
 from .nonbindingmethod import NonBindingMethod
 
-__all__ = ['StringTemplate']
+__all__ = ['StringTemplate', 'CompiledTemplate', 'compile_template']
 
 class StringTemplate(str): #pylint: disable=too-many-public-methods
     """String - used for formatting statements. Unlike standard strings,
@@ -12,14 +14,12 @@ class StringTemplate(str): #pylint: disable=too-many-public-methods
         """Convert args & kwargs to forms supporting partial-application,
         and invoke formatting operation (vformat).
         Returns type StringTemplate."""
-        return StringTemplate(
-            self.vformat(FormatList(args), FormatDict(kwargs))
-        )
+        return StringTemplate(compile_template(self).render(args, kwargs))
     @NonBindingMethod
     def vformat(self, fargs, fkwargs):
         """Invoke vformat from string, on self.
         Returns string, not StringTemplate."""
-        return string.Formatter().vformat(self, fargs, fkwargs)
+        return compile_template(self).render(fargs, fkwargs)
 
 class FormatDict(dict):
     """Allows for 'partial' application of str.format()"""
@@ -33,4 +33,136 @@ class FormatList(list):
         except IndexError:
             return self.__missing__(index)
     def __missing__(self, index):
-        return "{" + str(index) + "}"
\ No newline at end of file
+        return "{" + str(index) + "}"
+
+
+
+#==============================================================================
+#    Compiled templates
+#==============================================================================
+class CompiledTemplate(object):
+    """A template, parsed once into (literal, field) segments. Rendering joins
+    the literal text with the formatted fields, without re-parsing.
+    Fields with no value provided are left in place (partial application).
+    Use compile_template(), which caches these per template string.
+
+    >>> CompiledTemplate("SELECT {0} FROM {table};").render(('id',), {})
+    'SELECT id FROM {table};'
+    """
+    __slots__ = ('template', 'segments', 'fields', 'parts', 'slots', 'bound', 'used')
+    def __init__(self, template):
+        self.template = template
+        segments, parts, slots = [], [], []
+        auto = 0
+        for literal, name, spec, conversion in string.Formatter().parse(template):
+            field = None
+            if literal:
+                parts.append(literal)
+            if name is not None:
+                if name == '':
+                    name, auto = str(auto), auto + 1
+                field = _Field(name, spec, conversion)
+                # Plain {name} and {0} fields are rendered inline by render()
+                simple = not (field.lookups or spec or conversion)
+                slots.append((
+                    len(parts), field.key, isinstance(field.key, (int, long)),
+                    None if simple else field
+                ))
+                parts.append(field.text)
+            segments.append((literal, field))
+        self.segments = tuple(segments)
+        self.fields = tuple(field.name for _, field in segments if field is not None)
+        # Literal text, with each field's slot holding its unformatted text
+        self.parts = tuple(parts)
+        # (index into parts, key, positional, _Field or None if plain)
+        self.slots = tuple(slots)
+        # Derived forms of the template, such as SQLCommand's bound statement
+        self.bound = {}
+        self.used = 0
+
+    def render(self, args, kwargs):
+        """Format the template with args and kwargs. Returns a string."""
+        parts = list(self.parts)
+        for index, key, positional, field in self.slots:
+            if field is not None:
+                parts[index] = field.render(args, kwargs)
+                continue
+            try:
+                value = args[key] if positional else kwargs[key]
+            except (IndexError, KeyError):
+                continue    # Not provided - leave the field in place
+            parts[index] = value if type(value) is str else format(value, '')
+        return ''.join(parts)
+
+    def __repr__(self):
+        return str.format("{0}({1!r})", type(self).__name__, self.template)
+
+class _Field(object):
+    """One replacement field of a CompiledTemplate."""
+    __slots__ = ('name', 'key', 'lookups', 'spec', 'conversion', 'spec_template', 'text')
+    def __init__(self, name, spec, conversion):
+        self.name, self.spec, self.conversion = name, spec, conversion
+        first, rest = name._formatter_field_name_split()
+        self.key = first
+        self.lookups = tuple(rest)
+        # Nested fields in the format spec, such as {value:{width}}
+        self.spec_template = CompiledTemplate(spec) if '{' in spec else None
+        self.text = "{" + name + ("!" + conversion if conversion else "") \
+                    + (":" + spec if spec else "") + "}"
+
+    def render(self, args, kwargs):
+        """Format this field's value, or return the field unchanged if no
+        value was provided."""
+        try:
+            if isinstance(self.key, (int, long)):
+                obj = args[self.key]
+            else:
+                obj = kwargs[self.key]
+        except (IndexError, KeyError):
+            return self.text
+        for is_attribute, key in self.lookups:
+            obj = getattr(obj, key) if is_attribute else obj[key]
+        if self.conversion == 'r':
+            obj = repr(obj)
+        elif self.conversion == 's':
+            obj = str(obj)
+        elif self.conversion:
+            raise ValueError("Unknown conversion specifier " + self.conversion)
+        if self.spec_template is not None:
+            return format(obj, self.spec_template.render(args, kwargs))
+        if not self.spec and type(obj) is str:
+            return obj
+        return format(obj, self.spec)
+
+
+#------------------------------------------------------------------------------
+#    Template cache
+#------------------------------------------------------------------------------
+# Maximum number of distinct template strings kept compiled
+CACHE_SIZE = 1024
+_cache = {}
+_cache_lock = threading.Lock()
+_clock = itertools.count()
+
+def compile_template(template):
+    """Return the CompiledTemplate for a template string, parsing it only on
+    first use. When more than CACHE_SIZE templates are cached, the least
+    recently used are dropped."""
+    compiled = _cache.get(template)
+    if compiled is None:
+        compiled = CompiledTemplate(template)
+        with _cache_lock:
+            compiled = _cache.setdefault(template, compiled)
+            if len(_cache) > CACHE_SIZE:
+                _evict()
+    # Hits only stamp the template, so the lookup itself needs no lock
+    compiled.used = next(_clock)
+    return compiled
+
+def _evict():
+    """Drop the least recently used quarter of the cache (at least enough to
+    get back to CACHE_SIZE), so eviction is not repeated on every miss."""
+    excess = len(_cache) - CACHE_SIZE + CACHE_SIZE // 4
+    oldest = sorted(_cache.items(), key=lambda item: item[1].used)[:excess]
+    for template, _ in oldest:
+        del _cache[template]
@@ -8,7 +8,8 @@ __all__ = [
     'SQLCommand',
     'SQLCursor',
     'SQLQuery',
-    'SQLError', 'SQLClosingError'
+    'SQLListener', 'SQLEvent',
+    'SQLError', 'SQLClosingError', 'SQLPoolTimeoutError'
 ]
 
 from .sqldialect import SQLDialect
@@ -18,6 +19,7 @@ from .sqlconnection import SQLConnection
 from .sqlcommand import SQLCommand
 from .sqlcursor import SQLCursor
 from .sqlquery import SQLQuery
+from .sqllistener import SQLListener, SQLEvent
 
 SQLDialect.registry = {
     'dialect': SQLDialect,
@@ -29,4 +31,4 @@ SQLDialect.registry = {
     'query': SQLQuery
 }
 
-from .sqlerror import SQLError, SQLClosingError
+from .sqlerror import SQLError, SQLClosingError, SQLPoolTimeoutError
@@ -1,12 +1,67 @@
 from abc import ABCMeta, abstractproperty, abstractmethod
 from .sqldialect import SQLDialect
-from ..extern.stringtemplate import StringTemplate
+from ..extern.stringtemplate import StringTemplate, compile_template
 
 __all__ = ['SQLCommand']
 
 class SQLCommand(SQLDialect, StringTemplate):
     __metaclass__ = ABCMeta
+
     def format(self, *args, **kwargs):
-        return SQLDialect.format(self, *args, **kwargs)
-    
-    
\ No newline at end of file
+        """Escape arguments for this command's dialect, and apply them to the
+        command. Fields not provided are left in place (partial application)."""
+        fargs = [self.escape(arg) for arg in args]
+        fkwargs = dict(
+            (key, self.escape(value))
+            for key, value in kwargs.items()
+        )
+        return type(self)(StringTemplate.format(self, *fargs, **fkwargs))   # pylint: disable=W0142
+
+    def compile(self):
+        """Return (statement, fields): the command with each {field} replaced by
+        the dialect's parameter placeholder, and the field names in order
+        (positional fields are named '0', '1', ...). Cached per command text."""
+        template = compile_template(self)
+        try:
+            return template.bound[type(self)]
+        except KeyError:
+            pass
+        parts = []
+        for literal, field in template.segments:
+            # Literal '%' would be read as a placeholder by the driver
+            parts.append(literal.replace('%', '%%'))
+            if field is None:
+                continue
+            if field.spec or field.conversion:
+                raise ValueError(str.format(
+                    "Cannot bind field '{0}' with a format spec or conversion.",
+                    field.name
+                ))
+            if field.lookups:
+                raise ValueError(str.format(
+                    "Cannot bind field '{0}': only plain names and indexes can be bound.",
+                    field.name
+                ))
+            parts.append(self.placeholder(field.name))
+        compiled = template.bound[type(self)] = (''.join(parts), template.fields)
+        return compiled
+
+    def bind(self, *args, **kwargs):
+        """Return (statement, parameters), to be run as execute(statement, parameters).
+        Unlike format(), values are not escaped into the command text - they are
+        passed to the driver. So the statement text is the same for every call.
+        Every field must be provided."""
+        statement, fields = self.compile()
+        parameters = {}
+        for field in fields:
+            try:
+                if field.isdigit():
+                    parameters[field] = args[int(field)]
+                else:
+                    parameters[field] = kwargs[field]
+            except (IndexError, KeyError):
+                raise KeyError(str.format(
+                    "No value provided for field '{0}' of command: {1}", field, self
+                ))
+        return statement, parameters
+
@@ -13,14 +13,19 @@ class SQLConnection(SQLDialect):
     close = abstractmethod(lambda self: NotImplemented)
 
     # Running queries and transactions
-    execute = abstractmethod(lambda self, command, parameters: NotImplemented)
-    results = abstractmethod(lambda self: NotImplemented)
+    execute = abstractmethod(lambda self, command, parameters, stream: NotImplemented)
+    results = abstractmethod(lambda self, size: NotImplemented)
     commit = abstractmethod(lambda self: NotImplemented)
+    rollback = abstractmethod(lambda self: NotImplemented)
 
     # Core connection objects
     cursor = abstractproperty(lambda self: NotImplemented)
     connection = abstractproperty(lambda self: NotImplemented)
     
+    # SQLListeners notified of commands run (see sqllistener.py). A tuple,
+    # replaced rather than mutated, so it can be read without a lock.
+    listeners = ()
+
     # Exceptions
     #SQLExceptionType = abstractproperty(lambda self: NotImplemented)
     #SQLDialectException = abstractproperty(lambda self: NotImplemented)
@@ -39,7 +44,33 @@ class SQLConnection(SQLDialect):
         except SQLClosingError:
             # Not closable
             return True
-    def run(self, command, parameters=None):
-        """Sugar for combining .execute(command) and .results() for simplicity of writing."""
-        self.execute(command, parameters)   # pylint: disable=E1120
+    def add_listener(self, listener):
+        """Notify 'listener' (a SQLListener) of commands run on this connection."""
+        self.listeners = self.listeners + (listener, )
+        return listener
+    def remove_listener(self, listener):
+        """Stop notifying 'listener'."""
+        self.listeners = tuple(each for each in self.listeners if each is not listener)
+    def _notify(self, hook, event):
+        """Call hook (a SQLListener method name) on each listener."""
+        for listener in self.listeners:
+            getattr(listener, hook)(event)
+    def iter_results(self, batch_size=1000):
+        """Iterate over the rows of the last command, fetching 'batch_size'
+        rows at a time, rather than all at once."""
+        while True:
+            rows = self.results(batch_size)     # pylint: disable=E1120
+            if not rows:
+                return
+            for row in rows:
+                yield row
+    def run(self, command, parameters=None, stream=False, batch_size=1000, **keywords):
+        """Sugar for combining .execute(command) and .results() for simplicity of writing.
+        If 'stream' is True, the command is executed unbuffered, and an
+        iterator over its rows is returned instead (see .iter_results()).
+        Other keywords (such as row_format) are passed on to .execute()."""
+        if stream:
+            self.execute(command, parameters, stream=True, **keywords)  # pylint: disable=E1120,E1123
+            return self.iter_results(batch_size)
+        self.execute(command, parameters, **keywords)   # pylint: disable=E1120
         return self.results()   # pylint: disable=E1120
@@ -13,3 +13,8 @@ class SQLDialect(object):
     def format(self, *args, **kwargs):
         """Apply formatting to command, after escaping all arguments."""
         return NotImplemented
+    @abstractmethod
+    def placeholder(self, name):
+        """Return the driver's parameter placeholder for a named field. Used to
+        send values separately from the command text (see SQLCommand.bind)."""
+        return NotImplemented
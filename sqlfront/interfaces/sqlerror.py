@@ -1,5 +1,5 @@
 
-__all__ = ['SQLError', 'SQLClosingError']
+__all__ = ['SQLError', 'SQLClosingError', 'SQLPoolTimeoutError']
 
 class SQLError(Exception):
     pass
@@ -7,6 +7,9 @@ class SQLError(Exception):
 class SQLClosingError(SQLError):
     """Error related to closing a connection."""
 
+class SQLPoolTimeoutError(SQLError):
+    """No pooled connection became available before the checkout timeout."""
+
 # Should probably have multiple sub-types
 # such as:
 # (1) Incorrect argument types to functions
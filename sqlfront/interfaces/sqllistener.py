@@ -0,0 +1,64 @@
+"""
+Listeners observe the commands a SQLConnection runs, without wrapping or
+patching the driver:
+
+    class Timer(SQLListener):
+        def after_execute(self, event):
+            print event.duration, event.command
+
+    connection.add_listener(Timer())
+
+Hooks receive a SQLEvent. Exceptions raised by a hook propagate to the caller
+of execute() or results().
+"""
+import time
+import timeit
+
+__all__ = ['SQLListener', 'SQLEvent', 'clock']
+
+# Monotonic where available (Python 3); otherwise the best timer for the platform
+clock = getattr(time, 'monotonic', timeit.default_timer)
+
+
+class SQLEvent(object):
+    """What a connection did, as passed to SQLListener hooks.
+
+    connection: the SQLConnection.
+    command, parameters: the statement text and parameters, as sent to the
+        driver (SQLCommand fields already bound).
+    duration: seconds the driver call took (None in before_execute).
+    rows: rows affected (execute) or fetched (results); None if unknown.
+    result: the rows fetched, as returned by the driver (after_fetch only).
+    error: the exception raised, for on_error.
+    phase: 'execute' or 'fetch' - the call that raised, for on_error.
+    """
+    __slots__ = ('connection', 'command', 'parameters', 'duration', 'rows',
+                 'result', 'error', 'phase')
+    def __init__(self, connection, command, parameters=None, phase='execute'):
+        self.connection, self.command, self.parameters = connection, command, parameters
+        self.phase = phase
+        self.duration = self.rows = self.result = self.error = None
+
+    @property
+    def connection_id(self):
+        """Identity of the connection, stable while it is open."""
+        return id(self.connection)
+
+    def __repr__(self):
+        return str.format("{0}(phase={1!r}, command={2!r}, duration={3}, rows={4})",
+                          type(self).__name__, self.phase, self.command,
+                          self.duration, self.rows)
+
+
+class SQLListener(object):
+    """Base class for listeners: override the hooks wanted. Hooks run on the
+    thread calling the connection, so should be quick."""
+    def before_execute(self, event):
+        """Called before a command is sent."""
+    def after_execute(self, event):
+        """Called once a command has run. event.rows is the count affected."""
+    def after_fetch(self, event):
+        """Called once rows are fetched by results(). event.rows is the number
+        fetched - per batch, for streamed or partial fetches."""
+    def on_error(self, event):
+        """Called when the driver raises, before the exception propagates."""
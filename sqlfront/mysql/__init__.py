@@ -10,19 +10,25 @@ __all__ = [
     'MySQLCursor',
     'MySQLQuery',
     'MySQLError',
+    'MySQLConnectionPool',
+    'MySQLSchemaCache',
+    'MySQLQueryCache',
+    'MySQLBatchLoader',
+    'parallel_scan',
+    'AsyncMySQLConnection',
+    'AsyncMySQLCursor',
+    'MySQLQueryStats',
+    'MySQLPhaseTimer',
 ]
 
-# STUBS: Currently importing from stubs. Will be filled as completed
-from .stubs import (
-    MySQLDialect,
-    MySQLInterface,
-    MySQLSyntax,
-    MySQLConnection,
-    MySQLCommand,
-    MySQLCursor,
-    MySQLQuery,
-    MySQLError
-)
+from .mysqldialect import MySQLDialect
+from .mysqlinterface import MySQLInterface
+from .mysqlsyntax import MySQLSyntax
+from .mysqlconnection import MySQLConnection
+from .mysqlcommand import MySQLCommand
+from .mysqlcursor import MySQLCursor
+from .mysqlquery import MySQLQuery
+from .mysqlerror import MySQLError
 
 MySQLDialect.registry = {
     'dialect': MySQLDialect,
@@ -36,12 +42,11 @@ MySQLDialect.registry = {
 
 MySQL = MySQLCursor
 
-from .mysqldialect import SQLDialect
-from .mysqlinterface import SQLInterface
-from .mysqlsyntax import SQLSyntax
-from .mysqlconnection import SQLConnection
-from .mysqlcommand import SQLCommand
-from .mysqlcursor import SQLCursor
-from .mysqlquery import SQLQuery
-
-from .mysqlerror import SQLError
+from .mysqlpool import MySQLConnectionPool
+from .mysqlschema import MySQLSchemaCache
+from .mysqlquerycache import MySQLQueryCache
+from .mysqlloader import MySQLBatchLoader
+from .mysqlscan import parallel_scan
+from .mysqlasync import AsyncMySQLConnection, AsyncMySQLCursor
+from .mysqlstats import MySQLQueryStats
+from .mysqlphases import MySQLPhaseTimer
@@ -0,0 +1,196 @@
+"""
+Asynchronous variants of MySQLConnection and MySQLCursor, for applications
+that must not block on the database.
+
+MySQLdb calls block, so each async connection runs them on a worker thread of
+its own, and its methods return an OffloadFuture at once. Offloading is
+bounded by the number of connections: one thread each, and calls on one
+connection run in the order they were made (as MySQLdb requires).
+
+Wait for a future with .result(), or have it call back with
+.add_done_callback() - on the worker thread:
+
+    cursor = AsyncMySQLCursor(config='connection.json')
+    pending = cursor.run("SELECT * FROM Orders WHERE persons_id = %s", (3,))
+    ...
+    rows = pending.result()
+
+To stream rows, execute(..., stream=True), then call results(size) for each
+batch, until it returns no rows.
+"""
+from __future__ import absolute_import
+import threading
+import Queue
+from .mysqldialect import MySQLDialect
+from .mysqlconnection import MySQLConnection
+from .mysqlcursor import MySQLCursor
+from ..interfaces import SQLConnection
+from ..interfaces import SQLClosingError
+from ..util.offload import OffloadFuture
+
+__all__ = ['AsyncMySQLConnection', 'AsyncMySQLCursor', 'OffloadFuture']
+
+def _completed(result):
+    """An OffloadFuture, already finished."""
+    future = OffloadFuture()
+    future.set_result(result)
+    return future
+
+
+class _Worker(threading.Thread):
+    """Runs calls from a queue, one at a time, in order."""
+    def __init__(self):
+        super(_Worker, self).__init__(name='sqlfront-async-worker')
+        self.daemon = True
+        self.calls = Queue.Queue()
+
+    def submit(self, function, *args, **keywords):
+        future = OffloadFuture()
+        self.calls.put((future, function, args, keywords))
+        return future
+    def stop(self):
+        """Exit once the calls already submitted have run."""
+        self.calls.put(None)
+
+    def run(self):
+        while True:
+            call = self.calls.get()
+            if call is None:
+                return
+            future, function, args, keywords = call
+            try:
+                result = function(*args, **keywords)
+            except BaseException as exc:    # pylint: disable=broad-except
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+class AsyncMySQLConnection(SQLConnection, MySQLDialect):
+    """MySQLConnection whose blocking methods run on a worker thread, and
+    return an OffloadFuture. Keywords are as for MySQLConnection; the
+    connection is opened on the worker thread, by the first command run
+    (or by open()).
+
+    'sync' is the underlying MySQLConnection. Do not call its methods
+    directly while calls on this connection are outstanding.
+
+    Done-callbacks of the futures run on the worker thread, not the
+    caller's: an event loop must hand results back to its own thread
+    with its thread-safe call (e.g. loop.call_soon_threadsafe).
+    """
+    klass = MySQLConnection
+
+    def __init__(self, **keywords):
+        keywords.setdefault('lazy', True)
+        self.sync = self.klass(**keywords)
+        self._worker = _Worker()
+        self._worker.start()
+        self._closed = False
+
+    def _offload(self, function, *args, **keywords):
+        """Run function(*args, **keywords) on the worker thread."""
+        if self._closed:
+            raise SQLClosingError("Connection is closed.")
+        return self._worker.submit(function, *args, **keywords)
+
+    #----------------------------------------------------------------
+    # Establishing & querying connection
+    #----------------------------------------------------------------
+    @property
+    def opened(self):
+        return self.sync.opened
+    @property
+    def cursor(self):
+        return self.sync.cursor
+    @property
+    def connection(self):
+        return self.sync.connection
+    @property
+    def listeners(self):
+        return self.sync.listeners
+    def add_listener(self, listener):
+        """Notify 'listener' of commands run - on the worker thread."""
+        return self.sync.add_listener(listener)
+    def remove_listener(self, listener):
+        self.sync.remove_listener(listener)
+    def open(self, **keywords):
+        """Open the connection. Returns a future."""
+        return self._offload(self.sync.open, **keywords)
+    def close(self):
+        """Close the connection, once calls already made have run, and stop
+        the worker thread. Returns a future."""
+        if self._closed:
+            return _completed(None)
+        future = self._offload(self.sync.close)
+        self._closed = True
+        self._worker.stop()
+        return future
+
+    #----------------------------------------------------------------
+    # Running queries and transactions
+    #----------------------------------------------------------------
+    def execute(self, command, parameters=None, stream=False, **keywords):
+        """As MySQLConnection.execute(). Returns a future."""
+        return self._offload(self.sync.execute, command, parameters,
+                             stream=stream, **keywords)
+    def results(self, size=None, **keywords):
+        """As MySQLConnection.results(). Returns a future."""
+        return self._offload(self.sync.results, size, **keywords)
+    def iter_results(self, batch_size=1000):
+        """Not available: iterating would block on each batch. Fetch
+        batches with results(size), until it returns no rows."""
+        raise ValueError("Cannot iterate over results asynchronously. "
+            "Use results(size) for each batch, until it returns no rows.")
+    def run(self, command, parameters=None, **keywords):
+        """As MySQLConnection.run(), for buffered results. Returns a future.
+        To stream rows, execute(..., stream=True), then fetch batches with
+        results(size)."""
+        if keywords.get('stream'):
+            raise ValueError("Cannot run() a streamed command asynchronously. "
+                "Use execute(command, stream=True), then results(size).")
+        return self._offload(self.sync.run, command, parameters, **keywords)
+    def commit(self):
+        """Commit the current transaction. Returns a future."""
+        return self._offload(self.sync.commit)
+    def rollback(self):
+        """Discard uncommitted changes. Returns a future."""
+        return self._offload(self.sync.rollback)
+
+    #----------------------------------------------------------------
+    # Context managers
+    #----------------------------------------------------------------
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close().result()
+        return False
+
+    def __repr__(self):
+        return str.format("{0}({1!r})", type(self).__name__, self.sync)
+
+
+class AsyncMySQLCursor(AsyncMySQLConnection):
+    """Async variant of MySQLCursor: an AsyncMySQLConnection, with
+    MySQLInterface methods (insert, select, count, ...) that return futures.
+    Keywords are as for MySQLCursor.
+
+    Methods returning a generator or context manager - iterate(),
+    key_table() - and loader() are not offloaded; they are only available
+    on 'sync'."""
+    klass = MySQLCursor
+
+def _offloaded(name):
+    """Method running MySQLCursor.<name>() on the worker thread."""
+    def method(self, *args, **keywords):
+        return self._offload(getattr(self.sync, name), *args, **keywords)    # pylint: disable=W0212
+    method.__name__ = name
+    method.__doc__ = str.format("As MySQLCursor.{0}(). Returns a future.", name)
+    return method
+
+for _name in ('insert', 'insert_many', 'upsert_many', 'load', 'select', 'get_many',
+              'select_keys', 'existing_keys', 'delete_keys', 'databases', 'tables',
+              'columns', 'column_types', 'exists', 'exists_many', 'rows_exist',
+              'columns_exist', 'tables_exist', 'databases_exist', 'count',
+              'primary_key', 'primary_keys', 'describe', 'drop', 'create_database',
+              'rename_database', 'current_database', 'use', 'create_table',
+              'copy_table', 'max_allowed_packet'):
+    setattr(AsyncMySQLCursor, _name, _offloaded(_name))
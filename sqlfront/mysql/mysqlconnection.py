@@ -19,17 +19,72 @@
 """
 from __future__ import absolute_import
 #from abc import ABCMeta, abstractmethod, abstractproperty
+import re
 import sys
+import collections
 import MySQLdb
+from MySQLdb.constants import FIELD_TYPE
 from .mysqldialect import MySQLDialect
-from .mysqlerror import MySQLClosingError
-from ..interfaces import SQLConnection
+from .mysqlerror import MySQLError, MySQLClosingError
+from ..interfaces import SQLConnection, SQLCommand, SQLEvent
+from ..interfaces.sqllistener import clock
 from ..util.utilities import _read_config
+from ..util.rows import row_class, columnar, validate_row_format
+from .mysqlquerycache import MySQLQueryCache, read_tables, written_tables, used_database
 from ..extern import rich_core
 from ..extern import clsproperty
 from ..extern.nulltype import NotPassed, NotPassedType, NullType
     
 class MySQLConnection(SQLConnection, MySQLDialect):
+    # Class-level Defaults for connection parameters
+    host = "127.0.0.1"
+    user = "root"
+    password = None
+    port = 3306
+    socket = None
+    database = None
+
+    # If True, connecting is deferred until the first execute()
+    lazy = False
+
+    # Default representation of result rows: 'dict', 'tuple' or 'row'
+    row_format = 'dict'
+
+    # Client-side permission for LOAD DATA LOCAL INFILE (None: driver default)
+    local_infile = None
+
+    # Autocommit mode of the session (None: driver default, which is off)
+    autocommit = None
+
+    # Set by MySQLConnectionPool while this connection is checked out
+    pool = None
+
+    # Optional MySQLQueryCache, consulted by run() (see mysqlquerycache.py)
+    query_cache = None
+    # Optional SingleFlight, coalescing identical concurrent SELECTs in run()
+    single_flight = None
+    # Tables written since the last commit/rollback, while either is set
+    _uncommitted = None
+    # Whether a transaction may be open, while either is set: its reads can
+    # come from an older snapshot, so are not stored in the query_cache
+    _in_transaction = False
+
+    # Core MySQLdb objects. None until the connection is opened.
+    _cursor = None
+    _connection = None
+    # Unbuffered cursor of the last execute(stream=True), until exhausted
+    _stream = None
+    # Buffered cursors for row formats other than self.row_format
+    _cursors = None
+    # Cursor used by the last execute(), and the row format it was run with
+    _active = None
+    _active_format = None
+    # (command, parameters) of the last execute(), while there are listeners
+    _active_command = None
+    # Number of execute() calls, so iter_results() can tell its command's
+    # rows from those of a later one
+    _executed = 0
+
 #     # Class-level Defaults for connection parameters
 #     _host = "127.0.0.1" #str
 #     _user = "root" #str
@@ -57,23 +112,51 @@ class MySQLConnection(SQLConnection, MySQLDialect):
     
     
     
-    def __init__(self, **keywords):
+    def __init__(self, lazy=NotPassed, row_format=NotPassed, local_infile=NotPassed,
+                 autocommit=NotPassed, query_cache=NotPassed, single_flight=NotPassed,
+                 listeners=NotPassed, **keywords):
         """
         Parameters:
         host, user, passwd, default_db
         config: path of JSON configuration file. This is an alternative to
             directly supplying host, user, passwd, and default_db information.
+        lazy: if True, the connection is not opened until the first
+            .execute(). Objects that never run a command never connect.
+        row_format: default representation of result rows. One of 'dict'
+            (default), 'tuple', 'row' (compact Row objects), or 'columnar'
+            (one array per column). See util/rows.py.
+        local_infile: if True, allow LOAD DATA LOCAL INFILE (MySQLInterface.load).
+        autocommit: if True, each statement outside START TRANSACTION is
+            committed as it runs. Off by default; a query_cache only stores
+            reads made outside a transaction.
+        query_cache: a MySQLQueryCache, to serve repeated run() of SELECTs.
+            Share one between connections (or pass it to a pool).
+        single_flight: a SingleFlight, shared between connections (or passed
+            to a pool). Identical SELECTs run at the same time on connections
+            sharing it are sent to the server once (see util/singleflight.py).
+        listeners: sequence of SQLListeners, notified before and after each
+            command, fetch, and error (see interfaces/sqllistener.py).
         warnings: whether or not warnings will be shown when executing SQL via
             .run() or .execute() is...
         """
-        print('--')
-        import pdb
-        pdb.set_trace()
-        print('--')
-        
         (self.host, self.user, self.password,
             self.port, self.socket, self.database) = self._validate(**keywords)
-        self.cursor, self.connection = self.open()
+        if lazy is not NotPassed:
+            self.lazy = lazy
+        if row_format is not NotPassed:
+            self.row_format = validate_row_format(row_format)
+        if local_infile is not NotPassed:
+            self.local_infile = local_infile
+        if autocommit is not NotPassed:
+            self.autocommit = autocommit
+        if query_cache is not NotPassed:
+            self.query_cache = query_cache
+        if single_flight is not NotPassed:
+            self.single_flight = single_flight
+        if listeners is not NotPassed:
+            self.listeners = tuple(listeners)
+        if not self.lazy:
+            self.cursor, self.connection = self.open()
 
     
     
@@ -88,9 +171,8 @@ class MySQLConnection(SQLConnection, MySQLDialect):
             config = _read_config(keywords.pop('config'))
         else:
             config = {}
-        #Combine config file with keywords and set defaults
-        # self.parameters should return class-level defaults
-        parameters = rich_core.defaults(keywords, config, self.parameters)
+        #Combine config file with keywords
+        parameters = rich_core.defaults(keywords, config)
         
         if 'db' in parameters:
             parameters['database'] = parameters.pop('db')
@@ -101,9 +183,9 @@ class MySQLConnection(SQLConnection, MySQLDialect):
         if 'unix_socket' in parameters:
             parameters['socket'] = parameters.pop('unix_socket')
         
-        return (parameters['host'], parameters['user'],
-            parameters['password'], parameters['port'],
-            parameters['socket'], parameters['database'])
+        #Anything not provided falls back to the class-level defaults
+        names = ('host', 'user', 'password', 'port', 'socket', 'database')
+        return tuple(parameters.get(name, getattr(self, name)) for name in names)
 
 
 
@@ -120,12 +202,36 @@ class MySQLConnection(SQLConnection, MySQLDialect):
             passwd= self.password,
             db = self.database,
             port = self.port,
-            unix_socket = self.socket
+            unix_socket = self.socket,
+            local_infile = None if self.local_infile is None else int(self.local_infile),
+            autocommit = None if self.autocommit is None else bool(self.autocommit)
         )
     @property
+    def cursor(self):
+        """Basic getter for cursor property."""
+        return self._cursor
+    @cursor.setter
+    def cursor(self, value):
+        """Basic setter for cursor property."""
+        self._cursor = value
+    @property
+    def connection(self):
+        """Basic getter for connection property."""
+        return self._connection
+    @connection.setter
+    def connection(self, value):
+        """Basic setter for connection property."""
+        self._connection = value
+    @property
     def opened(self):
         """Predicate. Is the connection open?"""
+        if self.deferred:
+            return False
         return bool(self.connection.open)
+    @property
+    def deferred(self):
+        """Predicate. Is opening the connection still deferred (lazy mode)?"""
+        return self.connection is None
 
     def open(self, **keywords):
         """Open the connection, based on connection parameters specified in
@@ -136,32 +242,36 @@ class MySQLConnection(SQLConnection, MySQLDialect):
         # Filter out values set to 'None'
         params = dict(
             (key, value) for key, value
-            in {}.update(self.parameters, **keywords)
+            in rich_core.defaults(keywords, self.parameters).items()
             if not isinstance(value, NullType)
         )
+        # 'db' is selected during the handshake - no separate USE round trip
         connection = MySQLdb.connect(**params)
-        cursor = connection.cursor(MySQLdb.cursors.DictCursor)
-        if not isinstance(params.get('database', None), NullType):
-            cursor.execute("USE {0}".format(params['database']))
+        cursor = connection.cursor(_cursor_class(self.row_format))
         return (cursor, connection)
-        
-
-    def open(self, **keywords):
-        """Open the connection, based on connection parameters specified in keywords.
-        Note: this is a more modern version of initialize().
-        """
-        params = {}.update(self.parameters, **keywords)
-        connection = MySQLdb.connect(
-            params['host'], params['user'], params['passwd'],
-            unix_socket=params['unix_socket']
-        )
+    def _open_deferred(self):
+        """Open the connection, if lazy mode has not opened it yet."""
+        if self.deferred:
+            self.cursor, self.connection = self.open()
 
-        cursor = connection.cursor(MySQLdb.cursors.DictCursor)
-        if params.get('default_db', None) != None:
-            cursor.execute("USE {0}".format(params['default_db']))
-        return (cursor, connection)
+    def ping(self):
+        """Predicate. Is the server still reachable over this connection?
+        A lazy connection not yet opened is opened to find out."""
+        try:
+            self._open_deferred()
+            self.connection.ping()
+        except MySQLdb.Error:
+            return False
+        return True
     def close(self):
         """Close the cursor and the connection objects."""
+        if self.deferred:
+            # Never opened - nothing to close
+            return
+        self._close_stream()
+        for cursor in (self._cursors or {}).values():
+            cursor.close()
+        self._cursors = None
         try:
             self.cursor.close()
         except MySQLdb.ProgrammingError:
@@ -177,10 +287,14 @@ class MySQLConnection(SQLConnection, MySQLDialect):
     def __enter__(self, *args, **kwargs):
         return self
     def __exit__(self, exc_type=NotPassed, exc_value=NotPassed, exc_traceback=NotPassed):
-        try:
-            self.close()
-        except (MySQLClosingError):
-            pass
+        if self.pool is not None:
+            # Pooled connections are handed back, rather than closed
+            self.pool.checkin(self)
+        else:
+            try:
+                self.close()
+            except (MySQLClosingError):
+                pass
         if exc_type is NotPassed:
             return True
         else:
@@ -189,10 +303,21 @@ class MySQLConnection(SQLConnection, MySQLDialect):
     #----------------------------------------------------------------
     # Running queries and transactions
     #----------------------------------------------------------------
-    def execute(self, command, parameters=None):
+    def execute(self, command, parameters=None, stream=False, row_format=NotPassed):
         """Execute a command, accepts params to insert into command
         (used to combat sql-inject).
 
+        If 'stream' is True, the command runs on an unbuffered server-side
+        cursor (SSDictCursor): rows are only transferred as they are fetched.
+        The connection cannot run anything else until those rows are read,
+        so any unfinished stream is discarded by the next execute().
+
+        'row_format' overrides the connection's row_format for this command.
+
+        If command is a SQLCommand, its {fields} are bound to 'parameters' (a
+        sequence for positional fields, or a mapping for named ones), and the
+        values sent to the driver separately - see SQLCommand.bind().
+
         MySQLdb.cursor.execute() returns a 'long' of # rows affected.
         """
         # if self.warnings:
@@ -200,12 +325,249 @@ class MySQLConnection(SQLConnection, MySQLDialect):
         #         return self.cursor.execute(command, parameters)
         # else:
         #     return self.cursor.execute(command, parameters)
-        return self.cursor.execute(command, parameters)
-    def results(self, size=None):
-        if isinstance(size, type(None)):
-            return self.cursor.fetchall()
+        if isinstance(command, SQLCommand):
+            command, parameters = self._bind(command, parameters)
+        if row_format is NotPassed:
+            row_format = self.row_format
+        else:
+            validate_row_format(row_format)
+        self._open_deferred()
+        self._close_stream()
+        self._executed += 1
+        if stream:
+            cursor = self._stream = self.connection.cursor(
+                _cursor_class(row_format, stream=True))
+        else:
+            cursor = self._buffered_cursor(row_format)
+        self._active, self._active_format = cursor, row_format
+        if self.listeners:
+            affected = self._observed_execute(cursor, command, parameters)
+        else:
+            affected = cursor.execute(command, parameters)
+        if self.query_cache is not None or self.single_flight is not None:
+            self._track_written(command)
+            self._track_transaction(command)
+        # Schema and query cache keys use the current database
+        database = used_database(command)
+        if database is not None:
+            self.database = database
+        return affected
+    def _observed_execute(self, cursor, command, parameters):
+        """cursor.execute(), notifying listeners."""
+        self._active_command = (command, parameters)
+        event = SQLEvent(self, command, parameters)
+        self._notify('before_execute', event)
+        start = clock()
+        try:
+            affected = cursor.execute(command, parameters)
+        except Exception as exc:
+            event.duration, event.error = clock() - start, exc
+            self._notify('on_error', event)
+            raise
+        event.duration, event.rows = clock() - start, affected
+        self._notify('after_execute', event)
+        return affected
+    def run(self, command, parameters=None, stream=False, batch_size=1000, **keywords):
+        """As SQLConnection.run(). Buffered SELECTs are:
+            answered from the query_cache when possible, and
+            coalesced with identical ones already running on other connections
+            sharing this one's single_flight,
+        except while this connection has uncommitted writes, which other
+        connections must not see."""
+        cache, flight = self.query_cache, self.single_flight
+        if (cache is None and flight is None) or stream or self._uncommitted:
+            return super(MySQLConnection, self).run(
+                command, parameters, stream, batch_size, **keywords)
+        tables = read_tables(command)
+        key = None
+        if tables is not None:
+            key = MySQLQueryCache.key(
+                command, parameters, keywords.get('row_format', self.row_format),
+                self.database)
+        if key is None:
+            return super(MySQLConnection, self).run(command, parameters, **keywords)
+        if cache is not None:
+            rows = cache.get(key)
+            if rows is not None:
+                return rows
+        if self._in_transaction:
+            # Rows may be from this transaction's snapshot - not to be shared
+            return super(MySQLConnection, self).run(command, parameters, **keywords)
+        if flight is not None:
+            return flight.do(key, self._fetch, key, tables, command, parameters, keywords)
+        return self._fetch(key, tables, command, parameters, keywords)
+    def _fetch(self, key, tables, command, parameters, keywords):
+        """Run a SELECT for run(), and store its rows in the query_cache -
+        unless its tables were written meanwhile."""
+        cache = self.query_cache
+        generation = cache.generation(tables) if cache is not None else None
+        rows = super(MySQLConnection, self).run(command, parameters, **keywords)
+        if cache is not None:
+            cache.set(key, rows, tables, generation)
+        return rows
+    def _track_written(self, command):
+        """Note tables the command may have changed, and invalidate their
+        cached results."""
+        tables = written_tables(command)
+        if tables:
+            if self.query_cache is not None:
+                self.query_cache.invalidate(tables)
+            if self._uncommitted is None:
+                self._uncommitted = set()
+            self._uncommitted.update(tables)
+    def _track_transaction(self, command):
+        """Note whether the command may have left a transaction open."""
+        if _TRANSACTION_END.match(command):
+            self._in_transaction = False
+        elif not self.autocommit or _TRANSACTION_START.match(command):
+            self._in_transaction = True
+    @staticmethod
+    def _bind(command, parameters):
+        """Bind parameters to a SQLCommand's fields."""
+        if isinstance(parameters, NullType):
+            return command.bind()
+        elif isinstance(parameters, collections.Mapping):
+            return command.bind(**parameters)
+        return command.bind(*parameters)
+    def _buffered_cursor(self, row_format):
+        """The buffered cursor returning rows suited to row_format."""
+        klass = _cursor_class(row_format)
+        if type(self.cursor) is klass:
+            return self.cursor
+        if self._cursors is None:
+            self._cursors = {}
+        if klass not in self._cursors:
+            self._cursors[klass] = self.connection.cursor(klass)
+        return self._cursors[klass]
+    def results(self, size=None, format=NotPassed):    # pylint: disable=W0622
+        """Fetch results of the last command - all of them, or the next 'size' rows.
+
+        'format' defaults to the row_format the command was executed with.
+        Any row format may be requested; but executing with the format
+        wanted avoids converting rows after fetching them. For example,
+        format='columnar' returns an OrderedDict of column name to column,
+        and is cheapest after executing with row_format='columnar'.
+        """
+        if self.deferred:
+            raise MySQLError("No results: no command has been executed on this connection.")
+        cursor = self._active if self._active is not None else self.cursor
+        if self.listeners:
+            rows = self._observed_fetch(cursor, size)
+        elif isinstance(size, type(None)):
+            rows = cursor.fetchall()
         else: # assumes size is an integer
-            return self.cursor.fetchmany(size)
+            rows = cursor.fetchmany(size)
+        if format is NotPassed:
+            format = self._active_format or self.row_format
+        else:
+            validate_row_format(format)
+        return self._format_rows(rows, cursor.description, format)
+    def _observed_fetch(self, cursor, size):
+        """Fetch rows for results(), notifying listeners."""
+        command, parameters = self._active_command or (None, None)
+        event = SQLEvent(self, command, parameters, phase='fetch')
+        start = clock()
+        try:
+            rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+        except Exception as exc:
+            event.duration, event.error = clock() - start, exc
+            self._notify('on_error', event)
+            raise
+        event.duration, event.rows, event.result = clock() - start, len(rows), rows
+        self._notify('after_fetch', event)
+        return rows
+    def _format_rows(self, rows, description, row_format):
+        """Convert rows, as fetched for the last execute(), to row_format."""
+        fetched = self._active_format or self.row_format
+        if description is None or row_format == fetched == 'dict':
+            return rows
+        names = [column[0] for column in description]
+        if fetched == 'dict':
+            rows = [tuple(row[name] for name in names) for row in rows]
+        if row_format == 'dict':
+            return [dict(zip(names, row)) for row in rows]
+        elif row_format == 'row':
+            make = row_class(names)._make
+            return [make(row) for row in rows]
+        elif row_format == 'columnar':
+            return columnar(names, rows, [
+                _ARRAY_TYPECODES.get(column[1]) for column in description
+            ])
+        return rows
+    def iter_results(self, batch_size=1000):
+        """Iterate over the rows of the last command, 'batch_size' rows
+        at a time. A streaming cursor is released once it is exhausted.
+
+        The iterator is bound to that command: if another is executed
+        before it is exhausted, the rows left are gone (a stream is
+        discarded), and reading on raises MySQLError."""
+        if self._active_format == 'columnar':
+            raise ValueError("Columnar results cannot be iterated by row. "
+                "Fetch column batches with .results(size) instead.")
+        return self._iter_command(self._executed, self._stream, batch_size)
+    def _iter_command(self, executed, stream, batch_size):
+        """Rows of the 'executed'th command, for iter_results()."""
+        try:
+            while True:
+                if self._executed != executed:
+                    raise MySQLError("Results are no longer available: another command "
+                                     "was executed before they were read.")
+                rows = self.results(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield row
+        finally:
+            if stream is not None and stream is self._stream:
+                self._close_stream()
+    def _close_stream(self):
+        """Release the unbuffered cursor, reading off any rows left unfetched."""
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            try:
+                stream.close()
+            except MySQLdb.Error:
+                pass
     def commit(self):
-        """Commit any pending results to the database."""
-        return self.connection.commit()
+        """Commit any pending results to the database. A no-op while a lazy
+        connection has not been opened - nothing can be pending."""
+        if self.deferred:
+            return None
+        result = self.connection.commit()
+        if self._uncommitted and self.query_cache is not None:
+            # Other connections may have cached the old rows meanwhile
+            self.query_cache.invalidate(self._uncommitted)
+        self._uncommitted = None
+        self._in_transaction = False
+        return result
+    def rollback(self):
+        """Discard any uncommitted changes. A no-op while a lazy connection
+        has not been opened."""
+        self._uncommitted = None
+        self._in_transaction = False
+        if self.deferred:
+            return None
+        return self.connection.rollback()
+
+
+# Statements opening and closing a transaction explicitly
+_TRANSACTION_START = re.compile(r"^\s*(?:BEGIN|START\s+TRANSACTION)\b", re.I)
+_TRANSACTION_END = re.compile(r"^\s*(?:COMMIT|ROLLBACK)\b(?!\s+TO\b)", re.I)
+
+# MySQL column types --> array.array typecode for columnar results
+_ARRAY_TYPECODES = dict(
+    [(code, 'l') for code in (FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.LONG,
+        FIELD_TYPE.INT24, FIELD_TYPE.LONGLONG, FIELD_TYPE.YEAR)]
+    + [(code, 'd') for code in (FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE)]
+)
+
+def _cursor_class(row_format, stream=False):
+    """MySQLdb cursor class to fetch rows for row_format with.
+    All formats but 'dict' fetch plain tuples from the driver."""
+    if row_format == 'dict':
+        if stream:
+            return MySQLdb.cursors.SSDictCursor
+        return MySQLdb.cursors.DictCursor
+    if stream:
+        return MySQLdb.cursors.SSCursor
+    return MySQLdb.cursors.Cursor
@@ -5,4 +5,13 @@ from .mysqlconnection import MySQLConnection
 
 
 class MySQLCursor(SQLCursor, MySQLConnection, MySQLInterface):
-    pass
+    def __init__(self, schema_cache=None, **keywords):
+        """
+        Parameters:
+        schema_cache: MySQLSchemaCache to share with other cursors. By default,
+            each cursor creates its own on first use.
+        All other keywords are as for MySQLConnection.
+        """
+        if schema_cache is not None:
+            self.schema_cache = schema_cache
+        MySQLConnection.__init__(self, **keywords)
@@ -14,3 +14,7 @@ class MySQLDialect(SQLDialect):
             for key, value in kwargs.items()
         )
         return command.format(*fargs, **fkwargs)    # pylint: disable=W0142
+    @classmethod
+    def placeholder(cls, name):
+        """MySQLdb's 'pyformat' placeholder: %(name)s"""
+        return "%({0})s".format(name)
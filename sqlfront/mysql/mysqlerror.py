@@ -1,5 +1,5 @@
 from __future__ import absolute_import
-from ..interfaces import SQLError, SQLClosingError
+from ..interfaces import SQLError, SQLClosingError, SQLPoolTimeoutError
 
 
 class MySQLError(SQLError):
@@ -7,3 +7,6 @@ class MySQLError(SQLError):
 
 class MySQLClosingError(SQLClosingError, MySQLError):
     """Problem with closing a connection or cursor."""
+
+class MySQLPoolTimeoutError(SQLPoolTimeoutError, MySQLError):
+    """Timed out waiting for a connection from a MySQLConnectionPool."""
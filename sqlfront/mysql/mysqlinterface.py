@@ -1,11 +1,953 @@
 from __future__ import absolute_import
+import re
+import collections
+import contextlib
+import itertools
 import MySQLdb
 from ..interfaces import SQLInterface
+from ..extern import rich_core
+from ..extern.nulltype import NotPassed
+from ..util.utilities import Qualified, _singleton
 from .mysqldialect import MySQLDialect
+from .mysqlsyntax import MySQLSyntax
+from .mysqlschema import MySQLSchemaCache
+from .mysqlload import load_data
+from .mysqlloader import MySQLBatchLoader
+
+# Plain column names, which can be qualified as outerT.{column}
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_$]*$')
+# Plain table names, optionally qualified by database - not aliases or joins
+_TABLE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_$]*(?:\.[A-Za-z_][A-Za-z0-9_$]*)?$')
+
+# Integer column types (as from DESCRIBE), and key values given for them as text
+_INTEGER_TYPE = re.compile(r'^(?:tiny|small|medium|big)?int\b', re.I)
+_INTEGER_TEXT = re.compile(r'^\s*[-+]?\d+\s*$')
+
+# Numbers the temporary tables of key_table(), so uses can be nested
+_key_tables = itertools.count(1)
+
+def _unique_rows(key, keys):
+    """Rows (dicts) for a key table: one per distinct key value."""
+    seen = set()
+    for value in keys:
+        if value in seen:
+            continue
+        seen.add(value)
+        if len(key) == 1:
+            yield {key[0]: value}
+        else:
+            yield dict(zip(key, value))
+
+def _same_columns(rows, names):
+    """Rows (mappings), checked to have exactly the column 'names'."""
+    for row in rows:
+        if len(row) != len(names) or any(name not in names for name in row):
+            raise ValueError(str.format(
+                "Row columns differ from the first row's ({0}): {1}",
+                ", ".join(sorted(names)), ", ".join(sorted(row))))
+        yield row
+
+def _coerce_key(value, integers, key):
+    """Key value with the values for integer columns ('integers', one flag per
+    key column) made integers, as the server returns them. Raises ValueError
+    for a value an integer column cannot hold."""
+    values = rich_core.ensure_tuple(value)
+    if not any(integers) or len(values) != len(integers):
+        return value
+    coerced = []
+    for column, item, integer in zip(key, values, integers):
+        if integer and not (item is None or isinstance(item, (int, long))):
+            if not (isinstance(item, basestring) and _INTEGER_TEXT.match(item)):
+                raise ValueError(str.format(
+                    "Key value {0!r} does not match integer column {1}.", item, column))
+            item = int(item)
+        coerced.append(item)
+    return coerced[0] if len(coerced) == 1 else tuple(coerced)
+
+def _row_key(row, key, positions):
+    """Key value of a row: a value for a single-column key, else a tuple.
+    'positions' are the indexes of the key columns, for non-dict rows."""
+    if isinstance(row, collections.Mapping):
+        values = tuple(row[column] for column in key)
+    else:
+        values = tuple(row[position] for position in positions)
+    return values[0] if len(values) == 1 else values
 
 
 class MySQLInterface(SQLInterface, MySQLDialect):
     """
     Does not have an __init__
+
+    Methods are run through self.run() - so this is used as a mixin, together
+    with a MySQLConnection (see MySQLCursor). Internal queries pick their own
+    row_format, whatever the connection's default is.
+
+    Table descriptions are cached in self.schema_cache (see mysqlschema.py).
     """
-    pass
+    syntax = MySQLSyntax
+
+    _schema_cache = None
+
+    # Fraction of the server's max_allowed_packet that one multi-row
+    # statement may fill. The remainder is headroom for protocol overhead.
+    packet_fill = 0.9
+    _packet_size = None
+
+    # select() with an offset at least this large is rewritten as a late row
+    # lookup (see MySQLSyntax.late_row_lookup). None disables the rewrite.
+    late_row_offset = 10000
+
+    @property
+    def schema_cache(self):
+        """Cache of table descriptions. Created on first use; assign one
+        MySQLSchemaCache to several cursors to share it between them."""
+        if self._schema_cache is None:
+            self._schema_cache = MySQLSchemaCache()
+        return self._schema_cache
+    @schema_cache.setter
+    def schema_cache(self, value):
+        rich_core.AssertKlass(value, MySQLSchemaCache, name='schema_cache')
+        self._schema_cache = value
+
+    def _schema_key(self, table, database=None):
+        """(database, table) key into the schema cache. Tables in the default
+        database are keyed by its name, so the key is stable across USE."""
+        if database is None:
+            database = getattr(self, 'database', None)
+        return (database, table)
+
+    def _invalidate_schema(self, table=None, database=None):
+        """Forget cached descriptions, after a structure-changing command."""
+        if table is not None:
+            database, table = self._schema_key(table, database)
+        self.schema_cache.invalidate(database=database, table=table)
+
+
+    #==============================================================================
+    #         Inserting and selecting rows
+    #==============================================================================
+    def insert(self, table, data, database=None):
+        '''Adds contents of data (mapping, ~dict) to a table. keys() define columns.'''
+        rich_core.AssertKlass(data, collections.Mapping, name='data')
+        table_name = Qualified(database=database, table=table)
+        table_columns = self.columns(table, database=database)
+        # Filter out data keys (~columns) not in the table
+        valid_data = dict(
+            (k, v) for k, v in data.items()
+            if k in table_columns
+        )
+        if valid_data == {}:
+            return None
+        else:
+            # Values are sent as parameters, so the statement text only
+            # varies with the set of columns
+            sql_insert = (
+                "INSERT INTO {table} ({columns}) "
+                "VALUES ({values});"
+                ).format(
+                    table   = table_name,
+                    columns = ', '.join(str(k) for k in valid_data.keys()),
+                    values  = ', '.join(self.placeholder(k) for k in valid_data.keys())
+                )
+            self.run(sql_insert, valid_data)
+            return sql_insert
+    def insert_many(self, table, rows, database=None, chunk_rows=None, transaction=False):
+        '''Insert an iterable of rows (mappings, as for insert()), using
+        multi-row INSERT statements. Returns the number of rows inserted.
+
+        Columns are those of the first row which exist in the table. Later
+        rows missing one of them get the column's DEFAULT.
+        chunk_rows: maximum rows per statement. Statements are also kept
+            under the server's max_allowed_packet (see .packet_fill).
+        transaction: if True, run all chunks in one transaction - committed
+            at the end, or rolled back if any chunk fails. Otherwise, as
+            with insert(), committing is left to the caller.
+        '''
+        rich_core.AssertKlass(chunk_rows, (type(None), int, long), name='chunk_rows')
+        rows = iter(rows)
+        try:
+            first = next(rows)
+        except StopIteration:
+            return 0
+        rich_core.AssertKlass(first, collections.Mapping, name='rows')
+        table_columns = self.columns(table, database=database)
+        columns = [column for column in table_columns if column in first]
+        if not columns:
+            return 0
+
+        prefix = "INSERT INTO {0} ({1}) VALUES ".format(
+            Qualified(database=database, table=table), ', '.join(columns))
+        return self._insert_chunks(prefix, "", itertools.chain([first], rows),
+                                   columns, chunk_rows, transaction)
+    def upsert_many(self, table, rows, update_columns=None, database=None,
+                    chunk_rows=None, transaction=False):
+        '''Insert rows (mappings), updating those whose primary or unique key
+        already exists, with multi-row 'INSERT ... ON DUPLICATE KEY UPDATE'
+        statements - one round trip per chunk, and no race between checking
+        for a row and writing it.
+
+        Columns are those of the first row; they must all exist in the table
+        (checked against its cached description), or ValueError is raised.
+        Every row must have exactly the same columns: a missing column would
+        be set to its DEFAULT over the existing value, and an extra one
+        dropped. A row that differs raises ValueError, once the chunks
+        before it have been sent - use transaction=True to undo them.
+        update_columns: columns set from the new row when it is a duplicate;
+            they must be among the inserted columns. Defaults to all inserted
+            columns outside the primary key - or all inserted columns, for a
+            table with UNIQUE keys but no primary key.
+        chunk_rows, transaction: as for insert_many().
+        Returns MySQL's count of affected rows: 1 per row inserted, and 2 per
+        row updated (0 if an update changed nothing).
+        '''
+        rich_core.AssertKlass(chunk_rows, (type(None), int, long), name='chunk_rows')
+        rows = iter(rows)
+        try:
+            first = next(rows)
+        except StopIteration:
+            return 0
+        rich_core.AssertKlass(first, collections.Mapping, name='rows')
+        table_columns = self.columns(table, database=database)
+        columns = [column for column in table_columns if column in first]
+        unknown = sorted(set(first) - set(columns))
+        if update_columns is None:
+            try:
+                keys = self.primary_keys(table, database=database)
+            except ValueError:
+                # Duplicates can only be on a UNIQUE key; setting its columns
+                # to the values they already have is harmless
+                keys = ()
+            update_columns = [column for column in columns if column not in keys]
+        update_columns = list(rich_core.ensure_tuple(update_columns))
+        unknown.extend(sorted(set(update_columns) - set(table_columns)))
+        if unknown:
+            raise ValueError(str.format("Unknown columns for table '{0}': {1}",
+                                        table, ", ".join(unknown)))
+        not_inserted = sorted(set(update_columns) - set(columns))
+        if not_inserted:
+            raise ValueError(str.format("Update columns are not inserted: {0}",
+                                        ", ".join(not_inserted)))
+        if not columns:
+            return 0
+
+        prefix = "INSERT INTO {0} ({1}) VALUES ".format(
+            Qualified(database=database, table=table), ', '.join(columns))
+        if update_columns:
+            suffix = " ON DUPLICATE KEY UPDATE " + ", ".join(
+                "{0} = VALUES({0})".format(column) for column in update_columns)
+        else:
+            # Nothing to update: keep existing rows, without the warnings
+            # of INSERT IGNORE swallowing other errors
+            suffix = " ON DUPLICATE KEY UPDATE {0} = {0}".format(columns[0])
+        rows = _same_columns(itertools.chain([first], rows), frozenset(first))
+        return self._insert_chunks(prefix, suffix, rows, columns, chunk_rows, transaction)
+    def _insert_chunks(self, prefix, suffix, rows, columns, chunk_rows, transaction):
+        """Run 'prefix (values), (values)... suffix;' statements over chunks of
+        rows, kept under max_allowed_packet. Returns rows affected."""
+        budget = int(self.max_allowed_packet() * self.packet_fill) - len(prefix) - len(suffix)
+        affected = 0
+        if transaction:
+            self.execute("START TRANSACTION")
+        try:
+            for chunk in self._value_chunks(rows, columns, budget, chunk_rows):
+                affected += self.execute(prefix + ", ".join(chunk) + suffix + ";")
+            if transaction:
+                self.commit()
+        except Exception:
+            if transaction:
+                self.rollback()
+            raise
+        return affected
+    def _value_chunks(self, rows, columns, budget, chunk_rows=None):
+        """Yield lists of '(value, ...)' strings, one list per statement.
+        Each list fits in 'budget' characters, and has at most chunk_rows
+        entries. A single row larger than the budget is sent on its own."""
+        chunk, size = [], 0
+        for row in rows:
+            values = "({0})".format(", ".join(
+                self._literal(row[column]) if column in row else "DEFAULT"
+                for column in columns
+            ))
+            if chunk and (size + len(values) > budget
+                          or (chunk_rows and len(chunk) >= chunk_rows)):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(values)
+            size += len(values) + 2     # + len(", ")
+        if chunk:
+            yield chunk
+    def _literal(self, value):
+        """SQL literal for a value: NULL for None, 1 or 0 for booleans, the
+        exact repr() of floats (str() rounds them to 12 digits), and
+        otherwise an escaped string. Unicode is encoded as the driver
+        would, in the connection's character set (utf-8 if unknown)."""
+        if value is None:
+            return "NULL"
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        if isinstance(value, float):
+            return repr(value)
+        if isinstance(value, unicode):
+            connection = getattr(self, 'connection', None)
+            value = value.encode(getattr(connection, 'encoding', None) or 'utf-8')
+        return "'{0}'".format(self.escape(value))
+    def max_allowed_packet(self):
+        """The server's max_allowed_packet, in bytes. Queried once, then cached."""
+        if self._packet_size is None:
+            self._packet_size = int(_singleton(
+                self.run("SELECT @@max_allowed_packet;", row_format='dict')
+            ))
+        return self._packet_size
+    def load(self, table, rows, database=None, columns=None):
+        '''Bulk-load an iterable of rows with LOAD DATA LOCAL INFILE, streamed
+        through a pipe by a background thread (see mysqlload.py).
+        Requires local_infile on both the server and this connection.
+
+        rows: sequences, in 'columns' order; or mappings keyed by column name.
+        columns: columns being loaded. Defaults to every column of the table.
+        Returns a dict of: rows, seconds, rows_per_second, warnings.
+        '''
+        table_columns = self.columns(table, database=database)
+        if columns is None:
+            columns = table_columns
+        else:
+            columns = rich_core.ensure_tuple(columns)
+            unknown = [column for column in columns if column not in table_columns]
+            if unknown:
+                raise ValueError(str.format(
+                    "Columns not in table '{0}': {1}", table, ', '.join(unknown)
+                ))
+        return load_data(self, Qualified(database=database, table=table), rows, columns)
+    def select(self, tables, columns='*', where=None, limit=None):
+        '''
+        if columns is list/tuple --> SELECT {columns}
+        if columns is dict --> SELECT {columns.keys()} WHERE
+
+        limit=(offset, count) with a large offset is run as a late row lookup
+        (see late_row_offset), and returns rows in primary key order.
+        '''
+        tables = rich_core.ensure_tuple(tables)
+        if not isinstance(columns, collections.Mapping):
+            columns = rich_core.ensure_tuple(columns)
+
+        rich_core.AssertKlass(columns, (collections.Mapping, rich_core.NonStringIterable))
+        #if columns  is a data dict
+        if isinstance(columns, collections.Mapping):
+            assert(where is None), (
+                "If 'columns' is a dict, then a 'where' input should not be provided."
+            )
+            where, columns = columns, list(columns)
+        rich_core.AssertKlass(where, (collections.Mapping, type(None)), name='where')
+        sql_select = self._late_row_select(tables, columns, where, limit)
+        if sql_select is not None:
+            return self.run(sql_select)
+        sql_select = self.syntax.compose(
+            "SELECT "+', '.join(str(k) for k in columns),
+            "FROM "+', '.join(str(k) for k in tables),
+            self.syntax.where(where),
+            self.syntax.limit(limit)
+        )
+        return self.run(sql_select)
+    def _late_row_select(self, tables, columns, where, limit):
+        """The late row lookup form of a select(), if it applies: one plain
+        table name with a primary key, plain column names, and limit=(offset, count)
+        with offset >= self.late_row_offset. Otherwise None.
+        Rows come back in primary key order."""
+        if (self.late_row_offset is None or len(tables) != 1
+                or not _TABLE_NAME.match(str(tables[0]))):
+            return None
+        if not (isinstance(limit, collections.Sequence)
+                and not isinstance(limit, basestring) and len(limit) == 2):
+            return None
+        try:
+            offset, count = int(limit[0]), int(limit[1])
+        except (TypeError, ValueError):
+            return None
+        if offset < self.late_row_offset:
+            return None
+        if not all(column == '*' or _IDENTIFIER.match(str(column)) for column in columns):
+            return None
+        try:
+            key = self.primary_keys(str(tables[0]))
+        except ValueError:
+            return None
+        return self.syntax.late_row_lookup(
+            tables[0], key, offset, count, columns=columns, where=where)
+    def get_many(self, table, keys, database=None, columns='*', key=None,
+                 chunk_size=1000, row_format=NotPassed):
+        """Fetch rows by primary key: one 'SELECT ... WHERE key IN (...)' per
+        chunk_size keys, rather than a query per key. Returns a dict of key
+        value to row; keys with no row are left out.
+
+        'key' defaults to the table's primary key (see primary_keys()). For
+        composite keys, give each key value as a tuple - the returned dict
+        is keyed by tuples too. Key columns are added to 'columns' if they are
+        missing. See also loader(), to batch lookups made independently.
+
+        Rows are matched to keys by the key values read back. Values for
+        integer columns may be given as text ('3'), and are sent as integers;
+        other mismatched values raise ValueError. Text columns are matched
+        exactly: under a case-insensitive collation, a key differing from the
+        stored value in case (or trailing spaces) finds its row, but is left
+        out of the result.
+        """
+        if key is None:
+            key = self.primary_keys(table, database=database)
+        key = rich_core.ensure_tuple(key)
+        if columns == '*':
+            columns = self.columns(table, database=database)
+        columns = list(rich_core.ensure_tuple(columns))
+        columns.extend(column for column in key if column not in columns)
+        if row_format is NotPassed:
+            row_format = getattr(self, 'row_format', 'dict')
+        if row_format == 'columnar':
+            raise ValueError("get_many() returns rows, so does not support row_format 'columnar'.")
+        positions = [columns.index(column) for column in key]
+        types = self.column_types(table, database=database)
+        integers = [bool(_INTEGER_TYPE.match(types.get(column, ''))) for column in key]
+
+        # Key value as sent --> the keys given for it
+        given = collections.OrderedDict()
+        for value in keys:
+            given.setdefault(_coerce_key(value, integers, key), []).append(value)
+        keys = list(given)
+        found = {}
+        for offset in range(0, len(keys), chunk_size):
+            chunk = keys[offset:offset + chunk_size]
+            parameters = {}
+            values = []
+            for index, value in enumerate(chunk):
+                prefix = 'k{0}'.format(index)
+                parameters.update(self._key_parameters(key, prefix, value))
+                placeholders = [self.placeholder('{0}_{1}'.format(prefix, column))
+                                for column in range(len(key))]
+                values.append(placeholders[0] if len(key) == 1
+                              else "(" + ", ".join(placeholders) + ")")
+            sql_select = self.syntax.compose(
+                "SELECT " + ', '.join(columns),
+                "FROM " + str(Qualified(database=database, table=table)),
+                "WHERE {0} IN ({1})".format(
+                    key[0] if len(key) == 1 else "(" + ", ".join(key) + ")",
+                    ", ".join(values))
+            )
+            for row in self.run(sql_select, parameters, row_format=row_format):
+                for value in given.get(_row_key(row, key, positions), ()):
+                    found[value] = row
+        return found
+    def loader(self, window=0.002, chunk_size=1000):
+        """A MySQLBatchLoader on this cursor: single-row lookups made within
+        'window' seconds of each other are fetched together with get_many().
+        See mysqlloader.py."""
+        return MySQLBatchLoader(self, window=window, chunk_size=chunk_size)
+    def iterate(self, table, where=None, page_size=1000, columns='*', key=None,
+                database=None, row_format=NotPassed, start=None, stop=None):
+        """Iterate over all rows of a table (optionally filtered by 'where', a
+        mapping as for select()), in primary key order, one page at a time.
+
+        Pages are found by key ('WHERE key > last_seen ORDER BY key LIMIT n'),
+        rather than by OFFSET, so each page costs the same however deep into
+        the table it is. 'key' defaults to the table's primary key columns
+        (see primary_keys()). Composite keys are compared column by column.
+        Key columns are added to 'columns' if they are missing.
+
+        'start' and 'stop' limit the iteration to a range of keys, as for
+        range(): start <= key < stop. For composite keys, give tuples.
+        """
+        rich_core.AssertKlass(where, (collections.Mapping, type(None)), name='where')
+        if key is None:
+            key = self.primary_keys(table, database=database)
+        key = rich_core.ensure_tuple(key)
+        if columns == '*':
+            columns = self.columns(table, database=database)
+        columns = list(rich_core.ensure_tuple(columns))
+        columns.extend(column for column in key if column not in columns)
+        if row_format is NotPassed:
+            row_format = getattr(self, 'row_format', 'dict')
+        if row_format == 'columnar':
+            raise ValueError("iterate() returns rows, so does not support row_format 'columnar'.")
+        positions = [columns.index(column) for column in key]
+
+        conditions, parameters = [], {}
+        for index, (column, value) in enumerate(sorted((where or {}).items())):
+            name = 'where_{0}'.format(index)
+            conditions.append("{0} = {1}".format(column, self.placeholder(name)))
+            parameters[name] = value
+        if stop is not None:
+            conditions.append(self._key_condition(key, 'stop', '<'))
+            parameters.update(self._key_parameters(key, 'stop', stop))
+        first = list(conditions)
+        if start is not None:
+            first.append(self._key_condition(key, 'start', '>='))
+            parameters.update(self._key_parameters(key, 'start', start))
+        first_page = self.syntax.compose(
+            "SELECT " + ', '.join(columns),
+            "FROM " + str(Qualified(database=database, table=table)),
+            ("WHERE " + " AND ".join(first)) if first else "",
+            "ORDER BY " + ', '.join(key),
+            "LIMIT {0:d}".format(page_size)
+        )
+        next_page = self.syntax.compose(
+            "SELECT " + ', '.join(columns),
+            "FROM " + str(Qualified(database=database, table=table)),
+            "WHERE " + " AND ".join(conditions + [self._keyset_condition(key)]),
+            "ORDER BY " + ', '.join(key),
+            "LIMIT {0:d}".format(page_size)
+        )
+
+        rows = self.run(first_page, parameters, row_format=row_format)
+        while rows:
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                return
+            last = _row_key(rows[-1], key, positions)
+            parameters.update(self._key_parameters(key, 'key', last))
+            rows = self.run(next_page, parameters, row_format=row_format)
+    def _keyset_condition(self, key):
+        """Condition for rows after (key_0, key_1, ...) in key order. For a
+        composite key (a, b):
+            a >= key_0 AND (a > key_0 OR (a = key_0 AND b > key_1))
+        The leading 'a >= key_0' lets MySQL use a range scan on the index.
+        """
+        return self._key_condition(key, 'key', '>')
+    def _key_condition(self, key, prefix, operator):
+        """Compare key columns to the parameters prefix_0, prefix_1, ..."""
+        names = [self.placeholder('{0}_{1}'.format(prefix, index)) for index in range(len(key))]
+        return self.syntax.compare(key, names, operator)
+    @staticmethod
+    def _key_parameters(key, prefix, values):
+        """Parameters prefix_0, prefix_1, ... for a key value (or tuple of values)."""
+        values = rich_core.ensure_tuple(values)
+        if len(values) != len(key):
+            raise ValueError(str.format(
+                "Key has {0} columns, but {1} values were given: {2}",
+                len(key), len(values), values
+            ))
+        return dict(('{0}_{1}'.format(prefix, index), value) for index, value in enumerate(values))
+
+
+    #==============================================================================
+    #         Listing structure names
+    #==============================================================================
+    def databases(self):
+        """Return the names of all databases visible to the current user."""
+        results = self.run("SHOW DATABASES", row_format='dict')
+        return [row['Database'] for row in results]
+
+    def tables(self, database=None):
+        """Return all tables in a database (or default database if none provided)."""
+        if database is None:
+            rows = self.run("SHOW TABLES", row_format='dict')
+        else:
+            rows = self.run("SHOW TABLES in "+database, row_format='dict')
+        return [row.values()[0] for row in rows]
+
+    def columns(self, table, database=None):
+        """Get names of all columns in a table."""
+        return [row['Field'] for row in self.describe(table, database=database)]
+
+    def column_types(self, table, database=None):
+        """Return a dict of column names and types for a table."""
+        return dict(
+            (row['Field'], row['Type'])
+            for row in self.describe(table, database=database)
+        )
+
+
+    #==============================================================================
+    #         Checking existence of structures
+    #==============================================================================
+    def exists(self, table=None, database=None, column=None, row=None):
+        """Dispatcher function for checking existance of tables, databases,
+        columns in tables, and rows in columns."""
+        if row != None:
+            rich_core.AssertKlass(row, collections.Mapping, name='row')
+            rich_core.AssertKlass(table, basestring, name='table')
+            rich_core.AssertKlass(database, (type(None), basestring), name='database')
+            #Must also have table
+            return self._row_exists(table, row, database=database)
+        elif column != None:
+            #Must also have table
+            return self._column_exists(column, table, database=database)
+        elif table != None:
+            return self._table_exists(table, database=database)
+        elif database != None:
+            return self._database_exists(database)
+        else:
+            #No arguments provided, or all were None
+            raise TypeError("No arguments provided, or all were equal to 'None'.")
+    def _table_exists(self, table, database=None):
+        """Predicate. Does table exist?"""
+        if self.schema_cache.get(*self._schema_key(table, database)) is not None:
+            return True
+        if database is None:
+            results = self.run("SHOW TABLES LIKE '{0}'".format(
+                self.escape(table)), row_format='tuple')
+        else:
+            results = self.run("SHOW TABLES IN {0} LIKE '{1}'".format(
+                database, self.escape(table)), row_format='tuple')
+        return len(results) > 0
+    def _column_exists(self, column, table, database=None):
+        """Return True if column exists in a given table."""
+        return column in self.columns(table, database=database)
+    def _row_exists(self, table, row, database=None, search_limit=None):
+        """Return True if a table contains all data, as specified by a data dictionary."""
+        table_name = Qualified(database=database, table=table)
+        if search_limit != None:
+            sql_select = self.syntax.compose(
+                "SELECT *",
+                "FROM (SELECT * FROM {0} LIMIT {1}) as subselect".format(
+                    table_name, int(search_limit)),
+                self.syntax.where(row),
+                "LIMIT 1"
+            )
+        else:
+            sql_select = self.syntax.compose(
+                "SELECT * FROM {0}".format(table_name),
+                self.syntax.where(row),
+                "LIMIT 1"
+            )
+        results = self.run(sql_select, row_format='tuple')
+        return (len(results) > 0)
+    def _database_exists(self, database):
+        """Predicate. Checks if a database exists."""
+        sql_check = str.format(
+            "SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA WHERE SCHEMA_NAME = '{0}';",
+            self.escape(database)
+        )
+        results = self.run(sql_check, row_format='tuple')
+        return len(results) != 0
+
+    def exists_many(self, table=None, database=None, columns=None, rows=None):
+        """Batched exists(): answers many existence questions in one or a few
+        statements, and returns a list of booleans aligned with the input.
+            exists_many(table, rows=[{...}, ...])   --> rows_exist()
+            exists_many(table, columns=[...])       --> columns_exist()
+            exists_many(table=[...], database=...)  --> tables_exist()
+            exists_many(database=[...])             --> databases_exist()
+        """
+        if rows is not None:
+            return self.rows_exist(table, rows, database=database)
+        elif columns is not None:
+            return self.columns_exist(table, columns, database=database)
+        elif table is not None:
+            return self.tables_exist(table, database=database)
+        elif database is not None:
+            return self.databases_exist(database)
+        else:
+            raise TypeError("No arguments provided, or all were equal to 'None'.")
+    def rows_exist(self, table, rows, database=None, chunk_size=500):
+        """For each row (a mapping of column to value, as for exists(row=...)),
+        does the table contain a row matching it? Returns a list of booleans.
+
+        Rather than one query per row, each chunk of 'chunk_size' rows is
+        checked by a single statement: a UNION ALL of one 'EXISTS' probe per
+        row, returning the positions of the rows found. Values are sent as
+        parameters; a None value matches NULL. Empty rows raise ValueError.
+        """
+        rows = list(rows)
+        for row in rows:
+            rich_core.AssertKlass(row, collections.Mapping, name='row')
+            if not row:
+                raise ValueError("rows_exist() needs at least one column for each row.")
+        table_name = Qualified(database=database, table=table)
+        found = [False] * len(rows)
+        for offset in range(0, len(rows), chunk_size):
+            probes, parameters = [], {}
+            for position, row in enumerate(rows[offset:offset + chunk_size], offset):
+                conditions = []
+                for index, (column, value) in enumerate(sorted(row.items())):
+                    name = 'r{0}_{1}'.format(position, index)
+                    conditions.append(str.format(
+                        "{0} {1} {2}", column, '<=>' if value is None else '=',
+                        self.placeholder(name)))
+                    parameters[name] = value
+                probes.append(str.format(
+                    "SELECT {0} FROM DUAL WHERE EXISTS (SELECT 1 FROM {1} WHERE {2} LIMIT 1)",
+                    position, table_name, " AND ".join(conditions)))
+            command = "\nUNION ALL\n".join(probes) + ";"
+            for result in self.run(command, parameters, row_format='tuple'):
+                found[int(result[0])] = True
+        return found
+    def columns_exist(self, table, columns, database=None):
+        """For each column name, does it exist in the table? Answered from the
+        table's description (see describe()), so at most one query."""
+        table_columns = set(self.columns(table, database=database))
+        return [column in table_columns for column in columns]
+    def tables_exist(self, tables, database=None):
+        """For each table name, does it exist (in 'database', or the current
+        database)? One 'SHOW TABLES', unless all are in the schema cache."""
+        tables = list(rich_core.ensure_tuple(tables))
+        cached = [
+            self.schema_cache.get(*self._schema_key(table, database)) is not None
+            for table in tables
+        ]
+        if all(cached):
+            return cached
+        if database is None:
+            results = self.run("SHOW TABLES", row_format='tuple')
+        else:
+            results = self.run("SHOW TABLES IN {0}".format(database), row_format='tuple')
+        names = set(row[0] for row in results)
+        return [known or table in names for table, known in zip(tables, cached)]
+    def databases_exist(self, databases):
+        """For each database name, does it exist? One query."""
+        databases = list(rich_core.ensure_tuple(databases))
+        if not databases:
+            return []
+        sql_check = str.format(
+            "SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA WHERE SCHEMA_NAME IN ({0});",
+            ", ".join("'{0}'".format(self.escape(database)) for database in databases)
+        )
+        names = set(row[0] for row in self.run(sql_check, row_format='tuple'))
+        return [database in names for database in databases]
+
+
+    #==============================================================================
+    #        Misc Table Queries
+    #==============================================================================
+    def count(self, table, database=None):
+        """Return integer count of number of results in table.
+        @todo: Generalize with a data parameter ~ where clause (use Syntax.where)"""
+        results = self.run("SELECT count(*) FROM {0};".format(
+            Qualified(table=table, database=database)
+        ), row_format='dict')
+        #if no results found
+        if not len(results):
+            return 0
+        return int(_singleton(results))
+
+    def primary_key(self, table, database=None):
+        """Finds a primary key in database.table."""
+        rows = (
+            row for row in self.describe(table, database=database)
+            if row['Key'] == 'PRI'
+        )
+        return next(rows)['Field']
+    def primary_keys(self, table, database=None):
+        """Return a tuple of all primary key columns of database.table - more
+        than one for a composite key. Columns are in table order (as listed by
+        DESCRIBE), which may differ from the order in the key's definition."""
+        keys = tuple(
+            row['Field'] for row in self.describe(table, database=database)
+            if row['Key'] == 'PRI'
+        )
+        if not keys:
+            raise ValueError(str.format("Table '{0}' has no primary key.", table))
+        return keys
+    def describe(self, table, database=None):
+        """Return information about columns, their types, and specifications
+        for a table. Served from self.schema_cache when possible - treat the
+        returned rows as read-only."""
+        key = self._schema_key(table, database)
+        description = self.schema_cache.get(*key)
+        if description is None:
+            description = self.schema_cache.set(key[0], key[1], tuple(self.run(
+                "DESCRIBE {0};".format(Qualified(database=database, table=table)),
+                row_format='dict'
+            )))
+        return description
+
+
+    #==============================================================================
+    #    Bulk key operations - joining against a temporary table of keys
+    #==============================================================================
+    @contextlib.contextmanager
+    def key_table(self, table, keys, key=None, database=None):
+        """Context manager: load 'keys' (values of the primary key of
+        'table', or of the columns 'key'; tuples for composite keys) into an
+        indexed TEMPORARY TABLE, and yield its name. The table is dropped
+        on exit.
+
+        Join against it for lists of keys too long for 'IN (...)', which
+        MySQL is slow to parse, and which can exceed max_allowed_packet.
+        The key columns are defined by 'table' itself (CREATE ... SELECT), so
+        have the same names, types, character sets and collations: joins
+        compare them just as lookups in 'table' would.
+        Duplicate keys are loaded once.
+        """
+        if key is None:
+            key = self.primary_keys(table, database=database)
+        key = rich_core.ensure_tuple(key)
+        name = "_sqlfront_keys_{0}".format(next(_key_tables))
+        self.execute(str.format(
+            "CREATE TEMPORARY TABLE {0} (PRIMARY KEY ({1})) SELECT {1} FROM {2} LIMIT 0;",
+            name, ", ".join(key), Qualified(database=database, table=table)
+        ))
+        try:
+            self.insert_many(name, _unique_rows(key, keys))
+            yield name
+        finally:
+            self.execute("DROP TEMPORARY TABLE IF EXISTS {0};".format(name))
+            self._invalidate_schema(name)
+    def select_keys(self, table, keys, columns='*', key=None, database=None):
+        """Rows of 'table' whose key is in 'keys' - as get_many(), but for
+        any number of keys, joined through key_table(). Returns a list of
+        rows, in no particular order."""
+        key = self._bulk_key(table, key, database)
+        if columns == '*':
+            columns = self.columns(table, database=database)
+        columns = rich_core.ensure_tuple(columns)
+        with self.key_table(table, keys, key=key, database=database) as keys_name:
+            return self._bulk_results(str.format(
+                "SELECT {0} FROM {1} AS t JOIN {2} AS k USING ({3});",
+                ", ".join("t." + column for column in columns),
+                Qualified(database=database, table=table), keys_name, ", ".join(key)
+            ))
+    def existing_keys(self, table, keys, key=None, database=None):
+        """The subset of 'keys' present in 'table', as a set."""
+        key = self._bulk_key(table, key, database)
+        with self.key_table(table, keys, key=key, database=database) as keys_name:
+            rows = self._bulk_results(str.format(
+                "SELECT {0} FROM {1} AS k JOIN {2} AS t USING ({3});",
+                ", ".join("k." + column for column in key),
+                keys_name, Qualified(database=database, table=table), ", ".join(key)
+            ), row_format='tuple')
+        return set(row[0] if len(key) == 1 else tuple(row) for row in rows)
+    def delete_keys(self, table, keys, key=None, database=None):
+        """Delete the rows of 'table' whose key is in 'keys'. Returns the
+        number of rows deleted. Committing is left to the caller."""
+        key = self._bulk_key(table, key, database)
+        with self.key_table(table, keys, key=key, database=database) as keys_name:
+            return self.execute(str.format(
+                "DELETE t FROM {0} AS t JOIN {1} AS k USING ({2});",
+                Qualified(database=database, table=table), keys_name, ", ".join(key)
+            ))
+    def _bulk_key(self, table, key, database):
+        """Key columns for the bulk key operations."""
+        if key is None:
+            return self.primary_keys(table, database=database)
+        return rich_core.ensure_tuple(key)
+    def _bulk_results(self, command, **keywords):
+        """Run a query against a key table. Through execute() and results()
+        rather than run(), so that it is never answered from a query cache:
+        the key table's contents differ from one use to the next."""
+        self.execute(command, **keywords)
+        return self.results()
+
+
+    #==============================================================================
+    #    Dropping Structures
+    #==============================================================================
+    def drop(self, table=None, database=None):
+        """Dispatcher function to _drop_database(), and _drop_table()."""
+        if (table != None):
+            self._drop_table(table, database=database)
+        elif database != None:
+            self._drop_database(database)
+    def _drop_database(self, database):
+        """Drop a database."""
+        self.run("DROP DATABASE {0};".format(database))
+        self._invalidate_schema(database=database)
+    def _drop_table(self, table, database=None):
+        """Drop table from default database."""
+        self.execute("DROP TABLE {0}".format(Qualified(table=table, database=database)))
+        self._invalidate_schema(table, database=database)
+        return self
+
+
+    #==============================================================================
+    #    Database-Wide Interaction Functions
+    #==============================================================================
+    def create_database(self, new_name):
+        """Create a database."""
+        self.run("CREATE DATABASE {0}".format(new_name))
+
+    def rename_database(self, old_name, new_name):
+        """Rename a database."""
+        assert(self._database_exists(old_name)), (
+            str.format(
+                "Database renaming failed, because database '{0}' does not exist.",
+                old_name
+            )
+        )
+        assert(not self._database_exists(new_name)), (
+            str.format(
+                "Database renaming failed, because database '{0}' already exists.",
+                new_name
+            )
+        )
+
+        self.create_database(new_name)
+        for table in self.tables(old_name):       #Rename each table
+            sql_rename = '''RENAME TABLE {0}.{2} TO {1}.{2};'''.format(old_name, new_name, table)
+            self.run(sql_rename)
+
+        self._drop_database(old_name)
+        self._invalidate_schema(database=new_name)
+    def current_database(self):
+        """Name of the current database, as the server sees it."""
+        result = self.run("SELECT DATABASE();", row_format='dict')
+        return _singleton(result)
+    def use(self, database):
+        """Switch to another database. Kept in self.database, the default
+        database of any connection opened later."""
+        rich_core.AssertKlass(database, basestring, name='database')
+        self.execute("USE {0};".format(database))
+        self.database = database
+
+
+    #==============================================================================
+    #    Table Functions
+    #==============================================================================
+    def create_table(self, new_table, like=None, columns=None, primary_key=None):
+        '''Create a table.
+        'like': used if provided a table name. Copies structure and data.
+        'columns': used if string specifying columns
+        '''
+        assert(bool(like) != bool(columns)), (
+            "One, and only one of 'like' or 'columns' should be provided."
+        )
+        self._invalidate_schema(new_table)
+
+        if like:
+            assert(self._table_exists(like)), (
+                "Table specified by 'like' ({0}) does not exist.".format(like)
+            )
+            self.run("CREATE TABLE {0} LIKE {1};".format(new_table, like))
+            return self.run("INSERT INTO {0} SELECT * FROM {1};".format(new_table, like))
+        else:   #assumes
+            assert(type(columns) in [list, tuple]), (
+                "Columns should be specified as a list or tuple of strings."
+            )
+            assert(all([isinstance(col, basestring) for col in columns])), (
+                "Not all entries in 'columns' are strings."
+            )
+            assert(not self._table_exists(new_table)), "Table already exists."
+
+            if primary_key in [None, False]:
+                pkey = ""
+            else:
+                pkey = ",\n    PRIMARY KEY ({0})\n".format(primary_key)
+
+            sql_create = (
+                "CREATE TABLE {name}(\n"
+                "    {all_columns}"
+                "{pkey});"
+            ).format(
+                name=new_table,
+                all_columns=", \n    ".join(columns),
+                pkey=pkey)
+
+            return self.run(sql_create)
+
+    def copy_table(self, old_table, new_table):
+        """Create a new table, and copy data and structure of an old table into it."""
+        assert(self._table_exists(old_table)), (
+            "Copy failed. Existing table '{0}' does not exist.".format(old_table)
+        )
+        assert(not self._table_exists(new_table)), (
+            "Copy failed. New table '{0}' already exists.".format(new_table)
+        )
+
+        self.create_table(new_table, like=old_table)
+
+
+    #==============================================================================
+    #        Exceptions
+    #==============================================================================
+    @rich_core.ClassProperty
+    @classmethod
+    def SQLExceptionType(cls):
+        """Return parent class for exceptions of this SQL type."""
+        return MySQLdb.MySQLError
@@ -0,0 +1,104 @@
+"""
+Batched primary key lookups ('dataloader' style): single-row lookups made
+independently - by different threads, or different parts of one request - are
+collected, and fetched together with one 'SELECT ... WHERE key IN (...)' per
+table (see MySQLInterface.get_many), instead of one round trip each.
+
+    loader = cursor.loader(window=0.002)
+    futures = [loader.load('Orders', order_id) for order_id in order_ids]
+    orders = [future.result() for future in futures]    # One query
+
+    loader.get('Persons', 3)    # Blocks until the batch it joined is fetched
+
+With window=None, nothing is fetched until .dispatch() is called - for
+instance, once per tick of an event loop, or at the end of a request phase.
+"""
+from __future__ import absolute_import
+import threading
+import collections
+from ..util.offload import OffloadFuture
+
+__all__ = ['MySQLBatchLoader']
+
+
+class MySQLBatchLoader(object):
+    """Collects lookups of rows by primary key, and fetches them in batches.
+
+    Parameters:
+    source: a MySQLCursor (or other MySQLInterface), or a MySQLConnectionPool
+        of them. A pool's connection is checked out for each dispatch.
+        A single cursor is used under a lock, so the loader must be its only
+        user while lookups are outstanding.
+    window: seconds to wait after the first lookup of a batch for others to
+        join it, before fetching. None: only fetch on dispatch().
+    chunk_size: maximum number of keys per SELECT.
+    """
+    def __init__(self, source, window=0.002, chunk_size=1000):
+        self.source, self.window, self.chunk_size = source, window, chunk_size
+        # (table, database) --> {key: [futures]}
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._source_lock = threading.Lock()
+        # Number of SELECT batches dispatched (one per table per dispatch)
+        self.batches = 0
+
+    def load(self, table, key, database=None):
+        """Request the row of 'table' with primary key 'key' (a tuple for
+        composite keys). Returns an OffloadFuture, resolving to the row,
+        or None if there is no such row."""
+        future = OffloadFuture()
+        with self._lock:
+            batch = self._pending.setdefault((table, database), collections.OrderedDict())
+            batch.setdefault(key, []).append(future)
+            if self._timer is None and self.window is not None:
+                self._timer = threading.Timer(self.window, self.dispatch)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def get(self, table, key, database=None, timeout=None):
+        """Row of 'table' with primary key 'key', or None. Blocks until the
+        batch the lookup joins is fetched - so with window=None, another
+        thread must call dispatch()."""
+        return self.load(table, key, database=database).result(timeout)
+
+    def dispatch(self):
+        """Fetch all lookups requested so far, one batch per table."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for (table, database), batch in pending.items():
+            self.batches += 1
+            try:
+                rows = self._get_many(table, list(batch), database)
+            except Exception as exc:    # pylint: disable=broad-except
+                for futures in batch.values():
+                    for future in futures:
+                        future.set_exception(exc)
+                continue
+            for key, futures in batch.items():
+                row = rows.get(key)
+                for future in futures:
+                    future.set_result(row)
+
+    def _get_many(self, table, keys, database):
+        """get_many() on a pooled cursor, or on the source cursor."""
+        if hasattr(self.source, 'checkout'):
+            with self.source.checkout() as cursor:
+                return cursor.get_many(table, keys, database=database,
+                                       chunk_size=self.chunk_size)
+        with self._source_lock:
+            return self.source.get_many(table, keys, database=database,
+                                        chunk_size=self.chunk_size)
+
+    @property
+    def pending(self):
+        """Number of lookups waiting to be dispatched."""
+        return sum(len(batch) for batch in self._pending.values())
+
+    def __repr__(self):
+        return str.format("{0}(window={1}, pending={2}, batches={3})",
+                          type(self).__name__, self.window, self.pending, self.batches)
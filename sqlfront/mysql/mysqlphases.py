@@ -0,0 +1,216 @@
+"""
+Opt-in phase timing: how much of each MySQLInterface call (insert, select,
+count, exists, describe, ...) is sqlfront's own work, and how much is the
+driver, network, and server.
+
+    with MySQLPhaseTimer() as timer:
+        cursor.insert('Orders', {'order_number': 67492, 'persons_id': 3})
+        cursor.count('Orders')
+    print timer.dumps()
+
+While a timer is active, MySQLInterface's public methods, and the functions
+doing each phase of the work, are wrapped with timing code; they are restored
+when it stops. Phases are timed exclusively (time in a nested phase is
+counted once, in the innermost), and only within an outermost MySQLInterface
+call, on any thread:
+
+    validate    rich_core.AssertKlass
+    escape      MySQLDialect.escape, MySQLInterface._literal
+    compose     MySQLSyntax.compose, .where, .limit, .compare, .late_row_lookup
+    server      MySQLdb's cursor execute() and fetchone/fetchmany/fetchall()
+                - waiting on the network and server. MySQLdb converts column
+                values and builds 'dict' rows as it reads them, so that is
+                counted here too; MySQLConnection's own work around these
+                calls (binding, listeners, the query cache) is not.
+    rows        MySQLConnection._format_rows (row formats other than 'dict')
+
+'client' is total - server: all of sqlfront's own time, including work in no
+named phase ('other'). Each timed call adds about a microsecond of wrapper
+overhead, mostly to the client side - compare against an untimed run before
+reading small differences. Generator methods (iterate) are not timed.
+"""
+from __future__ import absolute_import
+import json
+import inspect
+import threading
+import collections
+import MySQLdb
+from ..extern import rich_core
+from ..interfaces.sqllistener import clock
+from .mysqldialect import MySQLDialect
+from .mysqlsyntax import MySQLSyntax
+from .mysqlconnection import MySQLConnection
+from .mysqlinterface import MySQLInterface
+
+__all__ = ['MySQLPhaseTimer']
+
+# (owner, attribute, phase)
+PHASES = [
+    (rich_core, 'AssertKlass', 'validate'),
+    (MySQLDialect, 'escape', 'escape'),
+    (MySQLInterface, '_literal', 'escape'),
+    (MySQLSyntax, 'compose', 'compose'),
+    (MySQLSyntax, 'where', 'compose'),
+    (MySQLSyntax, 'limit', 'compose'),
+    (MySQLSyntax, 'compare', 'compose'),
+    (MySQLSyntax, 'late_row_lookup', 'compose'),
+    (MySQLConnection, '_format_rows', 'rows'),
+] + [
+    # The driver's round trips, on whichever classes its version defines them
+    (owner, name, 'server')
+    for owner in [getattr(MySQLdb.cursors, klass, None) for klass in (
+        'BaseCursor', 'CursorStoreResultMixIn', 'CursorUseResultMixIn')]
+    if owner is not None
+    for name in ('execute', 'fetchone', 'fetchmany', 'fetchall')
+    if name in vars(owner)
+]
+
+# Only one timer may be active at a time, as the wrapping is process-wide
+_active_lock = threading.Lock()
+
+
+class MySQLPhaseTimer(object):
+    """Times the phases of MySQLInterface calls, while active (between
+    start() and stop(), or in a 'with' block). Timings accumulate over
+    successive activations, until reset()."""
+    def __init__(self):
+        # method name --> {'calls': n, 'total': seconds, phase: seconds, ...}
+        self._methods = collections.defaultdict(collections.Counter)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patched = None
+
+    #----------------------------------------------------------------
+    # Activation
+    #----------------------------------------------------------------
+    def start(self):
+        """Wrap the timed functions. Raises RuntimeError if a timer is
+        already active."""
+        if not _active_lock.acquire(False):
+            raise RuntimeError("Another MySQLPhaseTimer is already active.")
+        self._patched = []
+        for owner, name, phase in PHASES:
+            self._patch(owner, name, self._phase(phase))
+        for name, member in sorted(vars(MySQLInterface).items()):
+            if (not name.startswith('_') and inspect.isfunction(member)
+                    and not inspect.isgeneratorfunction(member)):
+                self._patch(MySQLInterface, name, self._method(name))
+        return self
+    def stop(self):
+        """Restore the timed functions."""
+        if self._patched is None:
+            return
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched = None
+        _active_lock.release()
+    @property
+    def active(self):
+        return self._patched is not None
+    def __enter__(self):
+        return self.start()
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.stop()
+        return False
+
+    def _patch(self, owner, name, wrap):
+        """Replace owner.name with wrap(function), keeping classmethods and
+        staticmethods as such."""
+        original = vars(owner)[name]
+        if isinstance(original, (classmethod, staticmethod)):
+            replacement = type(original)(wrap(original.__func__))
+        else:
+            replacement = wrap(original)
+        setattr(owner, name, replacement)
+        self._patched.append((owner, name, original))
+
+    def _state(self):
+        """This thread's timing state: the outermost method running, and
+        the phase times accumulated within it."""
+        state = self._local
+        if not hasattr(state, 'method'):
+            state.method = None
+            state.phases = collections.Counter()
+            # Time spent in nested phases, one entry per phase running
+            state.nested = []
+        return state
+
+    def _method(self, name):
+        """Wrapper timing a MySQLInterface method, if outermost."""
+        def wrap(function):
+            def timed(*args, **keywords):
+                state = self._state()
+                if state.method is not None:
+                    return function(*args, **keywords)
+                state.method = name
+                start = clock()
+                try:
+                    return function(*args, **keywords)
+                finally:
+                    elapsed = clock() - start
+                    phases, state.phases = state.phases, collections.Counter()
+                    state.method = None
+                    phases['calls'] = 1
+                    phases['total'] = elapsed
+                    with self._lock:
+                        self._methods[name].update(phases)
+            timed.__name__, timed.__doc__ = function.__name__, function.__doc__
+            return timed
+        return wrap
+
+    def _phase(self, phase):
+        """Wrapper timing a phase, exclusive of phases nested within it."""
+        def wrap(function):
+            def timed(*args, **keywords):
+                state = self._state()
+                if state.method is None:
+                    return function(*args, **keywords)
+                state.nested.append(0.0)
+                start = clock()
+                try:
+                    return function(*args, **keywords)
+                finally:
+                    elapsed = clock() - start
+                    nested = state.nested.pop()
+                    state.phases[phase] += elapsed - nested
+                    if state.nested:
+                        state.nested[-1] += elapsed
+            timed.__name__, timed.__doc__ = function.__name__, function.__doc__
+            return timed
+        return wrap
+
+    #----------------------------------------------------------------
+    # Reporting
+    #----------------------------------------------------------------
+    def report(self):
+        """Timings per method, as a dict of method name to an OrderedDict of
+        calls, total, server, client, and each phase (seconds, summed over
+        calls), in descending order of total time."""
+        with self._lock:
+            methods = dict((name, collections.Counter(timings))
+                           for name, timings in self._methods.items())
+        report = collections.OrderedDict()
+        for name, timings in sorted(methods.items(), key=lambda item: -item[1]['total']):
+            record = collections.OrderedDict([
+                ('calls', timings['calls']),
+                ('total', timings['total']),
+                ('server', timings['server']),
+                ('client', timings['total'] - timings['server']),
+            ])
+            named = 0.0
+            for phase in ('validate', 'escape', 'compose', 'rows'):
+                record[phase] = timings[phase]
+                named += timings[phase]
+            record['other'] = record['client'] - named
+            report[name] = record
+        return report
+    def dumps(self):
+        """report() as JSON."""
+        return json.dumps(self.report(), indent=2)
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+
+    def __repr__(self):
+        return str.format("{0}(active={1}, methods={2})",
+                          type(self).__name__, self.active, len(self._methods))
@@ -0,0 +1,229 @@
+"""
+Thread-safe pool of open MySQLConnection (or MySQLCursor) objects.
+
+Connections are checked out with .checkout(), and are returned to the pool
+by their own __exit__, rather than being closed:
+
+    pool = MySQLConnectionPool(klass=MySQLCursor, max_size=8, config='connection.json')
+    with pool.checkout() as cursor:
+        cursor.run("SELECT count(*) FROM Orders")
+
+@todo: Pool statistics (checkouts, waits, evictions) for instrumentation.
+"""
+from __future__ import absolute_import
+import time
+import threading
+import collections
+import MySQLdb
+from .mysqlconnection import MySQLConnection
+from .mysqlerror import MySQLError, MySQLClosingError, MySQLPoolTimeoutError
+from ..extern import rich_core
+from ..extern.nulltype import NotPassed
+
+__all__ = ['MySQLConnectionPool']
+
+class MySQLConnectionPool(object):
+    """Hands out open connections, and takes them back on __exit__.
+
+    Parameters:
+    klass: connection class to instantiate. MySQLConnection or a subclass,
+        such as MySQLCursor.
+    min_size: number of connections opened up front, and never evicted
+        for idleness.
+    max_size: maximum number of connections open at one time, counting
+        both idle and checked-out connections.
+    timeout: seconds .checkout() waits for a free connection, before raising
+        MySQLPoolTimeoutError. None waits indefinitely.
+    idle_timeout: seconds a connection may sit unused in the pool before it
+        is closed. None never evicts.
+    health_check: if True, ping() connections on checkout, and replace any
+        that the server has dropped.
+    lazy: passed to klass. Lazy connections are only opened on their first
+        .execute(), so checking one out costs no handshake until it is used.
+    All other keywords are passed to klass(...) - host, user, config, etc.
+    """
+    def __init__(self, klass=MySQLConnection, min_size=0, max_size=10,
+                 timeout=None, idle_timeout=None, health_check=True, **keywords):
+        (self.klass, self.min_size, self.max_size,
+            self.timeout, self.idle_timeout) = self._validate(
+                klass, min_size, max_size, timeout, idle_timeout)
+        self.health_check = health_check
+        self.parameters = keywords
+
+        self._idle = collections.deque()    # (last used, connection); newest at right
+        self._size = 0                      # idle + checked out + being opened
+        self._closed = False
+        self._lock = threading.Condition(threading.Lock())
+
+        for _ in range(self.min_size):
+            self._size += 1
+            self._idle.append((time.time(), self._connect()))
+
+    def _validate(self, klass, min_size, max_size, timeout, idle_timeout):    # pylint: disable=R0201
+        """Validate input keywords, for type and default values."""
+        rich_core.AssertKlass(klass, type, name='klass')
+        if not issubclass(klass, MySQLConnection):
+            raise TypeError("'klass' must be a subclass of MySQLConnection.")
+        rich_core.AssertKlass(min_size, (int, long), name='min_size')
+        rich_core.AssertKlass(max_size, (int, long), name='max_size')
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(str.format(
+                "Invalid pool sizes: min_size={0}, max_size={1}.",
+                min_size, max_size
+            ))
+        rich_core.AssertKlass(timeout, (type(None), int, long, float), name='timeout')
+        rich_core.AssertKlass(idle_timeout, (type(None), int, long, float), name='idle_timeout')
+        return klass, min_size, max_size, timeout, idle_timeout
+
+    #----------------------------------------------------------------
+    # Checking connections out and in
+    #----------------------------------------------------------------
+    def checkout(self, timeout=NotPassed):
+        """Return an open connection, opening a new one if none are idle
+        and the pool is below max_size. Otherwise, wait up to 'timeout'
+        seconds for another thread to return one."""
+        if timeout is NotPassed:
+            timeout = self.timeout
+        deadline = None if timeout is None else time.time() + timeout
+
+        while True:
+            connection = self._acquire(deadline)
+            if connection is None:
+                # A slot was reserved for a new connection
+                connection = self._connect()
+            elif self.health_check and not connection.deferred and not connection.ping():
+                self._discard(connection)
+                continue
+            connection.pool = self
+            return connection
+
+    def checkin(self, connection):
+        """Return a connection to the pool. Uncommitted work is rolled back.
+        Called by the connection's __exit__."""
+        connection.pool = None
+        if not connection.deferred:
+            try:
+                connection.rollback()
+            except MySQLdb.Error:
+                self._discard(connection)
+                return
+        with self._lock:
+            if not self._closed:
+                self._idle.append((time.time(), connection))
+                self._lock.notify()
+                return
+        self._discard(connection)
+
+    def _acquire(self, deadline):
+        """Pop an idle connection, or reserve a slot for opening a new one
+        (returning None). Blocks until one of those is possible."""
+        expired = []
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise MySQLError("Connection pool is closed.")
+                expired.extend(self._expired())
+                if self._idle:
+                    connection = self._idle.pop()[1]
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection = None
+                    break
+                if deadline is None:
+                    self._lock.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise MySQLPoolTimeoutError(str.format(
+                            "No connection available within timeout; all {0} are in use.",
+                            self.max_size
+                        ))
+                    self._lock.wait(remaining)
+        for stale in expired:
+            _close_quietly(stale)
+        return connection
+
+    def _expired(self):
+        """Remove idle connections unused for longer than idle_timeout,
+        keeping at least min_size open. Caller must hold the lock.
+        Returns the removed connections, to be closed outside the lock."""
+        expired = []
+        if self.idle_timeout is None:
+            return expired
+        cutoff = time.time() - self.idle_timeout
+        while (self._idle and self._size > self.min_size
+               and self._idle[0][0] < cutoff):
+            expired.append(self._idle.popleft()[1])
+            self._size -= 1
+        return expired
+
+    def _connect(self):
+        """Open a new connection in an already-reserved slot. Releases the
+        slot if opening fails."""
+        try:
+            return self.klass(**self.parameters)
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+
+    def _discard(self, connection):
+        """Close a connection, and free its slot in the pool."""
+        _close_quietly(connection)
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    #----------------------------------------------------------------
+    # Pool state
+    #----------------------------------------------------------------
+    @property
+    def size(self):
+        """Number of open connections, idle or checked out."""
+        return self._size
+    @property
+    def idle(self):
+        """Number of connections waiting in the pool."""
+        return len(self._idle)
+    @property
+    def closed(self):
+        """Predicate. Has the pool been closed?"""
+        return self._closed
+
+    def close(self):
+        """Close all idle connections. Connections still checked out are
+        closed when they are returned."""
+        with self._lock:
+            self._closed = True
+            idle = [connection for _, connection in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for connection in idle:
+            _close_quietly(connection)
+
+    #----------------------------------------------------------------
+    # Context managers
+    #----------------------------------------------------------------
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+        return False
+
+    def __repr__(self):
+        return str.format(
+            "{0}(klass={1}, size={2}, idle={3}, max_size={4})",
+            type(self).__name__, self.klass.__name__,
+            self.size, self.idle, self.max_size
+        )
+
+
+def _close_quietly(connection):
+    """Close a connection, ignoring errors from one already dropped."""
+    try:
+        connection.close()
+    except (MySQLClosingError, MySQLdb.Error):
+        pass
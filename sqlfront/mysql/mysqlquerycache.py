@@ -0,0 +1,303 @@
+"""
+Opt-in cache of query results, for repeated reads of slowly changing tables.
+
+    cache = MySQLQueryCache(max_bytes=32 * 2**20, ttl=300)
+    cursor = MySQLCursor(config='connection.json', query_cache=cache)
+    cursor.count('Countries')     # Runs the query
+    cursor.count('Countries')     # Served from the cache
+
+Only SELECT statements naming their tables are cached (not streamed commands,
+nor ones calling non-deterministic functions such as NOW() or RAND()). Each
+entry is tagged with the tables it reads. Any write executed through a
+connection sharing the cache (INSERT, UPDATE, DELETE, DROP, ALTER, LOAD DATA,
+...) invalidates the entries tagged with the tables it writes - and again when
+it is committed. Writes the statement analysis cannot attribute to tables
+clear the whole cache. Writes made by other clients are only seen once
+entries expire (see 'ttl').
+
+Rows are only stored if no table they read was invalidated while they were
+being read, and (by MySQLConnection) if they were read outside a transaction:
+InnoDB answers reads inside one from the snapshot taken at its first read,
+which may predate writes committed since. MySQLdb leaves autocommit off, so
+for more than the first SELECT after each commit() to be cached, connect with
+autocommit=True.
+
+Tables are matched by name alone, ignoring database and case. That can only
+invalidate more entries than necessary, never fewer. Results themselves are
+keyed by the connection's current database as well as the statement, so
+connections on different default databases - or either side of a USE - do
+not share them.
+"""
+from __future__ import absolute_import
+import re
+import sys
+import time
+import threading
+import collections
+
+__all__ = ['MySQLQueryCache', 'read_tables', 'written_tables', 'used_database']
+
+# Tag matching every table: invalidating it clears the cache
+ALL_TABLES = '*'
+
+
+#==============================================================================
+#    Statement analysis
+#==============================================================================
+# Quoted strings and identifiers, which normalization must leave untouched
+_QUOTED = r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`"
+_NORMALIZE = re.compile("(" + _QUOTED + r")|\s+")
+_STRINGS = re.compile(_QUOTED.rsplit('|', 1)[0])
+
+_NAME = r"(`[^`]+`|[\w$]+)(?:\s*\.\s*(`[^`]+`|[\w$]+))?"
+_ALIAS = (r"(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|INNER|LEFT|RIGHT|CROSS|NATURAL|STRAIGHT_JOIN"
+          r"|ON|USING|GROUP|ORDER|LIMIT|HAVING|UNION|FOR|LOCK|INTO|WINDOW)\b)[\w$]+)?")
+# STRAIGHT_JOIN needs naming: '_' is a word character, so \bJOIN misses it
+_TABLE_LIST = re.compile(
+    r"\b(?:FROM|JOIN|STRAIGHT_JOIN)\s+(" + _NAME + _ALIAS
+    + r"(?:\s*,\s*" + _NAME + _ALIAS + r")*)", re.I)
+_TABLE = re.compile(_NAME)
+_UNCACHEABLE = re.compile(
+    r"\b(?:NOW|SYSDATE|CURDATE|CURTIME|CURRENT_DATE|CURRENT_TIME|CURRENT_TIMESTAMP"
+    r"|UTC_DATE|UTC_TIME|UTC_TIMESTAMP|UNIX_TIMESTAMP|LOCALTIME|LOCALTIMESTAMP"
+    r"|RAND|UUID|UUID_SHORT|CONNECTION_ID|LAST_INSERT_ID|FOUND_ROWS|ROW_COUNT"
+    r"|SLEEP|GET_LOCK|SQL_NO_CACHE|FOR\s+UPDATE|LOCK\s+IN\s+SHARE\s+MODE|INTO)\b"
+    r"|@", re.I)
+
+# Statements which do not change table contents
+_READS = frozenset([
+    'SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN', 'SET', 'USE', 'BEGIN',
+    'START', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'HELP', 'DO', '(',
+])
+# Writes, and where the table written is named
+_WRITES = [re.compile(pattern, re.I) for pattern in [
+    r"^(?:INSERT|REPLACE)\s+(?:(?:LOW_PRIORITY|DELAYED|HIGH_PRIORITY|IGNORE)\s+)*(?:INTO\s+)?" + _NAME,
+    r"^UPDATE\s+(?:(?:LOW_PRIORITY|IGNORE)\s+)*" + _NAME + r"\s+SET\b",
+    r"^DELETE\s+(?:(?:LOW_PRIORITY|QUICK|IGNORE)\s+)*FROM\s+" + _NAME + r"\s*(?:WHERE\b|ORDER\b|LIMIT\b|$)",
+    r"^TRUNCATE\s+(?:TABLE\s+)?" + _NAME,
+    r"^(?:DROP|CREATE)\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?" + _NAME + r"\s*(?:\(|LIKE\b|AS\b|SELECT\b|;|$)",
+    r"^ALTER\s+(?:IGNORE\s+)?TABLE\s+" + _NAME,
+    r"^LOAD\s+DATA\b.*?\bINTO\s+TABLE\s+" + _NAME,
+]]
+_RENAME = re.compile(r"^RENAME\s+TABLE\s+(.*)$", re.I)
+_USE = re.compile(r"^\s*USE\s+(`[^`]+`|[\w$]+)\s*;?\s*$", re.I)
+# Writes which cannot change the contents of existing tables
+_HARMLESS = re.compile(r"^CREATE\s+(?:DATABASE|SCHEMA)\b", re.I)
+
+def normalize(command):
+    """Command text with runs of whitespace (outside quotes) collapsed, and
+    any trailing ';' removed - so trivially different spellings of a query
+    share cache entries."""
+    text = _NORMALIZE.sub(lambda match: match.group(1) or ' ', command).strip()
+    return text[:-1].rstrip() if text.endswith(';') else text
+
+def _tag(database, table):
+    """Cache tag for a (possibly qualified) table name."""
+    return (table or database).strip('`').lower()
+
+def read_tables(command):
+    """Tables read by a cacheable SELECT, as a tuple of tags. None if the
+    statement should not be cached: not a SELECT, not naming its tables, or
+    calling non-deterministic functions."""
+    text = normalize(command)
+    if not text[:6].upper() == 'SELECT':
+        return None
+    bare = _STRINGS.sub("''", text)
+    if _UNCACHEABLE.search(bare):
+        return None
+    tables = set()
+    for table_list in _TABLE_LIST.finditer(bare):
+        for part in table_list.group(1).split(','):
+            match = _TABLE.match(part.strip())
+            tables.add(_tag(match.group(1), match.group(2)))
+    if not tables:
+        return None
+    return tuple(sorted(tables))
+
+def written_tables(command):
+    """Tables a statement may change, as a tuple of tags. None if it only
+    reads; (ALL_TABLES,) if it writes, but to tables it does not name in a
+    recognised form (stored procedures, DROP DATABASE, multi-table DELETE...)."""
+    text = normalize(command)
+    first = text.split(None, 1)[0].upper() if text else ''
+    if first in _READS or first.startswith('('):
+        return None
+    if _HARMLESS.match(text):
+        return ()
+    for pattern in _WRITES:
+        match = pattern.match(text)
+        if match is not None:
+            return (_tag(match.group(1), match.group(2)), )
+    match = _RENAME.match(text)
+    if match is not None:
+        names = re.split(r"\s*,\s*|\s+TO\s+", match.group(1), flags=re.I)
+        return tuple(_tag(*_TABLE.match(name).groups()) for name in names if name)
+    return (ALL_TABLES, )
+
+def used_database(command):
+    """The database a 'USE database' statement switches to; else None."""
+    match = _USE.match(command)
+    if match is None:
+        return None
+    return match.group(1).strip('`')
+
+
+#==============================================================================
+#    Cache
+#==============================================================================
+class MySQLQueryCache(object):
+    """Thread-safe cache of query results, shared by any number of
+    connections. Entries are evicted least recently used first, once the
+    estimated size of all cached results exceeds 'max_bytes', and expire
+    'ttl' seconds after they were stored (None: never).
+
+    get() returns a copy of the stored rows (down to dict rows, and the
+    columns of columnar results), so callers may change what they get.
+    """
+    def __init__(self, max_bytes=64 * 2**20, ttl=60):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = self.misses = 0
+        # key --> (rows, tables, expires, size); least recently used first
+        self._entries = collections.OrderedDict()
+        # table tag --> set of keys
+        self._tagged = collections.defaultdict(set)
+        # table tag --> number of invalidations, and the number of clear()s,
+        # so set() can refuse rows read while their tables were written
+        self._generations = collections.defaultdict(int)
+        self._cleared = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(command, parameters=None, row_format=None, database=None):
+        """Cache key for a command, run with 'database' as the current
+        database - the same unqualified table name may be another table in
+        another database. None if parameters are not hashable."""
+        if isinstance(parameters, collections.Mapping):
+            parameters = tuple(sorted(parameters.items()))
+        elif isinstance(parameters, list):
+            parameters = tuple(parameters)
+        key = (database, normalize(command), parameters, row_format)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key):
+        """Cached rows for a key, or None if not cached (or expired)."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                if entry[2] is None or entry[2] > time.time():
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return _copy(entry[0])
+                self._remove(key, entry)
+            self.misses += 1
+            return None
+
+    def generation(self, tables):
+        """Invalidation state of 'tables' (tags, as from read_tables()). Take
+        it before reading rows, and pass it to set()."""
+        with self._lock:
+            return self._generation(tables)
+    def _generation(self, tables):
+        """generation(), for a caller holding the lock."""
+        return (self._cleared, tuple(self._generations.get(table, 0) for table in tables))
+
+    def set(self, key, rows, tables, generation=None):
+        """Store rows read from 'tables' (tags, as from read_tables()). If
+        'generation' is given (from generation(), taken before the rows were
+        read), the rows are not stored if any of the tables has been
+        invalidated since - they may predate the write."""
+        size = _sizeof(rows)
+        if size > self.max_bytes or self.ttl == 0:
+            return rows
+        expires = None if self.ttl is None else time.time() + self.ttl
+        stored = _copy(rows)
+        with self._lock:
+            if generation is not None and generation != self._generation(tables):
+                return rows
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._remove(key, previous)
+            self._entries[key] = (stored, tables, expires, size)
+            for table in tables:
+                self._tagged[table].add(key)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest, self._entries.pop(oldest))
+        return rows
+
+    def invalidate(self, tables=None):
+        """Remove entries reading any of 'tables' (names or tags), or all
+        entries if tables is None or includes ALL_TABLES."""
+        if tables is None or ALL_TABLES in tables:
+            return self.clear()
+        with self._lock:
+            for table in tables:
+                table = _tag(None, table.rsplit('.', 1)[-1])
+                self._generations[table] += 1
+                for key in self._tagged.pop(table, ()):
+                    entry = self._entries.pop(key, None)
+                    if entry is not None:
+                        self._remove(key, entry)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+            self._generations.clear()
+            self._cleared += 1
+            self.bytes = 0
+
+    def _remove(self, key, entry):
+        """Drop a popped entry's tags, and size. Caller must hold the lock."""
+        for table in entry[1]:
+            keys = self._tagged.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[table]
+        self.bytes -= entry[3]
+
+    def __len__(self):
+        return len(self._entries)
+    def __contains__(self, key):
+        return key in self._entries
+    def __repr__(self):
+        return str.format(
+            "{0}(entries={1}, bytes={2}, max_bytes={3}, ttl={4}, hits={5}, misses={6})",
+            type(self).__name__, len(self), self.bytes, self.max_bytes,
+            self.ttl, self.hits, self.misses
+        )
+
+
+def _copy(rows):
+    """Copy of a result, sharing no mutable part with it."""
+    if isinstance(rows, collections.Mapping):
+        # Columnar: column name --> array or list
+        return type(rows)((name, column[:]) for name, column in rows.items())
+    copied = [row.copy() if isinstance(row, dict) else row for row in rows]
+    return tuple(copied) if isinstance(rows, tuple) else copied
+
+def _sizeof(rows):
+    """Estimated memory held by a result: its containers and values."""
+    size = sys.getsizeof(rows)
+    if isinstance(rows, collections.Mapping):
+        # Columnar: column name --> array (sized with its buffer) or list
+        for column in rows.values():
+            size += sys.getsizeof(column)
+            if isinstance(column, list):
+                size += sum(sys.getsizeof(value) for value in column)
+        return size
+    for row in rows:
+        size += sys.getsizeof(row)
+        values = row.values() if isinstance(row, collections.Mapping) else row
+        if isinstance(values, (list, tuple)):
+            size += sum(sys.getsizeof(value) for value in values)
+    return size
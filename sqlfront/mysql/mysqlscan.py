@@ -0,0 +1,181 @@
+"""
+Parallel table scans: a table is split into primary key ranges, and each range
+is read on its own pooled connection, in its own thread. Used to export whole
+tables faster than a single connection can fetch them.
+
+    pool = MySQLConnectionPool(klass=MySQLCursor, max_size=8, config='connection.json')
+    for row in parallel_scan(pool, 'Orders', workers=8):
+        ...
+
+Each range is read by keyset pagination (see MySQLInterface.iterate), so the
+pool's connection class must be MySQLCursor (or another MySQLInterface).
+"""
+from __future__ import absolute_import
+import threading
+import Queue
+from ..extern import rich_core
+from ..extern.nulltype import NotPassed
+from ..util.utilities import Qualified
+
+__all__ = ['parallel_scan', 'key_ranges']
+
+# Seconds between checks for cancellation, while a reader waits on a full queue
+_POLL = 0.1
+
+
+def key_ranges(cursor, table, parts, key=None, database=None):
+    """Split a table into (up to) 'parts' ranges of primary key, as a list of
+    (start, stop) pairs in key order: start <= key < stop. The first start
+    and the last stop are None (unbounded).
+
+    Single-column integer keys are split evenly between MIN() and MAX().
+    Other keys (composite, or non-numeric) are split at sampled boundaries,
+    so ranges hold similar numbers of rows: one statement probes the key
+    index at each boundary's row offset ('ORDER BY key LIMIT 1 OFFSET n'),
+    and only the parts - 1 boundary keys are sent back. This is not cheap
+    on the server: each probe walks the index up to its offset, so with
+    the COUNT(*) for the offsets, about (parts + 1) / 2 * rows index
+    entries are read in all.
+    """
+    if key is None:
+        key = cursor.primary_keys(table, database=database)
+    key = rich_core.ensure_tuple(key)
+    table_name = Qualified(database=database, table=table)
+    if parts <= 1:
+        return [(None, None)]
+
+    if len(key) == 1:
+        low, high = cursor.run(str.format(
+            "SELECT MIN({0}), MAX({0}) FROM {1};", key[0], table_name
+        ), row_format='tuple')[0]
+        if low is None:
+            # Empty table
+            return [(None, None)]
+        if isinstance(low, (int, long)) and isinstance(high, (int, long)):
+            step = (high - low + 1) / float(parts)
+            boundaries = sorted(set(low + int(step * index) for index in range(1, parts)))
+            return _pairs([boundary for boundary in boundaries if low < boundary <= high])
+
+    total = int(cursor.run(
+        "SELECT COUNT(*) FROM {0};".format(table_name), row_format='tuple')[0][0])
+    offsets = sorted(set(total * index // parts for index in range(1, parts)) - set([0]))
+    if not offsets:
+        return [(None, None)]
+    rows = cursor.run("\nUNION ALL\n".join(
+        str.format("(SELECT {0} FROM {1} ORDER BY {0} LIMIT 1 OFFSET {2:d})",
+                   ', '.join(key), table_name, offset)
+        for offset in offsets
+    ) + ";", row_format='tuple')
+    # UNION ALL does not promise the probes' order
+    boundaries = sorted(set(row[0] if len(key) == 1 else tuple(row) for row in rows))
+    return _pairs(boundaries)
+
+def _pairs(boundaries):
+    """[b1, b2] --> [(None, b1), (b1, b2), (b2, None)]"""
+    edges = [None] + list(boundaries) + [None]
+    return zip(edges[:-1], edges[1:])
+
+
+def parallel_scan(pool, table, workers=4, where=None, columns='*', key=None,
+                  database=None, ordered=False, page_size=10000,
+                  row_format=NotPassed, prefetch=4):
+    """Iterate over all rows of a table, read in parallel: the table is split
+    into 'workers' key ranges (see key_ranges()), and each range is read on
+    a connection checked out of 'pool', by its own thread.
+
+    If 'ordered' is False, rows are returned as soon as any range produces
+    them. If True, rows come back in key order: since the ranges do not
+    overlap, this is each range's rows in turn, while the later ranges are
+    read ahead.
+
+    Each reader holds at most 'prefetch' pages (of 'page_size' rows) waiting
+    to be consumed. If iteration stops early, the readers are stopped, and
+    their connections returned to the pool. An error in any reader is
+    raised here.
+    'where', 'columns', 'key', 'database', and 'row_format' are as for
+    MySQLInterface.iterate().
+    """
+    with pool.checkout() as cursor:
+        if key is None:
+            key = cursor.primary_keys(table, database=database)
+        ranges = key_ranges(cursor, table, workers, key=key, database=database)
+
+    keywords = dict(where=where, columns=columns, key=key, database=database,
+                    page_size=page_size, row_format=row_format)
+    stopped = threading.Event()
+    if ordered:
+        queues = [Queue.Queue(maxsize=prefetch) for _ in ranges]
+    else:
+        queues = [Queue.Queue(maxsize=prefetch * len(ranges))] * len(ranges)
+    readers = [
+        _RangeReader(pool, table, start, stop, keywords, queue, stopped)
+        for (start, stop), queue in zip(ranges, queues)
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        if ordered:
+            for queue in queues:
+                for page in _pages(queue, 1):
+                    for row in page:
+                        yield row
+        else:
+            for page in _pages(queues[0], len(readers)):
+                for row in page:
+                    yield row
+    finally:
+        stopped.set()
+        for reader in readers:
+            reader.join()
+
+def _pages(queue, readers):
+    """Pages from a queue, until 'readers' readers have finished."""
+    while readers:
+        page, error = queue.get()
+        if error is not None:
+            raise error
+        if page is None:
+            readers -= 1
+        else:
+            yield page
+
+
+class _RangeReader(threading.Thread):
+    """Reads one key range on a pooled connection, and puts its rows on a
+    queue, a page at a time, as (page, None). Puts (None, None) when done,
+    or (None, exception) on error."""
+    def __init__(self, pool, table, start, stop, keywords, queue, stopped):
+        super(_RangeReader, self).__init__(name='sqlfront-scan-reader')
+        self.daemon = True
+        self.pool, self.table, self.start_key, self.stop_key = pool, table, start, stop
+        self.keywords, self.queue, self.stopped = keywords, queue, stopped
+
+    def run(self):
+        try:
+            page_size = self.keywords['page_size']
+            with self.pool.checkout() as cursor:
+                page = []
+                for row in cursor.iterate(self.table, start=self.start_key,
+                                          stop=self.stop_key, **self.keywords):
+                    page.append(row)
+                    if len(page) >= page_size:
+                        if not self._put((page, None)):
+                            return
+                        page = []
+                if page and not self._put((page, None)):
+                    return
+            self._put((None, None))
+        except Exception as exc:    # pylint: disable=broad-except
+            self._put((None, exc))
+
+    def _put(self, item):
+        """Put an item on the queue, waiting while it is full. Returns False
+        if the scan was stopped before there was room."""
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=_POLL)
+                return True
+            except Queue.Full:
+                pass
+        return False
@@ -0,0 +1,82 @@
+"""
+Cache of table metadata (DESCRIBE results), for MySQLInterface.
+
+Each MySQLInterface creates its own cache on first use. To share one between
+several cursors - for example, every cursor in a MySQLConnectionPool - assign
+the same instance to each:
+
+    cache = MySQLSchemaCache(ttl=600)
+    cursor.schema_cache = cache
+
+Entries expire after 'ttl' seconds, and are invalidated by structure-changing
+methods run through the interface (drop, create_table, copy_table,
+rename_database). DDL run directly through .execute() is not seen; call
+.invalidate() after it.
+"""
+from __future__ import absolute_import
+import time
+import threading
+
+__all__ = ['MySQLSchemaCache']
+
+class MySQLSchemaCache(object):
+    """Thread-safe mapping of (database, table) to cached table descriptions.
+    database is None for tables in the connection's default database.
+
+    ttl: seconds an entry stays valid. None never expires; 0 disables caching.
+    """
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._entries = {}  # (database, table) --> (expiry time, description)
+        self._lock = threading.Lock()
+
+    def get(self, database, table):
+        """Return the cached description, or None if absent or expired."""
+        key = (database, table)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, description = entry
+            if expires is not None and expires <= time.time():
+                del self._entries[key]
+                return None
+            return description
+
+    def set(self, database, table, description):
+        """Cache a description. Returns it, for convenience."""
+        if self.ttl == 0:
+            return description
+        expires = None if self.ttl is None else time.time() + self.ttl
+        with self._lock:
+            self._entries[(database, table)] = (expires, description)
+        return description
+
+    def invalidate(self, database=None, table=None):
+        """Forget cached descriptions. With a table, forget that table (in
+        any database, if database is None). With only a database, forget
+        all of its tables. With neither, forget everything."""
+        with self._lock:
+            if table is None and database is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                key_database, key_table = key
+                if table is not None and key_table != table:
+                    continue
+                if database is not None and key_database != database:
+                    continue
+                del self._entries[key]
+
+    def clear(self):
+        """Forget everything."""
+        self.invalidate()
+
+    def __len__(self):
+        return len(self._entries)
+    def __contains__(self, key):
+        return self.get(*key) is not None
+    def __repr__(self):
+        return "{0}(ttl={1!r}, entries={2})".format(
+            type(self).__name__, self.ttl, len(self._entries)
+        )
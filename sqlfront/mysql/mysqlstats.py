@@ -0,0 +1,288 @@
+"""
+In-process statement statistics: latency, rows and bytes per statement
+'fingerprint' - the statement with its literals and placeholders replaced by
+'?', so that every run of a query counts together, whatever its values.
+
+    stats = MySQLQueryStats(slow_threshold=0.5, slow_log='/tmp/slow.jsonl')
+    cursor = MySQLCursor(config='connection.json', listeners=[stats])
+    ...
+    stats.dump('/tmp/sqlfront-stats.json')
+
+MySQLQueryStats is a SQLListener (see interfaces/sqllistener.py): share one
+between connections, or pass it to a pool (listeners=[stats]), to aggregate
+them all. Percentiles come from a fixed-bucket histogram, so memory per
+fingerprint is constant, and accurate to within a bucket (about 19%).
+"""
+from __future__ import absolute_import
+import re
+import sys
+import json
+import time
+import threading
+import collections
+from ..interfaces import SQLListener
+from .mysqlquerycache import normalize
+
+__all__ = ['MySQLQueryStats', 'fingerprint']
+
+# Fingerprints are memoized for commands shorter than this (long ones - bulk
+# INSERTs - rarely repeat), up to this many characters of commands in all
+_MEMO_COMMAND = 1024
+_MEMO_BUDGET = 4 * 2**20
+
+
+#==============================================================================
+#    Fingerprints
+#==============================================================================
+_LITERALS = re.compile(
+    r"'(?:[^'\\]|\\.|'')*'"             # Strings, as escaped by MySQLDialect.format
+    r"|\"(?:[^\"\\]|\\.)*\""
+    r"|%\(\w+\)s|%s"                    # Driver placeholders
+    r"|\b0x[0-9a-fA-F]+\b"
+    r"|(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b"
+    r"|\bNULL\b", re.I)
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+
+def fingerprint(command):
+    """Statement with literals replaced by '?', and lists of them - IN lists,
+    and the rows of multi-row INSERTs - collapsed to one entry.
+
+    >>> fingerprint("SELECT * FROM Orders WHERE id IN ('1', '2', 3)  LIMIT 10;")
+    'SELECT * FROM Orders WHERE id IN (?+) LIMIT ?'
+    >>> fingerprint("INSERT INTO t (a, b) VALUES ('x', NULL), ('y', 2);")
+    'INSERT INTO t (a, b) VALUES (?+)'
+    """
+    text = _LITERALS.sub('?', normalize(command))
+    return _LISTS.sub('(?+)', text)
+
+
+#==============================================================================
+#    Histogram
+#==============================================================================
+# Bucket upper bounds, in seconds: 10us to ~100s, 2**(1/4) apart
+_BOUNDS = tuple(1e-5 * 2 ** (index / 4.0) for index in range(94))
+
+class _Histogram(object):
+    """Counts of durations, in fixed logarithmic buckets."""
+    __slots__ = ('counts', )
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+    def add(self, duration):
+        self.counts[_bucket(duration)] += 1
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of durations
+        (None if empty)."""
+        total = sum(self.counts)
+        if not total:
+            return None
+        rank = fraction * total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return _BOUNDS[index] if index < len(_BOUNDS) else float('inf')
+        return float('inf')
+
+def _bucket(duration):
+    """Index of the first bound >= duration (binary search)."""
+    low, high = 0, len(_BOUNDS)
+    while low < high:
+        middle = (low + high) // 2
+        if _BOUNDS[middle] < duration:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+#==============================================================================
+#    Statistics
+#==============================================================================
+class StatementStats(object):
+    """Aggregates for one fingerprint. Times are in seconds; 'time' is the
+    total spent executing and fetching. 'max_time' and the percentiles are
+    of execution alone (one sample per statement run)."""
+    __slots__ = ('fingerprint', 'count', 'errors', 'time', 'fetch_time',
+                 'max_time', 'rows', 'bytes', 'histogram', 'call_sites')
+    def __init__(self, key):
+        self.fingerprint = key
+        self.count = self.errors = self.rows = self.bytes = 0
+        self.time = self.fetch_time = self.max_time = 0.0
+        self.histogram = _Histogram()
+        self.call_sites = None
+
+    @property
+    def mean(self):
+        return self.time / self.count if self.count else None
+
+    def as_dict(self):
+        record = collections.OrderedDict([
+            ('fingerprint', self.fingerprint),
+            ('count', self.count),
+            ('errors', self.errors),
+            ('total_time', self.time),
+            ('mean_time', self.mean),
+            ('max_time', self.max_time),
+            ('fetch_time', self.fetch_time),
+            ('p50', self.histogram.percentile(0.50)),
+            ('p95', self.histogram.percentile(0.95)),
+            ('p99', self.histogram.percentile(0.99)),
+            ('rows', self.rows),
+            ('bytes', self.bytes),
+        ])
+        if self.call_sites is not None:
+            record['call_sites'] = collections.OrderedDict(self.call_sites.most_common())
+        return record
+
+
+class MySQLQueryStats(SQLListener):
+    """Statistics registry, keyed by statement fingerprint. Thread-safe.
+
+    Parameters:
+    slow_threshold: seconds. Statements whose execution takes longer are
+        logged as slow (None: no slow log).
+    slow_log: where slow statements go, besides self.slow_queries (the most
+        recent 'slow_history'): a file path (a JSON record is appended per
+        line), or a callable, given the record.
+    call_sites: if True, also count the calling line outside sqlfront for
+        each fingerprint - identifying which code paths spend database time,
+        at the cost of a stack walk per statement.
+    """
+    def __init__(self, slow_threshold=1.0, slow_log=None, call_sites=False,
+                 slow_history=100):
+        self.slow_threshold, self.slow_log = slow_threshold, slow_log
+        self.call_sites = call_sites
+        self.slow_queries = collections.deque(maxlen=slow_history)
+        self._stats = {}
+        self._fingerprints = {}
+        self._memo_size = 0
+        self._lock = threading.Lock()
+
+    #----------------------------------------------------------------
+    # SQLListener hooks
+    #----------------------------------------------------------------
+    def after_execute(self, event):
+        stats = self._record(event)
+        site = _call_site() if stats.call_sites is not None else None
+        with self._lock:
+            stats.count += 1
+            stats.time += event.duration
+            stats.max_time = max(stats.max_time, event.duration)
+            stats.histogram.add(event.duration)
+            if site is not None:
+                stats.call_sites[site] += 1
+        if self.slow_threshold is not None and event.duration > self.slow_threshold:
+            self._slow(stats.fingerprint, event)
+    def after_fetch(self, event):
+        if event.command is None:
+            return
+        stats = self._record(event)
+        size = _payload_bytes(event.result)
+        with self._lock:
+            stats.time += event.duration
+            stats.fetch_time += event.duration
+            stats.rows += event.rows or 0
+            stats.bytes += size
+    def on_error(self, event):
+        if event.command is None:
+            return
+        stats = self._record(event)
+        with self._lock:
+            stats.errors += 1
+
+    def _record(self, event):
+        """StatementStats for the event's command, created if new."""
+        command = event.command
+        key = self._fingerprints.get(command)
+        if key is None:
+            key = fingerprint(command)
+            if len(command) < _MEMO_COMMAND and self._memo_size < _MEMO_BUDGET:
+                # Memoized: parsing costs more than the lookup
+                self._fingerprints[command] = key
+                self._memo_size += len(command)
+        stats = self._stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(key, StatementStats(key))
+                if self.call_sites and stats.call_sites is None:
+                    stats.call_sites = collections.Counter()
+        return stats
+
+    def _slow(self, key, event):
+        """Log a slow statement."""
+        record = collections.OrderedDict([
+            ('time', time.time()),
+            ('duration', event.duration),
+            ('fingerprint', key),
+            ('command', event.command[:2000]),
+            ('rows', event.rows),
+            ('connection', event.connection_id),
+        ])
+        self.slow_queries.append(record)
+        if callable(self.slow_log):
+            self.slow_log(record)
+        elif self.slow_log is not None:
+            with open(self.slow_log, 'a') as log:
+                log.write(json.dumps(record) + "\n")
+
+    #----------------------------------------------------------------
+    # Reporting
+    #----------------------------------------------------------------
+    def report(self, sort='total_time', limit=None):
+        """Statistics per fingerprint, as a list of dicts, in descending
+        order of 'sort' (any of their keys)."""
+        with self._lock:
+            records = [stats.as_dict() for stats in self._stats.values()]
+        records.sort(key=lambda record: record[sort], reverse=True)
+        return records[:limit] if limit is not None else records
+    def dumps(self, **keywords):
+        """report() as JSON. Keywords are as for report()."""
+        return json.dumps(self.report(**keywords), indent=2)
+    def dump(self, path, **keywords):
+        """Write report() to a JSON file."""
+        with open(path, 'w') as output:
+            output.write(self.dumps(**keywords))
+    def reset(self):
+        """Forget all statistics."""
+        with self._lock:
+            self._stats.clear()
+            self.slow_queries.clear()
+
+    def __getitem__(self, key):
+        """StatementStats for a fingerprint - or for a command, fingerprinted."""
+        return self._stats.get(key) or self._stats[fingerprint(key)]
+    def __len__(self):
+        return len(self._stats)
+    def __repr__(self):
+        return str.format("{0}(fingerprints={1}, slow_threshold={2})",
+                          type(self).__name__, len(self), self.slow_threshold)
+
+
+def _payload_bytes(rows):
+    """Estimated bytes of data in fetched rows: the length of each string
+    value, and 8 for each other non-NULL value."""
+    if not rows:
+        return 0
+    size = 0
+    for row in rows:
+        values = row.values() if isinstance(row, collections.Mapping) else row
+        for value in values:
+            if isinstance(value, basestring):
+                size += len(value)
+            elif value is not None:
+                size += 8
+    return size
+
+def _call_site():
+    """'file:line function' of the innermost frame outside sqlfront (its
+    tests count as callers)."""
+    frame = sys._getframe(2)     # pylint: disable=W0212
+    while frame is not None and _internal(frame.f_globals.get('__name__', '')):
+        frame = frame.f_back
+    if frame is None:
+        return '?'
+    return str.format("{0}:{1} {2}", frame.f_code.co_filename, frame.f_lineno,
+                      frame.f_code.co_name)
+
+def _internal(module):
+    return module.startswith('sqlfront.') and not module.startswith('sqlfront.test')
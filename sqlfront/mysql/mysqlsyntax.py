@@ -1,6 +1,139 @@
 from __future__ import absolute_import
+import collections
 from ..interfaces import SQLSyntax
+from ..extern import rich_core
 from .mysqldialect import MySQLDialect
 
 class MySQLSyntax(SQLSyntax, MySQLDialect):
-    pass
+    """Convience-class; used to compose the syntax of MySQL queries."""
+    @classmethod
+    def where(cls, data=None):
+        """
+        'iterable' specifies {column}={value} pairs.
+        Either as an iterable of pairs, or as a dict.
+
+        >>> data = {"cid":"20381", "cd_molweight":"381.2", "LogP":"-2.2"}
+        >>> MySQLSyntax.where(data)
+        "WHERE cd_molweight = '381.2' AND LogP = '-2.2' AND cid = '20381'"
+        """
+        #[] Validation
+        valid_types = (type(None), collections.Mapping, rich_core.NonStringIterable)
+        rich_core.AssertKlass(data, valid_types)
+
+        if isinstance(data, type(None)):
+            return ""
+        #Make Iterator ~ Dispatch on Dict or sequence of pairs
+        else:
+            if isinstance(data, collections.Mapping):
+                iterator = iter(data.items())
+            else:   #isinstance(data, rich_core.NonStringIterable):
+                iterator = ((col, val) for col, val in data)
+
+            parts = [
+                "{0} = '{1}'".format(col, cls.escape(val))
+                for col, val in iterator
+            ]
+            return "WHERE "+ " AND ".join(parts)
+    @classmethod
+    def limit(cls, limits=None):
+        """Apply a limit clause."""
+        if isinstance(limits, type(None)):
+            return ""
+        elif isinstance(limits, collections.Sequence) and not isinstance(limits, basestring):
+            if len(limits) == 1:
+                return "LIMIT {0}".format(limits[0])
+            elif len(limits) == 2:
+                return "LIMIT {0}, {1}".format(limits[0], limits[1])
+            else:
+                raise ValueError("Invalid 'limits' length: must be 1 or 2.")
+        elif isinstance(limits, (basestring, int, long)):
+            return "LIMIT "+str(limits)
+        else:
+            raise TypeError("Expected None, Sequence, basestring, or int.")
+    @classmethod
+    def compare(cls, columns, values, operator):
+        """Condition comparing columns to values (placeholders, or escaped
+        literals) as tuples - in order, column by column - as the row
+        comparison '(a, b) > (x, y)' would. Written out, so that MySQL can use
+        an index range scan on the leading column.
+
+        >>> MySQLSyntax.compare(('a', 'b'), ('1', '2'), '>')
+        'a >= 1 AND (a > 1 OR (a = 1 AND b > 2))'
+        """
+        if operator not in ('<', '<=', '>', '>='):
+            raise ValueError("Invalid comparison operator: " + repr(operator))
+        strict = operator[0]
+        condition = "{0} {1} {2}".format(columns[-1], operator, values[-1])
+        for column, value in reversed(zip(columns[:-1], values[:-1])):
+            condition = "({0} {1} {2} OR ({0} = {2} AND {3}))".format(
+                column, strict, value, condition)
+        if len(columns) > 1:
+            condition = "{0} {1}= {2} AND {3}".format(columns[0], strict, values[0], condition)
+        return condition
+    @classmethod
+    def late_row_lookup(cls, table, key, offset, count, columns='*', where=None):
+        """Select rows offset..offset+count of a table, in key order, as a
+        'late row lookup' (deferred join): the inner query pages through the
+        key index alone, and only the selected rows are read from the table.
+        For large offsets this is often orders of magnitude faster than
+        'LIMIT offset, count', which reads and discards every skipped row.
+
+        >>> print MySQLSyntax.late_row_lookup('orders', 'id', 50000, 10),
+        SELECT outerT.*
+        FROM orders AS outerT
+        JOIN (SELECT id FROM orders ORDER BY id LIMIT 50000, 10) AS innerT
+        ON outerT.id = innerT.id
+        ORDER BY outerT.id;
+        """
+        key = rich_core.ensure_tuple(key)
+        columns = rich_core.ensure_tuple(columns)
+        inner = ' '.join(part for part in [
+            "SELECT " + ', '.join(key),
+            "FROM " + str(table),
+            cls.where(where),
+            "ORDER BY " + ', '.join(key),
+            cls.limit((int(offset), int(count)))
+        ] if part)
+        return cls.compose(
+            "SELECT " + ', '.join("outerT." + str(column) for column in columns),
+            "FROM {0} AS outerT".format(table),
+            "JOIN ({0}) AS innerT".format(inner),
+            "ON " + " AND ".join(
+                "outerT.{0} = innerT.{0}".format(column) for column in key),
+            "ORDER BY " + ', '.join("outerT." + column for column in key)
+        )
+    @classmethod
+    def compose(cls, *clauses, **format_inserts):
+        '''Turn SQL clauses into a single statement string,
+        formatted for readability, and removing empty clauses.
+            Keyword arguments are applied as formatting ~clause.format(kwarg).Example:
+
+        >>> MySQLSyntax.compose(
+        ...     "SELECT *",
+        ...     "FROM {table}",
+        ...     "{where}",
+        ...     "LIMIT 1",
+        ...     table='protein', where=''
+        ... )
+        'SELECT *\\nFROM protein\\nLIMIT 1;\\n'
+        '''
+        #[] Apply formatting (which may make some parts empty)
+        if format_inserts:
+            parts = [part.format(**format_inserts) for part in clauses]
+        else:
+            parts = list(clauses)
+
+        #[] Filter out empty parts
+        parts = [part for part in parts if part not in (None, '')]
+
+        #[] Ensure that sequence ends with ';\n'
+        if parts[-1].endswith(';'):
+            parts[-1] += '\n'
+        elif parts[-1].endswith(';\n'):
+            pass
+        elif parts[-1].endswith('\n'):
+            parts[-1] = parts[-1][:-1]+';\n'
+        else:
+            parts[-1] += ';\n'
+        phrase = '\n'.join(parts)
+        return phrase
@@ -0,0 +1,75 @@
+from __future__ import absolute_import
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+BENCHMARKS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'benchmarks')
+
+
+class OfflineBenchmarkTests(unittest.TestCase):
+    """The benchmark suite runs on its fake driver, in a process of its own
+    (the driver must be installed before sqlfront is imported)."""
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_suite(self, *arguments):
+        output = os.path.join(self.directory, 'results.json')
+        subprocess.check_call(
+            [sys.executable, os.path.join(BENCHMARKS, 'bench.py'), '--output', output,
+             '--duration', '0.001', '--repeat', '1', '--rows', '20'] + list(arguments),
+            stderr=open(os.devnull, 'w'))
+        with open(output) as results:
+            return json.load(results)
+
+    def test_all(self):
+        document = self.run_suite()
+        self.assertEqual(document['config']['rows'], 20)
+        for name in ('dialect_format', 'insert_many_1000', 'get_many_100', 'results_columnar'):
+            self.assert_(document['results'][name]['us_per_call'] > 0, name)
+
+    def test_filter(self):
+        document = self.run_suite('--filter', 'syntax', '--label', 'check')
+        self.assertEqual(sorted(document['results']), ['syntax_compose', 'syntax_where'])
+        self.assertEqual(document['label'], 'check')
+
+
+class ThroughputHarnessTests(unittest.TestCase):
+    """Dry runs of the throughput harness and data generator, on the fake driver."""
+    def test_throughput(self):
+        directory = tempfile.mkdtemp()
+        try:
+            output = os.path.join(directory, 'throughput.json')
+            subprocess.check_call(
+                [sys.executable, os.path.join(BENCHMARKS, 'throughput.py'), '--fake',
+                 '--clients', '1', '2', '--duration', '0.05', '--page-size', '100',
+                 '--batch-rows', '10', '--output', output],
+                stderr=open(os.devnull, 'w'))
+            with open(output) as results:
+                document = json.load(results)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(sorted(document['results']), ['ingest', 'lookup', 'scan'])
+        for records in document['results'].values():
+            self.assertEqual([record['clients'] for record in records], [1, 2])
+            self.assert_(all(record['operations'] > 0 for record in records))
+        self.assert_(document['results']['scan'][0]['mb_per_second'] > 0)
+
+    def test_generate(self):
+        output = subprocess.check_output(
+            [sys.executable, os.path.join(BENCHMARKS, 'generate.py'), '--fake',
+             '--persons', '10', '--orders', '100'],
+            stderr=open(os.devnull, 'w'))
+        self.assert_('Orders' in output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+from __future__ import absolute_import
+import inspect
+import unittest
+import threading
+
+from sqlfront.interfaces import SQLClosingError
+from sqlfront.mysql.mysqlasync import AsyncMySQLConnection, AsyncMySQLCursor
+from sqlfront.mysql.mysqlinterface import MySQLInterface
+from sqlfront.util.offload import OffloadFuture
+
+
+class FakeSyncConnection(object):
+    """Records the thread each call runs on."""
+    def __init__(self, lazy=False, **keywords):
+        self.lazy = lazy
+        self.threads = []
+        self.batches = [[1, 2], [3]]
+        self.closed = False
+    def execute(self, command, parameters=None, stream=False, **keywords):
+        self.threads.append(threading.current_thread())
+        if command == "FAIL":
+            raise ValueError("Bad command")
+        return 3
+    def results(self, size=None, **keywords):
+        return self.batches.pop(0) if self.batches else []
+    def run(self, command, parameters=None, **keywords):
+        self.execute(command, parameters)
+        return [{'count': 3}]
+    def commit(self):
+        self.threads.append(threading.current_thread())
+    def close(self):
+        self.closed = True
+
+class FakeAsyncConnection(AsyncMySQLConnection):
+    klass = FakeSyncConnection
+
+
+class OffloadFutureTests(unittest.TestCase):
+    def test_callbacks(self):
+        future = OffloadFuture()
+        seen = []
+        future.add_done_callback(seen.append)
+        future.set_result(5)
+        future.add_done_callback(seen.append)
+        self.assertEqual(seen, [future, future])
+        self.assertEqual(future.result(), 5)
+
+    def test_exception(self):
+        future = OffloadFuture()
+        future.set_exception(KeyError('x'))
+        self.assertRaises(KeyError, future.result)
+        self.assertRaises(RuntimeError, OffloadFuture().result, 0.01)
+
+
+class AsyncMySQLConnectionTests(unittest.TestCase):
+    def setUp(self):
+        self.cxn = FakeAsyncConnection()
+
+    def tearDown(self):
+        self.cxn.close().result()
+
+    def test_offloaded(self):
+        self.assert_(self.cxn.sync.lazy)
+        self.assertEqual(self.cxn.execute("SELECT 1").result(), 3)
+        self.cxn.commit().result()
+        self.assertEqual(self.cxn.run("SELECT count(*)").result(), [{'count': 3}])
+        threads = set(self.cxn.sync.threads)
+        self.assertEqual(len(threads), 1)
+        self.assert_(threading.current_thread() not in threads)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, self.cxn.execute("FAIL").result)
+        self.assertRaises(ValueError, self.cxn.run, "SELECT 1", stream=True)
+
+    def test_batches(self):
+        self.cxn.execute("SELECT * FROM Orders", stream=True)
+        self.assertEqual(self.cxn.results(2).result(), [1, 2])
+        self.assertEqual(self.cxn.results(2).result(), [3])
+        self.assertEqual(self.cxn.results(2).result(), [])
+
+    def test_no_iteration(self):
+        self.cxn.execute("SELECT * FROM Orders", stream=True).result()
+        self.assertRaises(ValueError, self.cxn.iter_results)
+        self.assertRaises(ValueError, self.cxn.run, "SELECT * FROM Orders",
+                          stream=True, batch_size=2)
+        self.assertEqual(self.cxn.sync.batches, [[1, 2], [3]])
+
+    def test_close(self):
+        self.cxn.close().result()
+        self.assert_(self.cxn.sync.closed)
+        self.assert_(self.cxn.close().done())
+        self.assertRaises(SQLClosingError, self.cxn.execute, "SELECT 1")
+
+
+class AsyncMySQLCursorTests(unittest.TestCase):
+    def test_offloaded_methods(self):
+        # Every public MySQLInterface method, but those returning generators
+        # or context managers, has an offloading counterpart
+        unoffloaded = set(['iterate', 'key_table', 'loader'])
+        for name, member in vars(MySQLInterface).items():
+            if name.startswith('_') or name in unoffloaded or not inspect.isfunction(member):
+                continue
+            self.assert_(name in vars(AsyncMySQLCursor), name)
+            self.assertEqual(AsyncMySQLCursor.__dict__[name].__name__, name)
+        for name in unoffloaded:
+            self.assert_(name not in vars(AsyncMySQLCursor), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
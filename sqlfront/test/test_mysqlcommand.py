@@ -52,6 +52,22 @@ class MySQLCommandTests(unittest.TestCase):
         
         formt = lambda S: S.format(**keywords)
         self.func_comparison(formt)
+    def test_bind(self):
+        cmd = MySQLCommand("SELECT * FROM users WHERE name = {name} AND id > {0};")
+        statement, parameters = cmd.bind(10, name="O'Brien")
+        self.assertEqual(statement,
+            "SELECT * FROM users WHERE name = %(name)s AND id > %(0)s;")
+        self.assertEqual(parameters, {'name': "O'Brien", '0': 10})
+        self.assertRaises(KeyError, cmd.bind, 10)
+    def test_bind_literal_percent(self):
+        cmd = MySQLCommand("SELECT * FROM users WHERE name LIKE 'a%' AND id = {};")
+        statement, parameters = cmd.bind(3)
+        self.assertEqual(statement,
+            "SELECT * FROM users WHERE name LIKE 'a%%' AND id = %(0)s;")
+        self.assertEqual(parameters, {'0': 3})
+    def test_bind_invalid_field(self):
+        self.assertRaises(ValueError, MySQLCommand("SELECT {row.id};").compile)
+        self.assertRaises(ValueError, MySQLCommand("SELECT {id:>5};").compile)
     
 
 if __name__ == "__main__":
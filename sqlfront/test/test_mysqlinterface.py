@@ -0,0 +1,363 @@
+from __future__ import absolute_import
+import unittest
+
+from sqlfront.mysql.mysqlinterface import MySQLInterface
+
+
+ORDERS = (
+    {'Field': 'order_id', 'Type': 'int(11)', 'Key': 'PRI'},
+    {'Field': 'order_number', 'Type': 'int(11)', 'Key': ''},
+    {'Field': 'persons_id', 'Type': 'int(11)', 'Key': 'MUL'},
+)
+
+class FakeCursor(MySQLInterface):
+    """MySQLInterface which records commands, and answers a few canned queries."""
+    database = 'test_sqlfront'
+    def __init__(self, max_allowed_packet=4194304):
+        self.commands = []
+        self.committed = self.rolled_back = False
+        self._packet_size = max_allowed_packet
+    def run(self, command, parameters=None, **keywords):
+        self.execute(command, parameters)
+        if command.startswith("DESCRIBE"):
+            return ORDERS
+        return ()
+    def execute(self, command, parameters=None, **keywords):
+        self.commands.append(command)
+        if command.startswith("INSERT"):
+            return command.count("), (") + 1
+        return 0
+    def commit(self):
+        self.committed = True
+    def rollback(self):
+        self.rolled_back = True
+    def inserts(self):
+        return [cmd for cmd in self.commands if cmd.startswith("INSERT")]
+
+
+class InsertManyTests(unittest.TestCase):
+    def setUp(self):
+        self.cursor = FakeCursor()
+        self.rows = [
+            {'order_number': 67492 + index, 'persons_id': index % 4}
+            for index in range(10)
+        ]
+
+    def test_single_statement(self):
+        self.assertEqual(self.cursor.insert_many('Orders', self.rows), 10)
+        inserts = self.cursor.inserts()
+        self.assertEqual(len(inserts), 1)
+        self.assert_(inserts[0].startswith(
+            "INSERT INTO Orders (order_number, persons_id) VALUES ('67492', '0'), "))
+
+    def test_chunk_rows(self):
+        self.assertEqual(self.cursor.insert_many('Orders', iter(self.rows), chunk_rows=3), 10)
+        self.assertEqual(len(self.cursor.inserts()), 4)
+
+    def test_packet_size(self):
+        cursor = FakeCursor(max_allowed_packet=200)
+        self.assertEqual(cursor.insert_many('Orders', self.rows), 10)
+        inserts = cursor.inserts()
+        self.assert_(len(inserts) > 1)
+        self.assert_(all(len(cmd) <= 200 for cmd in inserts))
+
+    def test_null_and_default(self):
+        self.cursor.insert_many('Orders', [
+            {'order_number': 1, 'persons_id': None},
+            {'order_number': 2, 'unknown': 'x'},
+        ])
+        self.assert_(self.cursor.inserts()[0].endswith(
+            "VALUES ('1', NULL), ('2', DEFAULT);"))
+
+    def test_transaction(self):
+        self.cursor.insert_many('Orders', self.rows, transaction=True)
+        self.assertEqual(self.cursor.commands[1], "START TRANSACTION")
+        self.assert_(self.cursor.committed)
+
+    def test_empty(self):
+        self.assertEqual(self.cursor.insert_many('Orders', []), 0)
+        self.assertEqual(self.cursor.commands, [])
+
+    def test_literal_values(self):
+        self.cursor.insert_many('Orders', [
+            {'order_number': 123456789.123456, 'persons_id': True},
+            {'order_number': 0.1, 'persons_id': False},
+            {'order_number': u'\xe9t\xe9', 'persons_id': "O'Brien"},
+        ])
+        self.assert_(self.cursor.inserts()[0].endswith(
+            "VALUES (123456789.123456, 1), (0.1, 0), ('\xc3\xa9t\xc3\xa9', 'O\\'Brien');"))
+
+    def test_literal_connection_encoding(self):
+        class Connection(object):
+            encoding = 'latin1'
+        self.cursor.connection = Connection()
+        self.assertEqual(self.cursor._literal(u'\xe9'), "'\xe9'")     # pylint: disable=W0212
+
+
+class UpsertManyTests(unittest.TestCase):
+    def setUp(self):
+        self.cursor = FakeCursor()
+        self.rows = [
+            {'order_id': index, 'order_number': 67492 + index, 'persons_id': index % 4}
+            for index in range(10)
+        ]
+
+    def test_default_update_columns(self):
+        self.assertEqual(self.cursor.upsert_many('Orders', self.rows), 10)
+        inserts = self.cursor.inserts()
+        self.assertEqual(len(inserts), 1)
+        self.assert_(inserts[0].startswith(
+            "INSERT INTO Orders (order_id, order_number, persons_id) VALUES ('0', '67492', '0'), "))
+        self.assert_(inserts[0].endswith(
+            " ON DUPLICATE KEY UPDATE order_number = VALUES(order_number), "
+            "persons_id = VALUES(persons_id);"))
+
+    def test_update_columns(self):
+        self.cursor.upsert_many('Orders', self.rows, update_columns='persons_id', chunk_rows=4)
+        inserts = self.cursor.inserts()
+        self.assertEqual(len(inserts), 3)
+        self.assert_(all(cmd.endswith(
+            " ON DUPLICATE KEY UPDATE persons_id = VALUES(persons_id);") for cmd in inserts))
+
+    def test_packet_size(self):
+        cursor = FakeCursor(max_allowed_packet=300)
+        cursor.upsert_many('Orders', self.rows)
+        self.assert_(len(cursor.inserts()) > 1)
+        self.assert_(all(len(cmd) <= 300 for cmd in cursor.inserts()))
+
+    def test_unique_key_only(self):
+        cursor = FakeCursor()
+        cursor.schema_cache.set(cursor.database, 'Codes', (
+            {'Field': 'code', 'Type': 'varchar(8)', 'Key': 'UNI'},
+            {'Field': 'name', 'Type': 'varchar(255)', 'Key': ''},
+        ))
+        cursor.upsert_many('Codes', [{'code': 'PA', 'name': 'Pennsylvania'}])
+        self.assert_(cursor.inserts()[0].endswith(
+            " ON DUPLICATE KEY UPDATE code = VALUES(code), name = VALUES(name);"))
+
+    def test_unknown_columns(self):
+        self.assertRaises(ValueError, self.cursor.upsert_many,
+                          'Orders', [{'order_id': 1, 'name': 'x'}])
+        self.assertRaises(ValueError, self.cursor.upsert_many,
+                          'Orders', self.rows, update_columns=['name'])
+        self.assertEqual(self.cursor.inserts(), [])
+
+    def test_update_columns_inserted(self):
+        rows = [{'order_id': 1, 'order_number': 67492}]
+        self.assertRaises(ValueError, self.cursor.upsert_many,
+                          'Orders', rows, update_columns=['persons_id'])
+        self.assertEqual(self.cursor.inserts(), [])
+
+    def test_differing_rows(self):
+        for row in [{'order_id': 10, 'order_number': 1},
+                    {'order_id': 10, 'order_number': 1, 'persons_id': 2, 'note': 'x'}]:
+            cursor = FakeCursor()
+            self.assertRaises(ValueError, cursor.upsert_many,
+                              'Orders', self.rows + [row], chunk_rows=4, transaction=True)
+            self.assertEqual(len(cursor.inserts()), 2)
+            self.assert_(cursor.rolled_back)
+            self.assertFalse(cursor.committed)
+
+
+class PagingCursor(FakeCursor):
+    """Answers SELECTs with canned pages, recording their parameters."""
+    row_format = 'tuple'
+    def __init__(self, pages):
+        FakeCursor.__init__(self)
+        self.pages = list(pages)
+        self.parameters = []
+    def run(self, command, parameters=None, **keywords):
+        if command.startswith("SELECT"):
+            self.commands.append(command)
+            self.parameters.append(dict(parameters))
+            return self.pages.pop(0) if self.pages else ()
+        return FakeCursor.run(self, command, parameters, **keywords)
+
+
+class IterateTests(unittest.TestCase):
+    def test_pages(self):
+        pages = [((1, 10, 0), (2, 11, 1)), ((3, 12, 2), (4, 13, 3)), ((5, 14, 0),)]
+        cursor = PagingCursor(pages)
+        rows = list(cursor.iterate('Orders', where={'persons_id': 2}, page_size=2))
+        self.assertEqual([row[0] for row in rows], [1, 2, 3, 4, 5])
+        self.assertEqual(len(cursor.inserts()), 0)
+        selects = cursor.commands[-3:]
+        self.assert_("ORDER BY order_id" in selects[0])
+        self.assert_("LIMIT 2" in selects[0])
+        self.assert_("order_id > %(key_0)s" in selects[1])
+        self.assert_("persons_id = %(where_0)s" in selects[1])
+        self.assertEqual(cursor.parameters[1], {'where_0': 2, 'key_0': 2})
+        self.assertEqual(cursor.parameters[2], {'where_0': 2, 'key_0': 4})
+
+    def test_key_columns_added(self):
+        cursor = PagingCursor([((67492, 1),)])
+        rows = list(cursor.iterate('Orders', columns='order_number', page_size=5))
+        self.assertEqual(rows, [(67492, 1)])
+        self.assert_(cursor.commands[-1].startswith("SELECT order_number, order_id\n"))
+
+    def test_composite_key(self):
+        condition = FakeCursor()._keyset_condition(('a', 'b', 'c'))
+        self.assertEqual(condition,
+            "a >= %(key_0)s AND (a > %(key_0)s OR (a = %(key_0)s AND "
+            "(b > %(key_1)s OR (b = %(key_1)s AND c > %(key_2)s))))")
+        self.assertEqual(FakeCursor().primary_keys('Orders'), ('order_id',))
+
+
+class LateRowLookupTests(unittest.TestCase):
+    def setUp(self):
+        self.cursor = FakeCursor()
+
+    def selects(self):
+        return [cmd for cmd in self.cursor.commands if cmd.startswith("SELECT")]
+
+    def test_large_offset(self):
+        self.cursor.select('Orders', columns=('order_number', 'persons_id'),
+                           where={'persons_id': 3}, limit=(50000, 10))
+        self.assertEqual(self.selects()[0],
+            "SELECT outerT.order_number, outerT.persons_id\n"
+            "FROM Orders AS outerT\n"
+            "JOIN (SELECT order_id FROM Orders WHERE persons_id = '3' "
+            "ORDER BY order_id LIMIT 50000, 10) AS innerT\n"
+            "ON outerT.order_id = innerT.order_id\n"
+            "ORDER BY outerT.order_id;\n")
+
+    def test_large_offset_dict_columns(self):
+        self.cursor.select('Orders', columns={'persons_id': 3}, limit=(20000, 10))
+        self.assertEqual(self.selects()[0],
+            "SELECT outerT.persons_id\n"
+            "FROM Orders AS outerT\n"
+            "JOIN (SELECT order_id FROM Orders WHERE persons_id = '3' "
+            "ORDER BY order_id LIMIT 20000, 10) AS innerT\n"
+            "ON outerT.order_id = innerT.order_id\n"
+            "ORDER BY outerT.order_id;\n")
+
+    def test_small_offset(self):
+        self.cursor.select('Orders', limit=(10, 10))
+        self.assertEqual(self.selects()[0], "SELECT *\nFROM Orders\nLIMIT 10, 10;\n")
+
+    def test_not_rewritten(self):
+        self.cursor.select('Orders', columns='count(*)', limit=(50000, 10))
+        self.cursor.select(('Orders', 'Persons'), limit=(50000, 10))
+        self.cursor.select('Orders AS o', limit=(50000, 10))
+        self.cursor.select('Orders o JOIN Persons p USING (persons_id)', limit=(50000, 10))
+        self.cursor.late_row_offset = None
+        self.cursor.select('Orders', limit=(50000, 10))
+        self.assert_(not any("innerT" in cmd for cmd in self.selects()))
+        self.assertFalse(any(cmd.startswith("DESCRIBE Orders ") for cmd in self.cursor.commands))
+
+    def test_qualified_table(self):
+        self.cursor.select('test_sqlfront.Orders', limit=(50000, 10))
+        self.assert_("innerT" in self.selects()[0])
+
+
+class KeyTableCursor(FakeCursor):
+    """FakeCursor whose results() returns canned rows."""
+    def __init__(self, rows=()):
+        super(KeyTableCursor, self).__init__()
+        self.rows = list(rows)
+    def results(self, size=None, **keywords):
+        return self.rows
+
+class KeyTableTests(unittest.TestCase):
+    def test_lifecycle(self):
+        cursor = KeyTableCursor()
+        with cursor.key_table('Orders', [3, 1, 3, 2]) as name:
+            self.assert_(name.startswith('_sqlfront_keys_'))
+        creates = [cmd for cmd in cursor.commands if cmd.startswith("CREATE")]
+        self.assertEqual(creates, [str.format(
+            "CREATE TEMPORARY TABLE {0} (PRIMARY KEY (order_id)) "
+            "SELECT order_id FROM Orders LIMIT 0;", name)])
+        self.assertEqual(cursor.inserts(), [str.format(
+            "INSERT INTO {0} (order_id) VALUES ('3'), ('1'), ('2');", name)])
+        self.assertEqual(cursor.commands[-1],
+                         "DROP TEMPORARY TABLE IF EXISTS {0};".format(name))
+
+    def test_dropped_on_error(self):
+        cursor = KeyTableCursor()
+        try:
+            with cursor.key_table('Orders', [1]):
+                raise KeyError
+        except KeyError:
+            pass
+        self.assert_(cursor.commands[-1].startswith("DROP TEMPORARY TABLE"))
+
+    def test_select_and_delete(self):
+        cursor = KeyTableCursor([{'order_number': 67492}])
+        self.assertEqual(cursor.select_keys('Orders', [1, 2], columns='order_number'),
+                         [{'order_number': 67492}])
+        join = [cmd for cmd in cursor.commands if cmd.startswith("SELECT")][0]
+        self.assert_(join.startswith("SELECT t.order_number FROM Orders AS t JOIN _sqlfront_keys_"))
+        self.assert_(join.endswith("AS k USING (order_id);"))
+        cursor.delete_keys('Orders', [1, 2])
+        self.assert_(any(cmd.startswith("DELETE t FROM Orders AS t JOIN _sqlfront_keys_")
+                         for cmd in cursor.commands))
+
+    def test_existing_keys(self):
+        cursor = KeyTableCursor([(1, ), (3, )])
+        self.assertEqual(cursor.existing_keys('Orders', [1, 2, 3]), set([1, 3]))
+        composite = KeyTableCursor([(1, 2)])
+        self.assertEqual(
+            composite.existing_keys('Orders', [(1, 2), (1, 3)], key=('order_id', 'persons_id')),
+            set([(1, 2)]))
+
+
+class ExistsCursor(FakeCursor):
+    """FakeCursor answering queries by their first word, from 'answers'."""
+    def __init__(self, **answers):
+        super(ExistsCursor, self).__init__()
+        self.answers = answers
+        self.parameters = []
+    def run(self, command, parameters=None, **keywords):
+        if parameters is not None:
+            self.parameters.append(parameters)
+        rows = super(ExistsCursor, self).run(command, parameters, **keywords)
+        return self.answers.get(command.split(None, 1)[0], rows)
+
+class ExistsManyTests(unittest.TestCase):
+    def test_rows_exist(self):
+        cursor = ExistsCursor(SELECT=[(0, ), (2, )])
+        rows = [{'order_id': 1}, {'order_id': 2}, {'order_id': 3}]
+        self.assertEqual(cursor.exists_many('Orders', rows=rows), [True, False, True])
+        self.assertEqual(len(cursor.commands), 1)
+        self.assertEqual(cursor.commands[0].split("\n"), [
+            "SELECT 0 FROM DUAL WHERE EXISTS (SELECT 1 FROM Orders WHERE order_id = %(r0_0)s LIMIT 1)",
+            "UNION ALL",
+            "SELECT 1 FROM DUAL WHERE EXISTS (SELECT 1 FROM Orders WHERE order_id = %(r1_0)s LIMIT 1)",
+            "UNION ALL",
+            "SELECT 2 FROM DUAL WHERE EXISTS (SELECT 1 FROM Orders WHERE order_id = %(r2_0)s LIMIT 1);",
+        ])
+        self.assertEqual(cursor.parameters, [{'r0_0': 1, 'r1_0': 2, 'r2_0': 3}])
+
+    def test_rows_exist_null(self):
+        cursor = ExistsCursor(SELECT=[(0, )])
+        cursor.rows_exist('Orders', [{'persons_id': None, 'order_number': "O'Brien"}])
+        self.assert_(cursor.commands[0].endswith(
+            "WHERE order_number = %(r0_0)s AND persons_id <=> %(r0_1)s LIMIT 1);"))
+        self.assertEqual(cursor.parameters, [{'r0_0': "O'Brien", 'r0_1': None}])
+        self.assertRaises(ValueError, cursor.rows_exist, 'Orders', [{'order_id': 1}, {}])
+
+    def test_rows_exist_chunks(self):
+        cursor = ExistsCursor(SELECT=[(3, )])
+        rows = [{'order_id': index} for index in range(5)]
+        self.assertEqual(cursor.rows_exist('Orders', rows, chunk_size=2),
+                         [False, False, False, True, False])
+        self.assertEqual(len(cursor.commands), 3)
+
+    def test_columns_exist(self):
+        cursor = ExistsCursor()
+        self.assertEqual(cursor.exists_many('Orders', columns=['persons_id', 'name']),
+                         [True, False])
+        self.assert_(all(cmd.startswith("DESCRIBE") for cmd in cursor.commands))
+
+    def test_tables_and_databases(self):
+        cursor = ExistsCursor(SHOW=[('Orders', ), ('Persons', )])
+        self.assertEqual(cursor.exists_many(['Persons', 'Cars'], database='shop'),
+                         [True, False])
+        self.assertEqual(cursor.commands, ["SHOW TABLES IN shop"])
+        cursor = ExistsCursor(SELECT=[('shop', )])
+        self.assertEqual(cursor.exists_many(database=['shop', 'other']), [True, False])
+        self.assertEqual(len(cursor.commands), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import absolute_import
+import unittest
+
+import MySQLdb
+from sqlfront.mysql.mysqlconnection import MySQLConnection
+from sqlfront.mysql.mysqlerror import MySQLError
+from sqlfront.test.test_mysqlquerycache import FakeDriverConnection
+
+
+class PingingDriverConnection(FakeDriverConnection):
+    def __init__(self):
+        FakeDriverConnection.__init__(self)
+        self.calls = []
+    def ping(self):
+        self.calls.append('ping')
+    def commit(self):
+        self.calls.append('commit')
+    def rollback(self):
+        self.calls.append('rollback')
+
+class LazyConnection(MySQLConnection):
+    """Lazy MySQLConnection, opening fake driver connections."""
+    unreachable = False
+    def __init__(self, **keywords):
+        self.opens = 0
+        MySQLConnection.__init__(self, lazy=True, **keywords)
+    def open(self, **keywords):
+        if self.unreachable:
+            raise MySQLdb.OperationalError(2003, "Can't connect to MySQL server")
+        self.opens += 1
+        connection = PingingDriverConnection()
+        return (connection.cursor(), connection)
+
+
+class LazyConnectionTests(unittest.TestCase):
+    def setUp(self):
+        self.cxn = LazyConnection()
+
+    def test_deferred(self):
+        self.assert_(self.cxn.deferred)
+        self.assertFalse(self.cxn.opened)
+        self.assertEqual(self.cxn.opens, 0)
+        self.cxn.close()
+
+    def test_first_execute_connects(self):
+        self.cxn.execute("SELECT 1")
+        self.assertFalse(self.cxn.deferred)
+        self.assertEqual(self.cxn.connection.commands, ["SELECT 1"])
+        self.cxn.execute("SELECT 2")
+        self.assertEqual(self.cxn.opens, 1)
+
+    def test_commit_and_rollback_before_open(self):
+        self.assertEqual(self.cxn.commit(), None)
+        self.assertEqual(self.cxn.rollback(), None)
+        self.assert_(self.cxn.deferred)
+        self.cxn.execute("SELECT 1")
+        self.cxn.commit()
+        self.cxn.rollback()
+        self.assertEqual(self.cxn.connection.calls, ['commit', 'rollback'])
+
+    def test_ping_opens(self):
+        self.assert_(self.cxn.ping())
+        self.assertFalse(self.cxn.deferred)
+        self.assertEqual(self.cxn.connection.calls, ['ping'])
+
+    def test_ping_unreachable(self):
+        self.cxn.unreachable = True
+        self.assertFalse(self.cxn.ping())
+        self.assert_(self.cxn.deferred)
+
+    def test_results_before_execute(self):
+        self.assertRaises(MySQLError, self.cxn.results)
+        self.assert_(self.cxn.deferred)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+from __future__ import absolute_import
+import unittest
+import re
+
+import MySQLdb
+from sqlfront.mysql.mysqlload import load_data, tsv_field, tsv_line
+
+
+class FakeDriverConnection(object):
+    def __init__(self):
+        self.rolled_back = False
+    def warning_count(self):
+        return 0
+
+class FakeLoadConnection(object):
+    """Reads the LOAD DATA file itself, as the MySQL client library would."""
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.connection = FakeDriverConnection()
+        self.lines = []
+    def escape(self, obj):
+        return MySQLdb.escape_string(str(obj))
+    def execute(self, command, parameters=None):
+        if self.fail:
+            raise MySQLdb.OperationalError("The used command is not allowed")
+        path = re.search(r"INFILE '([^']*)'", command).group(1)
+        with open(path, 'rb') as stream:
+            self.lines = stream.readlines()
+        return len(self.lines)
+    def rollback(self):
+        self.connection.rolled_back = True
+
+
+class TSVTests(unittest.TestCase):
+    def test_fields(self):
+        self.assertEqual(tsv_field(None), '\\N')
+        self.assertEqual(tsv_field(True), '1')
+        self.assertEqual(tsv_field(2.5), '2.5')
+        self.assertEqual(tsv_field(123456789.123456), '123456789.123456')
+        self.assertEqual(tsv_field(0.1), '0.1')
+        self.assertEqual(tsv_field(u'caf\xe9'), 'caf\xc3\xa9')
+        self.assertEqual(tsv_field('a\\b\tc\nd'), 'a\\\\b\\tc\\nd')
+
+    def test_line(self):
+        self.assertEqual(tsv_line([1, None, 'x']), '1\t\\N\tx\n')
+
+
+class LoadDataTests(unittest.TestCase):
+    def setUp(self):
+        self.columns = ('order_number', 'persons_id')
+
+    def test_load(self):
+        connection = FakeLoadConnection()
+        rows = ((67492 + index, index % 4) for index in range(1000))
+        report = load_data(connection, 'Orders', rows, self.columns)
+        self.assertEqual(report['rows'], 1000)
+        self.assertEqual(connection.lines[0], '67492\t0\n')
+        self.assertEqual(report['warnings'], [])
+
+    def test_mappings(self):
+        connection = FakeLoadConnection()
+        load_data(connection, 'Orders', [{'order_number': 1}], self.columns)
+        self.assertEqual(connection.lines, ['1\t\\N\n'])
+
+    def test_bad_row_rolls_back(self):
+        connection = FakeLoadConnection()
+        rows = [(1, 2), (3, 4, 5)]
+        self.assertRaises(ValueError, load_data, connection, 'Orders', rows, self.columns)
+        self.assert_(connection.connection.rolled_back)
+
+    def test_failed_load(self):
+        connection = FakeLoadConnection(fail=True)
+        rows = ((index, index) for index in range(100000))
+        self.assertRaises(MySQLdb.OperationalError,
+            load_data, connection, 'Orders', rows, self.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+from __future__ import absolute_import
+import unittest
+import re
+import threading
+
+from sqlfront.mysql.mysqlloader import MySQLBatchLoader
+from sqlfront.test.test_mysqlinterface import FakeCursor
+
+
+class LookupCursor(FakeCursor):
+    """Answers 'WHERE order_id IN (...)' from a table held in memory."""
+    row_format = 'tuple'
+    def __init__(self):
+        FakeCursor.__init__(self)
+        self.table = dict(
+            (index, {'order_id': index, 'order_number': 67492 + index, 'persons_id': index % 4})
+            for index in range(100)
+        )
+        self.selects = []
+    def run(self, command, parameters=None, **keywords):
+        if command.startswith("SELECT"):
+            self.selects.append((command, parameters))
+            columns = command.split("\n")[0][len("SELECT "):].split(", ")
+            names = re.findall(r"%\((\w+)\)s", command)
+            return [tuple(self.table[parameters[name]][column] for column in columns)
+                    for name in names if parameters[name] in self.table]
+        return FakeCursor.run(self, command, parameters, **keywords)
+
+
+class GetManyTests(unittest.TestCase):
+    def test_get_many(self):
+        cursor = LookupCursor()
+        rows = cursor.get_many('Orders', [3, 5, 3, 500], columns=('order_number', 'persons_id'))
+        self.assertEqual(rows, {3: (67495, 3, 3), 5: (67497, 1, 5)})
+        command, parameters = cursor.selects[0]
+        self.assert_(command.startswith("SELECT order_number, persons_id, order_id\n"))
+        self.assert_("WHERE order_id IN (%(k0_0)s, %(k1_0)s, %(k2_0)s)" in command)
+        self.assertEqual(parameters, {'k0_0': 3, 'k1_0': 5, 'k2_0': 500})
+
+    def test_chunks(self):
+        cursor = LookupCursor()
+        self.assertEqual(len(cursor.get_many('Orders', range(25), chunk_size=10)), 25)
+        self.assertEqual(len(cursor.selects), 3)
+
+    def test_integer_text_keys(self):
+        cursor = LookupCursor()
+        rows = cursor.get_many('Orders', ['3', 3, u'5 '], columns='order_number')
+        self.assertEqual(rows, {'3': (67495, 3), 3: (67495, 3), u'5 ': (67497, 5)})
+        self.assertEqual(sorted(cursor.selects[0][1].values()), [3, 5])
+        self.assertRaises(ValueError, cursor.get_many, 'Orders', ['x3'])
+        self.assertRaises(ValueError, cursor.get_many, 'Orders', [3.5])
+
+    def test_composite(self):
+        cursor = LookupCursor()
+        cursor.get_many('Orders', [(1, 2)], key=('order_id', 'persons_id'))
+        self.assert_("WHERE (order_id, persons_id) IN ((%(k0_0)s, %(k0_1)s))"
+                     in cursor.selects[0][0])
+
+
+class MySQLBatchLoaderTests(unittest.TestCase):
+    def test_dispatch(self):
+        cursor = LookupCursor()
+        loader = MySQLBatchLoader(cursor, window=None)
+        futures = [loader.load('Orders', index) for index in (1, 2, 2, 700)]
+        self.assertEqual(loader.pending, 3)
+        loader.dispatch()
+        self.assertEqual([future.result() for future in futures],
+                         [(1, 67493, 1), (2, 67494, 2), (2, 67494, 2), None])
+        self.assertEqual(len(cursor.selects), 1)
+
+    def test_window(self):
+        cursor = LookupCursor()
+        loader = cursor.loader(window=0.05)
+        results = {}
+        def get(index):
+            results[index] = loader.get('Orders', index, timeout=5)
+        threads = [threading.Thread(target=get, args=(index,)) for index in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results[7], (7, 67499, 3))
+        self.assertEqual(len(cursor.selects), 1)
+
+    def test_error(self):
+        cursor = LookupCursor()
+        cursor.table = None
+        loader = MySQLBatchLoader(cursor, window=None)
+        future = loader.load('Orders', 1)
+        loader.dispatch()
+        self.assertRaises(TypeError, future.result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from __future__ import absolute_import
+import unittest
+
+from sqlfront.extern import rich_core
+from sqlfront.mysql.mysqlinterface import MySQLInterface
+from sqlfront.mysql.mysqlsyntax import MySQLSyntax
+from sqlfront.mysql import mysqlphases
+from sqlfront.mysql.mysqlphases import MySQLPhaseTimer
+from sqlfront.test.test_mysqlquerycache import FakeConnection, FakeDriverCursor
+
+
+class FakeCursor(FakeConnection, MySQLInterface):
+    """MySQLInterface on a fake driver connection."""
+
+
+class MySQLPhaseTimerTests(unittest.TestCase):
+    def setUp(self):
+        # The fake driver's calls stand in for MySQLdb's
+        self.phases = mysqlphases.PHASES
+        mysqlphases.PHASES = self.phases + [
+            (FakeDriverCursor, 'execute', 'server'),
+            (FakeDriverCursor, 'fetchall', 'server'),
+        ]
+
+    def tearDown(self):
+        mysqlphases.PHASES = self.phases
+
+    def test_phases(self):
+        cursor = FakeCursor()
+        with MySQLPhaseTimer() as timer:
+            cursor.count('Orders')
+            cursor.count('Orders')
+            cursor.select('Orders', where={'order_id': 3}, limit=10)
+        report = timer.report()
+        self.assertEqual(set(report), set(['count', 'select']))
+        self.assertEqual(report['count']['calls'], 2)
+        select = report['select']
+        self.assertEqual(select['calls'], 1)
+        for phase in ('server', 'validate', 'compose'):
+            self.assert_(select[phase] > 0, phase)
+        self.assertAlmostEqual(select['client'], select['total'] - select['server'])
+        self.assert_(select['server'] < select['total'])
+        self.assertAlmostEqual(
+            select['other'],
+            select['client'] - sum(select[phase] for phase in
+                                   ('validate', 'escape', 'compose', 'rows')))
+
+    def test_restored(self):
+        originals = (rich_core.AssertKlass, vars(MySQLSyntax)['compose'],
+                     vars(MySQLInterface)['select'])
+        self.execute = vars(FakeDriverCursor)['execute']
+        timer = MySQLPhaseTimer().start()
+        self.assertRaises(RuntimeError, MySQLPhaseTimer().start)
+        self.assert_(rich_core.AssertKlass is not originals[0])
+        self.assert_(vars(FakeDriverCursor)['execute'] is not self.execute)
+        timer.stop()
+        self.assert_(vars(FakeDriverCursor)['execute'] is self.execute)
+        self.assertEqual((rich_core.AssertKlass, vars(MySQLSyntax)['compose'],
+                          vars(MySQLInterface)['select']), originals)
+        self.assert_(not timer.active)
+        FakeCursor().count('Orders')
+        self.assertEqual(timer.report(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+from __future__ import absolute_import
+import unittest
+import threading
+import time
+
+from sqlfront.mysql.mysqlconnection import MySQLConnection
+from sqlfront.mysql.mysqlpool import MySQLConnectionPool
+from sqlfront.mysql.mysqlerror import MySQLPoolTimeoutError
+
+
+class FakeDriverConnection(object):
+    """Stands in for a MySQLdb connection object."""
+    def __init__(self):
+        self.open = True
+        self.alive = True
+        self.rollbacks = 0
+    def ping(self):
+        if not self.alive:
+            import MySQLdb
+            raise MySQLdb.OperationalError("MySQL server has gone away")
+    def rollback(self):
+        self.rollbacks += 1
+    def close(self):
+        self.open = False
+
+class FakeConnection(MySQLConnection):
+    """MySQLConnection which never touches the network."""
+    opened_count = 0
+    def __init__(self, **keywords):
+        type(self).opened_count += 1
+        self.keywords = keywords
+        self.cursor, self.connection = None, FakeDriverConnection()
+    def close(self):
+        self.connection.close()
+
+
+class MySQLConnectionPoolTests(unittest.TestCase):
+    def setUp(self):
+        FakeConnection.opened_count = 0
+
+    def test_reuses_connections(self):
+        pool = MySQLConnectionPool(klass=FakeConnection, max_size=2, user='sqlfront')
+        with pool.checkout() as first:
+            self.assertEqual(first.keywords, {'user': 'sqlfront'})
+        with pool.checkout() as second:
+            self.assert_(second is first)
+        self.assertEqual(FakeConnection.opened_count, 1)
+        self.assertEqual(pool.idle, 1)
+        self.assert_(first.connection.open)
+        self.assertEqual(first.connection.rollbacks, 2)
+
+    def test_min_size(self):
+        pool = MySQLConnectionPool(klass=FakeConnection, min_size=3, max_size=4)
+        self.assertEqual(FakeConnection.opened_count, 3)
+        self.assertEqual((pool.size, pool.idle), (3, 3))
+
+    def test_checkout_timeout(self):
+        pool = MySQLConnectionPool(klass=FakeConnection, max_size=1)
+        held = pool.checkout()
+        self.assertRaises(MySQLPoolTimeoutError, pool.checkout, timeout=0.01)
+        pool.checkin(held)
+        self.assert_(pool.checkout(timeout=0.01) is held)
+
+    def test_waits_for_checkin(self):
+        pool = MySQLConnectionPool(klass=FakeConnection, max_size=1)
+        held = pool.checkout()
+        def release():
+            time.sleep(0.05)
+            pool.checkin(held)
+        thread = threading.Thread(target=release)
+        thread.start()
+        self.assert_(pool.checkout(timeout=5) is held)
+        thread.join()
+
+    def test_health_check(self):
+        pool = MySQLConnectionPool(klass=FakeConnection, max_size=1)
+        with pool.checkout() as dead:
+            dead.connection.alive = False
+        with pool.checkout() as fresh:
+            self.assert_(fresh is not dead)
+        self.assert_(not dead.connection.open)
+        self.assertEqual(pool.size, 1)
+
+    def test_idle_eviction(self):
+        pool = MySQLConnectionPool(klass=FakeConnection, min_size=1, max_size=3, idle_timeout=0)
+        first, second = pool.checkout(), pool.checkout()
+        pool.checkin(first)
+        pool.checkin(second)
+        time.sleep(0.01)
+        pool.checkout()
+        self.assertEqual(pool.size, 1)
+        self.assert_(not first.connection.open)
+
+    def test_close(self):
+        pool = MySQLConnectionPool(klass=FakeConnection, max_size=2)
+        held = pool.checkout()
+        with pool.checkout():
+            pass
+        pool.close()
+        self.assertEqual(pool.size, 1)
+        pool.checkin(held)
+        self.assertEqual(pool.size, 0)
+        self.assert_(not held.connection.open)
+
+    def test_validation(self):
+        self.assertRaises(TypeError, MySQLConnectionPool, klass=dict)
+        self.assertRaises(ValueError, MySQLConnectionPool, klass=FakeConnection, min_size=3, max_size=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+from __future__ import absolute_import
+import unittest
+import time
+
+from sqlfront.mysql.mysqlconnection import MySQLConnection
+from sqlfront.mysql.mysqlquerycache import (
+    MySQLQueryCache, read_tables, written_tables, used_database, ALL_TABLES)
+
+
+class FakeDriverCursor(object):
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = (('order_id', 3, None, None, None, None, 0),)
+        self.rows = ()
+    def execute(self, command, parameters=None):
+        self.connection.commands.append(command)
+        self.rows = ({'order_id': len(self.connection.commands)},)
+        return 1
+    def fetchall(self):
+        return self.rows
+    def close(self):
+        pass
+
+class FakeDriverConnection(object):
+    def __init__(self):
+        self.commands = []
+        self.open = True
+    def cursor(self, klass=None):
+        return FakeDriverCursor(self)
+    def commit(self):
+        pass
+    def rollback(self):
+        pass
+
+class FakeConnection(MySQLConnection):
+    """MySQLConnection on a fake driver connection."""
+    def __init__(self, **keywords):
+        MySQLConnection.__init__(self, lazy=True, **keywords)
+        self.connection = FakeDriverConnection()
+        self.cursor = self.connection.cursor()
+
+
+class StatementAnalysisTests(unittest.TestCase):
+    def test_read_tables(self):
+        self.assertEqual(read_tables("SELECT * FROM db.Orders o JOIN `Persons` p ON o.id = p.id"),
+                         ('orders', 'persons'))
+        self.assertEqual(read_tables("SELECT count(*) FROM a, b WHERE x = 'now()';"), ('a', 'b'))
+        self.assertEqual(read_tables("SELECT * FROM t LEFT JOIN u USING (id)"), ('t', 'u'))
+        self.assertEqual(read_tables("SELECT * FROM t STRAIGHT_JOIN db.u ON t.id = u.id"),
+                         ('t', 'u'))
+        for command in ["SELECT NOW() FROM t", "SELECT 1", "SHOW TABLES",
+                        "SELECT * FROM t FOR UPDATE", "SELECT @x := id FROM t"]:
+            self.assertEqual(read_tables(command), None)
+
+    def test_written_tables(self):
+        self.assertEqual(written_tables("SELECT * FROM t"), None)
+        self.assertEqual(written_tables("INSERT IGNORE INTO db.`Orders` VALUES (1)"), ('orders',))
+        self.assertEqual(written_tables("UPDATE t SET a = 1"), ('t',))
+        self.assertEqual(written_tables("DELETE FROM t WHERE a = 1"), ('t',))
+        self.assertEqual(written_tables("CREATE TABLE n LIKE o"), ('n',))
+        self.assertEqual(written_tables("RENAME TABLE a TO b"), ('a', 'b'))
+        self.assertEqual(written_tables("DELETE t FROM t JOIN u"), (ALL_TABLES,))
+        self.assertEqual(written_tables("CALL refresh()"), (ALL_TABLES,))
+        self.assertEqual(written_tables("CREATE DATABASE x"), ())
+
+    def test_used_database(self):
+        self.assertEqual(used_database("USE test_sqlfront;"), 'test_sqlfront')
+        self.assertEqual(used_database(" use `my db`"), 'my db')
+        self.assertEqual(used_database("SELECT 1"), None)
+
+
+class MySQLQueryCacheTests(unittest.TestCase):
+    def test_key(self):
+        cache = MySQLQueryCache()
+        self.assertEqual(cache.key("SELECT *\n  FROM t;", {'a': 1}),
+                         cache.key("SELECT * FROM t", {'a': 1}))
+        self.assertNotEqual(cache.key("SELECT * FROM t WHERE a = 'x  y'"),
+                            cache.key("SELECT * FROM t WHERE a = 'x y'"))
+        self.assertEqual(cache.key("SELECT * FROM t", [[1]]), None)
+        self.assertNotEqual(cache.key("SELECT * FROM t", database='a'),
+                            cache.key("SELECT * FROM t", database='b'))
+
+    def test_invalidate(self):
+        cache = MySQLQueryCache()
+        cache.set('a', [1], ('orders',))
+        cache.set('b', [2], ('orders', 'persons'))
+        cache.set('c', [3], ('persons',))
+        cache.invalidate(['db.Orders'])
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get('c'), [3])
+        cache.invalidate([ALL_TABLES])
+        self.assertEqual((len(cache), cache.bytes), (0, 0))
+
+    def test_byte_budget(self):
+        cache = MySQLQueryCache(max_bytes=2000)
+        for index in range(20):
+            cache.set(index, [(index, 'x' * 10)], ('t',))
+            cache.get(0)
+        self.assert_(cache.bytes <= 2000)
+        self.assert_(0 in cache)
+        self.assert_(1 not in cache)
+
+    def test_invalidated_while_read(self):
+        cache = MySQLQueryCache()
+        generation = cache.generation(('orders', 'persons'))
+        cache.invalidate(['Persons'])
+        cache.set('a', [1], ('orders', 'persons'), generation)
+        self.assert_('a' not in cache)
+        generation = cache.generation(('orders',))
+        cache.clear()
+        cache.set('a', [1], ('orders',), generation)
+        self.assert_('a' not in cache)
+        cache.set('a', [1], ('orders',), cache.generation(('orders',)))
+        self.assert_('a' in cache)
+
+    def test_copies(self):
+        cache = MySQLQueryCache()
+        rows = [{'order_id': 1}]
+        cache.set('a', rows, ('orders',))
+        rows[0]['order_id'] = 2
+        cached = cache.get('a')
+        self.assertEqual(cached, [{'order_id': 1}])
+        cached[0]['order_id'] = 3
+        cached.append({'order_id': 4})
+        self.assertEqual(cache.get('a'), [{'order_id': 1}])
+
+    def test_ttl(self):
+        cache = MySQLQueryCache(ttl=0.01)
+        cache.set('a', [1], ('t',))
+        time.sleep(0.02)
+        self.assertEqual(cache.get('a'), None)
+
+
+class ConnectionCachingTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = MySQLQueryCache()
+        self.cxn = FakeConnection(query_cache=self.cache, autocommit=True)
+        self.other = FakeConnection(query_cache=self.cache, autocommit=True)
+
+    def test_cached(self):
+        first = self.cxn.run("SELECT * FROM Orders")
+        self.assertEqual(self.other.run("SELECT * FROM Orders;"), first)
+        self.assertEqual(len(self.cxn.connection.commands), 1)
+        self.assertEqual(len(self.other.connection.commands), 0)
+        self.cxn.run("SELECT * FROM Orders", row_format='tuple')
+        self.assertEqual(len(self.cxn.connection.commands), 2)
+
+    def test_write_invalidates(self):
+        self.cxn.run("SELECT * FROM Orders")
+        self.other.run("SELECT * FROM Persons")
+        self.cxn.run("INSERT INTO Orders (order_id) VALUES (1)")
+        self.assertEqual(len(self.cache), 1)
+        # Uncommitted writes bypass the cache, for this connection only
+        self.cxn.run("SELECT * FROM Persons")
+        self.assertEqual(len(self.cxn.connection.commands), 3)
+        self.other.run("SELECT * FROM Orders")
+        self.assertEqual(len(self.cache), 2)
+        self.cxn.commit()
+        self.assertEqual(len(self.cache), 1)
+        self.cxn.run("SELECT * FROM Persons")
+        self.assertEqual(len(self.cxn.connection.commands), 3)
+
+    def test_straight_join_invalidated(self):
+        self.cxn.run("SELECT * FROM Orders STRAIGHT_JOIN Persons USING (persons_id)")
+        self.other.run("INSERT INTO Persons (last) VALUES ('Clark')")
+        self.assertEqual(len(self.cache), 0)
+
+    def test_current_database(self):
+        elsewhere = FakeConnection(query_cache=self.cache, database='other')
+        self.cxn.run("SELECT * FROM Orders")
+        elsewhere.run("SELECT * FROM Orders")
+        self.assertEqual(len(elsewhere.connection.commands), 1)
+        self.other.run("USE `other`;")
+        self.assertEqual(self.other.database, 'other')
+        self.other.run("SELECT * FROM Orders")
+        self.assertEqual(self.other.connection.commands, ["USE `other`;"])
+        self.assertEqual(len(self.cache), 2)
+
+    def test_transaction_not_stored(self):
+        cxn = FakeConnection(query_cache=self.cache)
+        cxn.run("SELECT * FROM Orders")
+        self.assertEqual(len(self.cache), 1)
+        # Without autocommit, the first read opened a transaction
+        cxn.run("SELECT * FROM Persons")
+        self.assertEqual(len(self.cache), 1)
+        cxn.commit()
+        cxn.run("SELECT * FROM Persons")
+        self.assertEqual(len(self.cache), 2)
+        self.cxn.run("START TRANSACTION")
+        self.cxn.run("SELECT * FROM Countries")
+        self.cxn.run("COMMIT")
+        self.cxn.run("SELECT * FROM Cities")
+        self.assertEqual(len(self.cache), 3)
+
+    def test_written_while_read(self):
+        def execute(command, parameters=None):
+            self.other.run("DELETE FROM Orders")
+            return 1
+        self.cxn.run("SELECT 1")    # Opens the connection's cursors
+        for cursor in self.cxn._cursors.values():     # pylint: disable=W0212
+            cursor.execute = execute
+        self.cxn.run("SELECT * FROM Orders")
+        self.assertEqual(len(self.cache), 0)
+
+    def test_uncached(self):
+        self.cxn.run("SELECT NOW() FROM Orders")
+        self.cxn.run("SELECT NOW() FROM Orders")
+        self.assertEqual(len(self.cxn.connection.commands), 2)
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
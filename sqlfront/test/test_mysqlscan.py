@@ -0,0 +1,98 @@
+from __future__ import absolute_import
+import re
+import unittest
+import threading
+
+from sqlfront.mysql.mysqlscan import parallel_scan, key_ranges
+
+
+class FakeScanCursor(object):
+    """Serves a table of (id, value) rows from memory."""
+    def __init__(self, rows, fail_at=None):
+        self.rows = rows
+        self.fail_at = fail_at
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc_info):
+        return False
+    def primary_keys(self, table, database=None):
+        return ('id',)
+    def run(self, command, parameters=None, stream=False, **keywords):
+        if command.startswith("SELECT MIN"):
+            ids = [row[0] for row in self.rows]
+            return [(min(ids), max(ids))] if ids else [(None, None)]
+        elif command.startswith("SELECT COUNT"):
+            return [(len(self.rows),)]
+        elif "LIMIT 1 OFFSET" in command:
+            self.probes = command
+            ids = sorted(row[0] for row in self.rows)
+            offsets = [int(offset) for offset in re.findall(r"OFFSET (\d+)", command)]
+            return [(ids[offset],) for offset in reversed(offsets)]
+        raise AssertionError("Unexpected command: " + command)
+    def iterate(self, table, start=None, stop=None, **keywords):
+        for row in self.rows:
+            if row[0] == self.fail_at:
+                raise ValueError("Lost connection")
+            if (start is None or row[0] >= start) and (stop is None or row[0] < stop):
+                yield row
+
+class FakePool(object):
+    def __init__(self, rows, fail_at=None):
+        self.rows, self.fail_at = rows, fail_at
+        self.checkouts = 0
+        self.lock = threading.Lock()
+    def checkout(self):
+        with self.lock:
+            self.checkouts += 1
+        return FakeScanCursor(self.rows, self.fail_at)
+
+
+class KeyRangeTests(unittest.TestCase):
+    def test_integer_key(self):
+        cursor = FakeScanCursor([(index, 'x') for index in range(1, 101)])
+        self.assertEqual(key_ranges(cursor, 'Orders', 4),
+            [(None, 26), (26, 51), (51, 76), (76, None)])
+
+    def test_sampled(self):
+        cursor = FakeScanCursor([(str(index), 'x') for index in range(10, 50)])
+        self.assertEqual(key_ranges(cursor, 'Orders', 2), [(None, '30'), ('30', None)])
+        self.assertEqual(key_ranges(cursor, 'Orders', 4),
+            [(None, '20'), ('20', '30'), ('30', '40'), ('40', None)])
+        # One statement, probing the key index at each boundary
+        self.assertEqual(cursor.probes.count("ORDER BY id LIMIT 1 OFFSET"), 3)
+
+    def test_small_table(self):
+        self.assertEqual(key_ranges(FakeScanCursor([]), 'Orders', 4), [(None, None)])
+        self.assertEqual(key_ranges(FakeScanCursor([(5, 'x')]), 'Orders', 4), [(None, None)])
+
+
+class ParallelScanTests(unittest.TestCase):
+    def setUp(self):
+        self.rows = [(index, index % 7) for index in range(1000)]
+
+    def test_unordered(self):
+        pool = FakePool(self.rows)
+        rows = list(parallel_scan(pool, 'Orders', workers=4, page_size=10))
+        self.assertEqual(sorted(rows), self.rows)
+        self.assertEqual(pool.checkouts, 5)
+
+    def test_ordered(self):
+        rows = list(parallel_scan(FakePool(self.rows), 'Orders', workers=3,
+                                  page_size=7, ordered=True, prefetch=1))
+        self.assertEqual(rows, self.rows)
+
+    def test_stop_early(self):
+        scan = parallel_scan(FakePool(self.rows), 'Orders', workers=4,
+                             page_size=5, prefetch=1)
+        self.assertEqual(len([row for _, row in zip(range(10), scan)]), 10)
+        scan.close()
+        self.assertEqual([thread for thread in threading.enumerate()
+                          if thread.name == 'sqlfront-scan-reader'], [])
+
+    def test_error(self):
+        pool = FakePool(self.rows, fail_at=600)
+        self.assertRaises(ValueError, list, parallel_scan(pool, 'Orders', workers=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+from __future__ import absolute_import
+import unittest
+import time
+
+from sqlfront.mysql.mysqlinterface import MySQLInterface
+from sqlfront.mysql.mysqlcursor import MySQLCursor
+from sqlfront.mysql.mysqlschema import MySQLSchemaCache
+from sqlfront.test.test_mysqlquerycache import FakeDriverConnection
+
+
+PERSONS = (
+    {'Field': 'persons_id', 'Type': 'int(11)', 'Key': 'PRI'},
+    {'Field': 'last', 'Type': 'varchar(255)', 'Key': ''},
+)
+
+class FakeCursor(MySQLInterface):
+    """MySQLInterface which records commands, instead of running them."""
+    database = 'test_sqlfront'
+    def __init__(self):
+        self.commands = []
+    def run(self, command, parameters=None, **keywords):
+        self.commands.append(command)
+        if command.startswith("DESCRIBE"):
+            return PERSONS
+        return ()
+    def execute(self, command, parameters=None, **keywords):
+        self.commands.append(command)
+    def describes(self):
+        return len([cmd for cmd in self.commands if cmd.startswith("DESCRIBE")])
+
+
+class MySQLSchemaCacheTests(unittest.TestCase):
+    def test_get_set(self):
+        cache = MySQLSchemaCache()
+        self.assertEqual(cache.get('db', 'Persons'), None)
+        cache.set('db', 'Persons', PERSONS)
+        self.assertEqual(cache.get('db', 'Persons'), PERSONS)
+        self.assert_(('db', 'Persons') in cache)
+
+    def test_ttl(self):
+        cache = MySQLSchemaCache(ttl=0.01)
+        cache.set('db', 'Persons', PERSONS)
+        time.sleep(0.02)
+        self.assertEqual(cache.get('db', 'Persons'), None)
+        disabled = MySQLSchemaCache(ttl=0)
+        disabled.set('db', 'Persons', PERSONS)
+        self.assertEqual(len(disabled), 0)
+
+    def test_invalidate(self):
+        cache = MySQLSchemaCache()
+        cache.set('db', 'Persons', PERSONS)
+        cache.set('db', 'Orders', PERSONS)
+        cache.set('other', 'Persons', PERSONS)
+        cache.invalidate(database='db', table='Persons')
+        self.assertEqual(len(cache), 2)
+        cache.invalidate(table='Persons')
+        self.assertEqual(len(cache), 1)
+        cache.invalidate(database='db')
+        self.assertEqual(len(cache), 0)
+
+
+class InterfaceCachingTests(unittest.TestCase):
+    def setUp(self):
+        self.cursor = FakeCursor()
+
+    def test_metadata_is_cached(self):
+        self.assertEqual(self.cursor.columns('Persons'), ['persons_id', 'last'])
+        self.assertEqual(self.cursor.primary_key('Persons'), 'persons_id')
+        self.assertEqual(self.cursor.column_types('Persons')['last'], 'varchar(255)')
+        self.assert_(self.cursor.exists(table='Persons', column='last'))
+        self.cursor.insert('Persons', {'last': 'Clark', 'unknown': 1})
+        self.cursor.insert('Persons', {'last': 'Maria'})
+        self.assertEqual(self.cursor.describes(), 1)
+
+    def test_default_database_key(self):
+        self.cursor.columns('Persons')
+        self.cursor.columns('Persons', database='test_sqlfront')
+        self.assertEqual(self.cursor.describes(), 1)
+
+    def test_invalidated_by_drop(self):
+        self.cursor.columns('Persons')
+        self.cursor.drop(table='Persons')
+        self.cursor.columns('Persons')
+        self.assertEqual(self.cursor.describes(), 2)
+
+    def test_shared_cache(self):
+        other = FakeCursor()
+        other.schema_cache = self.cursor.schema_cache
+        self.cursor.columns('Persons')
+        other.columns('Persons')
+        self.assertEqual(other.describes(), 0)
+
+
+class CurrentDatabaseTests(unittest.TestCase):
+    def setUp(self):
+        self.cursor = MySQLCursor(db='test_sqlfront', lazy=True)
+        self.cursor.connection = FakeDriverConnection()
+        self.cursor.cursor = self.cursor.connection.cursor()
+
+    def test_current_database(self):
+        self.cursor.current_database()
+        self.assertEqual(self.cursor.connection.commands, ["SELECT DATABASE();"])
+        self.assertEqual(self.cursor.database, 'test_sqlfront')
+
+    def test_use(self):
+        self.cursor.use('other')
+        self.assertEqual(self.cursor.connection.commands, ["USE other;"])
+        self.assertEqual(self.cursor.database, 'other')
+        self.assertEqual(self.cursor._schema_key('Persons'), ('other', 'Persons'))    # pylint: disable=W0212
+        self.cursor.use('test_sqlfront')
+        self.assertEqual(self.cursor.database, 'test_sqlfront')
+
+    def test_raw_use(self):
+        self.cursor.execute("USE other")
+        self.assertEqual(self.cursor.database, 'other')
+        self.assertEqual(self.cursor._schema_key('Persons'), ('other', 'Persons'))    # pylint: disable=W0212
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+from __future__ import absolute_import
+import os
+import json
+import tempfile
+import unittest
+
+from sqlfront.interfaces import SQLEvent
+from sqlfront.mysql.mysqlstats import MySQLQueryStats, fingerprint, _Histogram
+from sqlfront.test.test_mysqlquerycache import FakeConnection
+
+
+def event(command, duration, rows=None, result=None, phase='execute'):
+    made = SQLEvent(None, command, phase=phase)
+    made.duration, made.rows, made.result = duration, rows, result
+    return made
+
+
+class FingerprintTests(unittest.TestCase):
+    def test_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t1 WHERE a = 'it''s' AND b = -2.5e3 AND c = %(c)s"),
+            "SELECT * FROM t1 WHERE a = ? AND b = ? AND c = ?")
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3)"),
+                         fingerprint("SELECT * FROM t WHERE id IN (4)"))
+
+    def test_histogram(self):
+        histogram = _Histogram()
+        for millisecond in range(1, 101):
+            histogram.add(millisecond / 1000.0)
+        self.assert_(0.045 < histogram.percentile(0.5) < 0.06)
+        self.assert_(0.095 < histogram.percentile(0.99) < 0.12)
+        self.assertEqual(_Histogram().percentile(0.5), None)
+
+
+class MySQLQueryStatsTests(unittest.TestCase):
+    def test_aggregates(self):
+        stats = MySQLQueryStats()
+        for order_id in range(4):
+            stats.after_execute(event("SELECT * FROM Orders WHERE id = {0}".format(order_id), 0.01))
+            stats.after_fetch(event("SELECT * FROM Orders WHERE id = {0}".format(order_id), 0.002,
+                                    rows=1, result=[('abcd', 1, None)], phase='fetch'))
+        stats.on_error(event("SELECT * FROM Orders WHERE id = 9", 0.5))
+        self.assertEqual(len(stats), 1)
+        record = stats.report()[0]
+        self.assertEqual(record['fingerprint'], "SELECT * FROM Orders WHERE id = ?")
+        self.assertEqual((record['count'], record['errors'], record['rows'], record['bytes']),
+                         (4, 1, 4, 48))
+        self.assertAlmostEqual(record['total_time'], 0.048)
+        self.assertAlmostEqual(record['mean_time'], 0.012)
+        self.assert_(0.01 <= record['p99'] < 0.012)
+        self.assertEqual(json.loads(stats.dumps())[0]['count'], 4)
+
+    def test_memo_bounded(self):
+        stats = MySQLQueryStats()
+        rows = ", ".join("({0}, 'x')".format(index) for index in range(200))
+        for _ in range(3):
+            stats.after_execute(event("INSERT INTO t VALUES " + rows, 0.01))
+            stats.after_execute(event("SELECT 1", 0.01))
+        self.assertEqual(stats._fingerprints, {"SELECT 1": "SELECT ?"})     # pylint: disable=W0212
+        self.assertEqual(stats["INSERT INTO t VALUES (1, 'x')"].count, 3)
+
+    def test_slow_log(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            logged = []
+            stats = MySQLQueryStats(slow_threshold=0.1, slow_log=logged.append)
+            stats.after_execute(event("SELECT 1", 0.05))
+            stats.after_execute(event("SELECT 2", 0.2))
+            self.assertEqual([record['command'] for record in logged], ["SELECT 2"])
+            self.assertEqual(list(stats.slow_queries), logged)
+            stats.slow_log = path
+            stats.after_execute(event("SELECT 3", 0.3))
+            with open(path) as log:
+                self.assertEqual(json.loads(log.readline())['fingerprint'], "SELECT ?")
+        finally:
+            os.remove(path)
+
+    def test_listener(self):
+        stats = MySQLQueryStats(call_sites=True)
+        connection = FakeConnection(listeners=[stats])
+        for order_id in (3, 4):
+            connection.run("SELECT * FROM Orders WHERE id = %(id)s", {'id': order_id})
+        record = stats["SELECT * FROM Orders WHERE id = 5"].as_dict()
+        self.assertEqual((record['count'], record['rows']), (2, 2))
+        self.assertEqual(list(record['call_sites'].values()), [2])
+        self.assert_('test_listener' in list(record['call_sites'])[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+from __future__ import absolute_import
+import unittest
+
+from sqlfront.mysql.mysqlconnection import MySQLConnection
+from sqlfront.mysql.mysqlerror import MySQLError
+
+
+class StreamDriverCursor(object):
+    """Driver cursor answering every command with rows 1..connection.rows,
+    and recording its fetchmany() sizes."""
+    def __init__(self, connection, klass):
+        self.connection = connection
+        self.klass = klass
+        self.description = (('order_id', 3, None, None, None, None, 0),)
+        self.rows, self.fetches, self.closed = [], [], False
+    def execute(self, command, parameters=None):
+        self.connection.commands.append(command)
+        self.rows = [(index, ) for index in range(1, self.connection.rows + 1)]
+        return len(self.rows)
+    def fetchmany(self, size):
+        self.fetches.append(size)
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+    def close(self):
+        self.closed = True
+
+class StreamDriverConnection(object):
+    def __init__(self, rows):
+        self.rows = rows
+        self.commands, self.cursors = [], []
+    def cursor(self, klass=None):
+        cursor = StreamDriverCursor(self, klass)
+        self.cursors.append(cursor)
+        return cursor
+
+class StreamConnection(MySQLConnection):
+    """MySQLConnection on a fake driver connection, returning tuples."""
+    def __init__(self, rows=10):
+        MySQLConnection.__init__(self, lazy=True, row_format='tuple')
+        self.connection = StreamDriverConnection(rows)
+        self.cursor = self.connection.cursor()
+
+
+class StreamTests(unittest.TestCase):
+    def setUp(self):
+        self.cxn = StreamConnection(rows=10)
+
+    def test_batch_size(self):
+        rows = list(self.cxn.run("SELECT order_id FROM Orders", stream=True, batch_size=4))
+        self.assertEqual(rows, [(index, ) for index in range(1, 11)])
+        stream = self.cxn.connection.cursors[-1]
+        self.assertEqual(stream.fetches, [4, 4, 4, 4])
+
+    def test_closed_when_exhausted(self):
+        rows = self.cxn.run("SELECT order_id FROM Orders", stream=True, batch_size=3)
+        next(rows)
+        stream = self.cxn.connection.cursors[-1]
+        self.assertFalse(stream.closed)
+        list(rows)
+        self.assert_(stream.closed)
+        self.assertEqual(self.cxn._stream, None)     # pylint: disable=W0212
+
+    def test_next_execute_discards_stream(self):
+        rows = self.cxn.run("SELECT order_id FROM Orders", stream=True)
+        stream = self.cxn.connection.cursors[-1]
+        self.cxn.execute("SELECT 1")
+        self.assert_(stream.closed)
+        self.assertRaises(MySQLError, list, rows)
+
+    def test_stale_iterator_raises(self):
+        rows = self.cxn.run("SELECT order_id FROM Orders", stream=True, batch_size=4)
+        self.assertEqual(next(rows), (1, ))
+        self.cxn.run("SELECT order_id FROM Persons", stream=True)
+        # The rows of the batch already fetched are still this command's
+        self.assertEqual([next(rows) for _ in range(3)], [(2, ), (3, ), (4, )])
+        self.assertRaises(MySQLError, next, rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+from __future__ import absolute_import
+import unittest
+import sys
+import array
+
+from sqlfront.util.rows import Row, row_class, columnar, validate_row_format
+
+
+class RowTests(unittest.TestCase):
+    def setUp(self):
+        self.klass = row_class(['persons_id', 'last', 'count(*)'])
+        self.row = self.klass((1, 'Clark', 7))
+
+    def test_access(self):
+        self.assertEqual(self.row[0], 1)
+        self.assertEqual(self.row.last, 'Clark')
+        self.assertEqual(self.row['last'], 'Clark')
+        self.assertEqual(self.row['count(*)'], 7)
+        self.assertEqual(self.row[-1], 7)
+        self.assertEqual(self.row[:2], (1, 'Clark'))
+        self.assertRaises(KeyError, lambda: self.row['first'])
+        self.assertEqual(self.row.get('first', 'none'), 'none')
+
+    def test_mapping_methods(self):
+        self.assertEqual(self.row.keys(), ['persons_id', 'last', 'count(*)'])
+        self.assertEqual(self.row.values(), [1, 'Clark', 7])
+        self.assertEqual(dict(self.row.items())['last'], 'Clark')
+
+    def test_compact(self):
+        self.assert_(isinstance(self.row, tuple))
+        self.assert_(isinstance(self.row, Row))
+        self.assertEqual(sys.getsizeof(self.row), sys.getsizeof((1, 'Clark', 7)))
+        self.assertEqual(self.row, (1, 'Clark', 7))
+
+    def test_class_cache(self):
+        self.assert_(row_class(('persons_id', 'last', 'count(*)')) is self.klass)
+        self.assert_(row_class(['persons_id']) is not self.klass)
+
+    def test_validate_row_format(self):
+        self.assertEqual(validate_row_format('tuple'), 'tuple')
+        self.assertRaises(ValueError, validate_row_format, 'list')
+
+
+class ColumnarTests(unittest.TestCase):
+    def setUp(self):
+        self.names = ['order_id', 'persons_id', 'total', 'note']
+        self.rows = ((1, 2, 9.5, 'a'), (2, None, 1.25, 'b'))
+        self.typecodes = ['l', 'l', 'd', None]
+
+    def test_columns(self):
+        columns = columnar(self.names, self.rows, self.typecodes, use_numpy=False)
+        self.assertEqual(list(columns), self.names)
+        self.assertEqual(columns['order_id'], array.array('l', [1, 2]))
+        self.assertEqual(columns['total'], array.array('d', [9.5, 1.25]))
+        self.assertEqual(columns['note'], ['a', 'b'])
+
+    def test_nulls_fall_back_to_list(self):
+        columns = columnar(self.names, self.rows, self.typecodes, use_numpy=False)
+        self.assertEqual(columns['persons_id'], [2, None])
+
+    def test_empty(self):
+        columns = columnar(self.names, (), self.typecodes, use_numpy=False)
+        self.assertEqual(len(columns['order_id']), 0)
+        self.assertEqual(columns['note'], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
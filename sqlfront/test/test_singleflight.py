@@ -0,0 +1,88 @@
+from __future__ import absolute_import
+import unittest
+import threading
+import time
+
+from sqlfront.util.singleflight import SingleFlight
+from sqlfront.mysql.mysqlquerycache import MySQLQueryCache
+from sqlfront.test.test_mysqlquerycache import FakeConnection
+
+
+class SingleFlightTests(unittest.TestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def slow(self, value):
+        self.calls += 1
+        self.release.wait(5)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def run_threads(self, count, key, value):
+        results = []
+        def call():
+            try:
+                results.append(self.flight.do(key, self.slow, value))
+            except Exception as exc:    # pylint: disable=broad-except
+                results.append(exc)
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        while self.flight.coalesced < count - 1:
+            time.sleep(0.001)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_coalesced(self):
+        results = self.run_threads(8, 'count', [1, 2])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), 8)
+        self.assert_(all(result is results[0] for result in results))
+        self.assertEqual(self.flight.in_flight, 0)
+        # Finished calls are not reused
+        self.assertEqual(self.flight.do('count', lambda: 3), 3)
+
+    def test_error_shared(self):
+        results = self.run_threads(4, 'count', ValueError("Lost connection"))
+        self.assertEqual(self.calls, 1)
+        self.assert_(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(self.flight.in_flight, 0)
+
+
+class ConnectionSingleFlightTests(unittest.TestCase):
+    def test_run(self):
+        flight = SingleFlight()
+        connection = FakeConnection(single_flight=flight)
+        results = []
+        def fetch():
+            time.sleep(0.05)
+            return [{'order_id': 1}]
+        # One query is in flight; the connection waits on it
+        def lead():
+            results.append(flight.do(
+                MySQLQueryCache.key("SELECT * FROM Orders", None, 'dict'), fetch))
+        leader = threading.Thread(target=lead)
+        leader.start()
+        while not flight.in_flight:
+            time.sleep(0.001)
+        results.append(connection.run("SELECT * FROM Orders"))
+        leader.join()
+        self.assert_(results[0] is results[1])
+        self.assertEqual(connection.connection.commands, [])
+
+    def test_uncommitted_not_shared(self):
+        flight = SingleFlight()
+        cxn = FakeConnection(single_flight=flight)
+        cxn.run("DELETE FROM Orders WHERE order_id = 1")
+        flight.do = None    # Must not be used
+        cxn.run("SELECT * FROM Orders")
+        self.assertEqual(len(cxn.connection.commands), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+from __future__ import absolute_import
+import unittest
+
+from sqlfront.interfaces import SQLListener
+from sqlfront.test.test_mysqlquerycache import FakeConnection, FakeDriverCursor
+
+
+class RecordingListener(SQLListener):
+    def __init__(self):
+        self.events = []
+    def before_execute(self, event):
+        self.events.append(('before_execute', event.command, event.duration))
+    def after_execute(self, event):
+        self.events.append(('after_execute', event.command, event.rows))
+    def after_fetch(self, event):
+        self.events.append(('after_fetch', event.command, event.rows))
+    def on_error(self, event):
+        self.events.append(('on_error', event.phase, type(event.error)))
+        self.last = event
+
+class FailingCursor(FakeDriverCursor):
+    def execute(self, command, parameters=None):
+        if command.startswith("FAIL"):
+            raise RuntimeError(command)
+        return FakeDriverCursor.execute(self, command, parameters)
+
+
+class ListenerTests(unittest.TestCase):
+    def setUp(self):
+        self.listener = RecordingListener()
+        self.connection = FakeConnection(listeners=[self.listener])
+
+    def test_execute_and_fetch(self):
+        self.assertEqual(self.connection.run("SELECT * FROM Orders"), ({'order_id': 1},))
+        self.assertEqual(self.listener.events, [
+            ('before_execute', "SELECT * FROM Orders", None),
+            ('after_execute', "SELECT * FROM Orders", 1),
+            ('after_fetch', "SELECT * FROM Orders", 1),
+        ])
+
+    def test_error(self):
+        driver = self.connection.connection
+        driver.cursor = lambda klass=None: FailingCursor(driver)
+        self.connection._cursors = None     # pylint: disable=W0212
+        self.assertRaises(RuntimeError, self.connection.execute, "FAIL now")
+        self.assertEqual(self.listener.events[-1], ('on_error', 'execute', RuntimeError))
+        self.assert_(self.listener.last.duration >= 0)
+        self.assertEqual(self.listener.last.connection_id, id(self.connection))
+
+    def test_add_and_remove(self):
+        connection = FakeConnection()
+        self.assertEqual(connection.listeners, ())
+        connection.run("SELECT 1")
+        connection.add_listener(self.listener)
+        connection.execute("SELECT 2")
+        connection.remove_listener(self.listener)
+        connection.execute("SELECT 3")
+        self.assertEqual([event[1] for event in self.listener.events], ["SELECT 2"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
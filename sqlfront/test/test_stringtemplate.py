@@ -0,0 +1,49 @@
+from __future__ import absolute_import
+import unittest
+
+from sqlfront.extern import stringtemplate
+from sqlfront.extern.stringtemplate import StringTemplate, compile_template
+
+
+class StringTemplateTests(unittest.TestCase):
+    def test_format(self):
+        template = StringTemplate("SELECT {0} FROM {table} LIMIT {limit:d};")
+        self.assertEqual(template.format('id', table='users', limit=5),
+            "SELECT id FROM users LIMIT 5;")
+        self.assert_(isinstance(template.format(), StringTemplate))
+
+    def test_partial(self):
+        template = StringTemplate("SELECT {0} FROM {table} LIMIT {limit:d};")
+        partial = template.format(table='users')
+        self.assertEqual(partial, "SELECT {0} FROM users LIMIT {limit:d};")
+        self.assertEqual(partial.format('id', limit=5), "SELECT id FROM users LIMIT 5;")
+
+    def test_matches_str_format(self):
+        class Row(object):
+            id = 7
+        for template, args, kwargs in [
+                ("{0!r} {1[x]} {row.id}", ('a', {'x': 2}), {'row': Row}),
+                ("{value:{width}}|{{literal}}", (), {'value': 3, 'width': 4}),
+                ("{} and {}", (1, 2), {}),
+            ]:
+            self.assertEqual(StringTemplate(template).format(*args, **kwargs),
+                             template.format(*args, **kwargs))
+
+    def test_cache(self):
+        compiled = compile_template("SELECT {column};")
+        self.assert_(compile_template("SELECT {column};") is compiled)
+        self.assertEqual(compiled.fields, ('column',))
+
+    def test_cache_bounded(self):
+        size = stringtemplate.CACHE_SIZE
+        stringtemplate.CACHE_SIZE = 10
+        try:
+            for index in range(50):
+                compile_template("SELECT {0} FROM t" + str(index))
+            self.assert_(len(stringtemplate._cache) <= 10)
+        finally:
+            stringtemplate.CACHE_SIZE = size
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+OffloadFuture: the result of a call running on another thread. Used by
+AsyncMySQLConnection (mysql/mysqlasync.py) and MySQLBatchLoader
+(mysql/mysqlloader.py).
+
+A minimal, thread-safe future - Python 2 has no concurrent.futures.
+"""
+from __future__ import absolute_import
+import threading
+
+__all__ = ['OffloadFuture']
+
+
+class OffloadFuture(object):
+    """Result of a call running on a worker thread. Thread-safe."""
+    def __init__(self):
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def done(self):
+        """Predicate. Has the call finished?"""
+        return self._done.is_set()
+    def result(self, timeout=None):
+        """Wait for the call, and return its result (or raise its exception)."""
+        exception = self.exception(timeout)
+        if exception is not None:
+            raise exception
+        return self._result
+    def exception(self, timeout=None):
+        """Wait for the call, and return the exception it raised, or None."""
+        if not self._done.wait(timeout):
+            raise RuntimeError("Timed out waiting for offloaded call.")
+        return self._exception
+    def add_done_callback(self, function):
+        """Call function(future) when the call finishes - at once if it has
+        already finished. Callbacks run on the worker thread."""
+        with self._lock:
+            if not self.done():
+                self._callbacks.append(function)
+                return
+        function(self)
+
+    def set_result(self, result):
+        self._result = result
+        self._finish()
+    def set_exception(self, exception):
+        self._exception = exception
+        self._finish()
+    def _finish(self):
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for function in callbacks:
+            function(self)
@@ -0,0 +1,133 @@
+"""
+Compact row representations for query results.
+
+    'dict'  - one dict per row, keyed by column name (MySQLdb DictCursor).
+    'tuple' - plain tuples, in column order.
+    'row'   - tuples of a generated Row class, with __slots__ = (), so
+              rows cost no more memory than plain tuples. Columns are
+              readable by index, attribute, or name:
+
+    >>> Persons = row_class(['persons_id', 'last'])
+    >>> row = Persons((1, 'Clark'))
+    >>> (row[1], row.last, row['last'])
+    ('Clark', 'Clark', 'Clark')
+    >>> row_class(['persons_id', 'last']) is Persons
+    True
+
+    'columnar' - not rows at all: one container per column, in an
+              OrderedDict keyed by column name. Numeric columns become
+              array.array (or NumPy arrays, if NumPy is installed).
+
+    >>> columnar(['id', 'last'], [(1, 'Clark'), (2, 'Maria')], ['l', None], use_numpy=False)
+    OrderedDict([('id', array('l', [1, 2])), ('last', ['Clark', 'Maria'])])
+"""
+from __future__ import absolute_import
+import array
+import collections
+from ..extern import rich_core
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ['ROW_FORMATS', 'Row', 'row_class', 'columnar', 'validate_row_format']
+
+ROW_FORMATS = ('dict', 'tuple', 'row', 'columnar')
+
+# array.array typecode --> equivalent NumPy dtype
+_DTYPES = {'l': 'int64', 'd': 'float64'}
+
+class Row(object):
+    """Mixin for generated row classes. Adds lookup by column name, and the
+    read-only mapping methods (keys/values/items) that code written against
+    dict rows tends to use. Iterating a Row yields values, like a tuple."""
+    __slots__ = ()
+    _columns = ()
+    _positions = {}
+
+    def __new__(cls, values=()):
+        # Constructed from one sequence of values, like tuple()
+        return tuple.__new__(cls, values)
+    def __getitem__(self, key):
+        if isinstance(key, basestring):
+            try:
+                key = self._positions[key]
+            except KeyError:
+                raise KeyError(key)
+        return tuple.__getitem__(self, key)
+    def get(self, key, default=None):
+        """Value of column 'key', or default if there is no such column."""
+        try:
+            return self[key]
+        except (KeyError, IndexError):
+            return default
+    def keys(self):
+        """Column names, in column order."""
+        return list(self._columns)
+    def values(self):
+        """Column values, in column order."""
+        return list(self)
+    def items(self):
+        """(column name, value) pairs, in column order."""
+        return zip(self._columns, self)
+    def __repr__(self):
+        return "Row({0})".format(", ".join(
+            "{0}={1!r}".format(column, value)
+            for column, value in zip(self._columns, self)
+        ))
+
+# Generated classes, by tuple of column names
+_ROW_CLASSES = {}
+
+def row_class(columns):
+    """Return the Row class for a sequence of column names. Classes are
+    generated once per distinct set of columns, and reused thereafter."""
+    columns = tuple(columns)
+    try:
+        return _ROW_CLASSES[columns]
+    except KeyError:
+        pass
+    # rename=True: columns such as 'count(*)' become positional
+    # attributes (_0, _1, ...), but remain accessible by name via row['count(*)']
+    base = collections.namedtuple('Row', columns, rename=True)
+    klass = type('Row', (Row, base), {
+        '__slots__': (),
+        '_columns': columns,
+        '_positions': dict((column, index) for index, column in enumerate(columns)),
+    })
+    _ROW_CLASSES[columns] = klass
+    return klass
+
+def columnar(names, rows, typecodes=None, use_numpy=True):
+    """Pivot a sequence of tuple rows into an OrderedDict of columns.
+
+    typecodes: array.array typecode for each column ('l' or 'd'), or None
+        for columns kept as lists. Typed columns containing NULLs, or values
+        out of range for the typecode, also fall back to lists.
+    use_numpy: if NumPy is installed, build typed columns as NumPy arrays
+        rather than array.array.
+    """
+    if typecodes is None:
+        typecodes = [None] * len(names)
+    # zip(*rows) transposes rows into columns in a single pass
+    columns = zip(*rows) if len(rows) else [()] * len(names)
+    return collections.OrderedDict(
+        (name, _column(values, typecode, use_numpy))
+        for name, values, typecode in zip(names, columns, typecodes)
+    )
+
+def _column(values, typecode, use_numpy):
+    """Container for one column's values."""
+    if typecode is not None and None not in values:
+        try:
+            if use_numpy and numpy is not None:
+                return numpy.array(values, dtype=_DTYPES[typecode])
+            return array.array(typecode, values)
+        except (TypeError, OverflowError):
+            pass
+    return list(values)
+
+def validate_row_format(row_format):
+    """Return row_format, if it is one of ROW_FORMATS."""
+    return rich_core.AssertEnum(row_format, ROW_FORMATS, name='row_format')
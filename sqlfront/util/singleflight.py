@@ -0,0 +1,79 @@
+"""
+Single-flight: concurrent calls for the same key share one execution.
+
+The first caller for a key runs the function; callers arriving while it is
+still running wait, and receive the same result (or exception). Once it
+finishes, the next call for that key runs afresh - nothing is cached.
+
+    >>> flight = SingleFlight()
+    >>> flight.do('count:Orders', lambda: 3)
+    3
+
+Used by MySQLConnection.run() (single_flight=...), so that a burst of
+identical reads - for instance, when a cached result expires - sends one
+query to the server.
+"""
+from __future__ import absolute_import
+import threading
+
+__all__ = ['SingleFlight']
+
+
+class _Call(object):
+    """A call in flight, and its outcome once done."""
+    __slots__ = ('done', 'result', 'error', 'waiters')
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = self.error = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    """Coalesces concurrent calls with equal keys. Thread-safe; share one
+    instance between all the connections whose calls should coalesce.
+
+    The shared result is the same object for every caller - treat it as
+    read-only.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        # Calls answered by waiting on another caller's execution
+        self.coalesced = 0
+
+    def do(self, key, function, *args, **keywords):
+        """Return function(*args, **keywords), or the result of the call for
+        'key' already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **keywords)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    @property
+    def in_flight(self):
+        """Number of keys currently executing."""
+        return len(self._calls)
+
+    def __repr__(self):
+        return str.format("{0}(in_flight={1}, coalesced={2})",
+                          type(self).__name__, self.in_flight, self.coalesced)